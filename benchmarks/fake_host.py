@@ -0,0 +1,63 @@
+"""Stand-in for a DCC executable that runs a script like the real host.
+
+Usage:
+    python fake_host.py <host_name> [host arguments]
+
+The host arguments are parsed like the real hosts as passed by `run_script`:
+    - maya: `[-batch] -command 'python("...");'`
+    - houdini: `<script>` (as `hython`)
+    - blender: `[-b] -P <script>`
+    - nuke: `-t <script>`
+
+Before running the script it sleeps `FAKE_HOST_STARTUP_SECONDS` and prints
+`FAKE_HOST_OUTPUT_LINES` lines of `FAKE_HOST_LINE_LENGTH` characters to mimic
+the startup time and output volume of the real host.
+"""
+import os
+import re
+import runpy
+import sys
+import time
+
+
+def run_script(script_path):
+    runpy.run_path(script_path, run_name="__main__")
+
+
+def run_maya_command(mel_command):
+    match = re.search(r'python\("(.*)"\);', mel_command)
+    if not match:
+        raise ValueError(f"Unsupported MEL command: {mel_command}")
+    exec(match.group(1), {"__name__": "__main__"})
+
+
+def simulate_startup():
+    time.sleep(float(os.environ.get("FAKE_HOST_STARTUP_SECONDS", 0)))
+
+    lines = int(os.environ.get("FAKE_HOST_OUTPUT_LINES", 0))
+    line = "x" * int(os.environ.get("FAKE_HOST_LINE_LENGTH", 80)) + "\n"
+    write = sys.stdout.write
+    for _ in range(lines):
+        write(line)
+    sys.stdout.flush()
+
+
+def main(args):
+    host_name, args = args[0], args[1:]
+    simulate_startup()
+
+    if host_name == "maya":
+        run_maya_command(args[args.index("-command") + 1])
+    elif host_name == "houdini":
+        run_script(args[0])
+    elif host_name == "blender":
+        run_script(args[args.index("-P") + 1])
+    elif host_name == "nuke":
+        run_script(args[args.index("-t") + 1])
+    else:
+        raise ValueError(f"Unsupported host: {host_name}")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
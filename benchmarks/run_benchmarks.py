@@ -0,0 +1,377 @@
+"""Benchmark the overhead of the launch pipeline without the actual DCCs.
+
+The applications are replaced by `fake_host.py` and `ayon_applications` by
+the stub in `stubs`, so this only requires `ayon_core` to be importable, e.g.
+by running it with the AYON launcher:
+    ayon_console run benchmarks/run_benchmarks.py
+
+Store a baseline and report regressions against it afterwards:
+    ... run_benchmarks.py --save_baseline baseline.json
+    ... run_benchmarks.py --baseline baseline.json
+
+The exit code is 1 when any benchmark regressed more than `--threshold`.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_HOST_PATH = os.path.join(BENCHMARKS_DIR, "fake_host.py")
+STUBS_DIR = os.path.join(BENCHMARKS_DIR, "stubs")
+CLIENT_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "client")
+
+# Executable names per host, Houdini scripts run with `hython` which
+# `run_script` expects next to the Houdini executable
+HOST_EXECUTABLES = {
+    "maya": ["maya"],
+    "houdini": ["houdini", "hython"],
+    "blender": ["blender"],
+    "nuke": ["nuke"],
+}
+VARIANT = "2024"
+# Modules that must only be imported when a command runs, not on discovery
+DEFERRED_MODULES = (
+    "ayon_applications",
+    "ayon_core.pipeline",
+    "ayon_launch_scripts.maya_ascii",
+    "ayon_launch_scripts.metrics",
+    "ayon_launch_scripts.publish_index",
+    "ayon_launch_scripts.serve",
+    "ayon_launch_scripts.workfile_checks",
+)
+ADDON_IMPORT_CODE = """
+import json, sys
+import ayon_core.addon
+import ayon_launch_scripts
+print(json.dumps(sorted(
+    name for name in sys.modules if name.startswith({deferred!r})
+)))
+"""
+CONTEXT = {
+    "project_name": "benchmark",
+    "folder_path": "/assets/hero",
+    "task_name": "modeling",
+}
+
+
+def create_fake_hosts(directory):
+    """Create executables running `fake_host.py` for each host.
+
+    Returns:
+        dict[str, dict[str, str]]: Applications to `configure` the
+            `ayon_applications` stub with.
+
+    """
+    applications = {}
+    for host_name, names in HOST_EXECUTABLES.items():
+        host_dir = os.path.join(directory, host_name)
+        os.makedirs(host_dir)
+        for name in names:
+            path = os.path.join(host_dir, name)
+            if sys.platform == "win32":
+                path += ".bat"
+                content = (
+                    f'@"{sys.executable}" "{FAKE_HOST_PATH}" {host_name} %*\n'
+                )
+            else:
+                content = (
+                    "#!/bin/sh\n"
+                    f'exec "{sys.executable}" "{FAKE_HOST_PATH}" '
+                    f'{host_name} "$@"\n'
+                )
+            with open(path, "w") as f:
+                f.write(content)
+            os.chmod(path, 0o755)
+        applications[host_name] = {
+            VARIANT: os.path.join(host_dir, names[0])
+        }
+    return applications
+
+
+def import_modules():
+    """Import the addon with the `ayon_applications` stub."""
+    for name in list(sys.modules):
+        if name.split(".")[0] in {"ayon_applications", "ayon_launch_scripts"}:
+            del sys.modules[name]
+    sys.path.insert(0, STUBS_DIR)
+    sys.path.insert(1, CLIENT_DIR)
+
+    import ayon_applications
+    from ayon_launch_scripts import lib, run_script
+    return ayon_applications, lib, run_script
+
+
+def measure(func, repeat):
+    """Return median seconds of calling `func`."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+@contextlib.contextmanager
+def environment(**env):
+    original = os.environ.copy()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(original)
+
+
+def result(name, value, unit, lower_is_better=True):
+    return {
+        "name": name,
+        "value": value,
+        "unit": unit,
+        "lower_is_better": lower_is_better,
+    }
+
+
+def bench_addon_import(repeat):
+    """Time importing the addon like AYON does on addon discovery.
+
+    Runs in a new process with `-X importtime` so nothing is imported yet,
+    except `ayon_core.addon` which AYON has imported before discovery.
+    """
+    code = ADDON_IMPORT_CODE.format(deferred=DEFERRED_MODULES)
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    durations = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        imported = json.loads(process.stdout.splitlines()[-1])
+        if imported:
+            raise RuntimeError(
+                "Importing the addon imported modules that should only be "
+                f"imported when running a command: {', '.join(imported)}"
+            )
+        # E.g. "import time:       201 |      53197 | ayon_launch_scripts"
+        for line in process.stderr.splitlines():
+            if line.split("|")[-1].strip() == "ayon_launch_scripts":
+                durations.append(int(line.split("|")[1]) / 1000.0)
+                break
+    return [result("addon import", statistics.median(durations), "ms")]
+
+
+def bench_find_app_variant(lib, repeat):
+    results = []
+    with environment(AYON_LAUNCH_SCRIPTS_CACHE="0"):
+        duration = measure(lambda: lib.find_app_variant("maya"), repeat)
+    results.append(result("find_app_variant (uncached)", duration * 1000,
+                          "ms"))
+
+    lib.find_app_variant("maya")
+    duration = measure(lambda: lib.find_app_variant("maya"), repeat)
+    results.append(result("find_app_variant (cached)", duration * 1000, "ms"))
+    return results
+
+
+def bench_env_resolution(lib, repeat):
+    app_name = f"maya/{VARIANT}"
+    results = []
+    with environment(AYON_LAUNCH_SCRIPTS_CACHE="0"):
+        duration = measure(
+            lambda: lib.get_app_environments(app_name=app_name, **CONTEXT),
+            repeat
+        )
+    results.append(result("get_app_environments (uncached)",
+                          duration * 1000, "ms"))
+
+    lib.get_app_environments(app_name=app_name, **CONTEXT)
+    duration = measure(
+        lambda: lib.get_app_environments(app_name=app_name, **CONTEXT),
+        repeat
+    )
+    results.append(result("get_app_environments (cached)",
+                          duration * 1000, "ms"))
+    return results
+
+
+def bench_run_script_arguments(ayon_applications, run_script, script_path,
+                               repeat):
+    """Time constructing the launch of each host, without launching it"""
+    results = []
+    ayon_applications.DRY_RUN = True
+    try:
+        for host_name in HOST_EXECUTABLES:
+            duration = measure(
+                lambda: run_script.run_script(
+                    app_name=f"{host_name}/{VARIANT}",
+                    script_path=script_path,
+                    **CONTEXT
+                ),
+                repeat
+            )
+            results.append(result(f"run_script arguments ({host_name})",
+                                  duration * 1000, "ms"))
+    finally:
+        ayon_applications.DRY_RUN = False
+    return results
+
+
+def _launch(lib, run_script, script_path, host_name, raw=False):
+    popen = run_script.run_script(app_name=f"{host_name}/{VARIANT}",
+                                  script_path=script_path,
+                                  **CONTEXT)
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            lib.print_stdout_until_timeout(popen, app_name=host_name, raw=raw)
+    popen.wait()
+
+
+def bench_launch_overhead(lib, run_script, script_path, repeat):
+    """Time launching each host with an empty script, minus its own startup"""
+    results = []
+    for host_name in HOST_EXECUTABLES:
+        executable_name = HOST_EXECUTABLES[host_name][-1]
+        args = {
+            "maya": ["-command", f'python("exec(open(r\'{script_path}\')'
+                                 f'.read())");'],
+            "houdini": [script_path],
+            "blender": ["-b", "-P", script_path],
+            "nuke": ["-t", script_path],
+        }[host_name]
+        direct = measure(
+            lambda: subprocess.call(
+                [sys.executable, FAKE_HOST_PATH, host_name] + args,
+                stdout=subprocess.DEVNULL
+            ),
+            repeat
+        )
+        launched = measure(
+            lambda: _launch(lib, run_script, script_path, host_name),
+            repeat
+        )
+        results.append(result(f"launch overhead ({executable_name})",
+                              (launched - direct) * 1000, "ms"))
+    return results
+
+
+def bench_output_throughput(lib, run_script, script_path, lines, repeat):
+    results = []
+    with environment(FAKE_HOST_OUTPUT_LINES=str(lines)):
+        for mode, raw in [("relay", False), ("raw", True)]:
+            duration = measure(
+                lambda: _launch(lib, run_script, script_path, "blender",
+                                raw=raw),
+                repeat
+            )
+            results.append(result(f"output throughput ({mode})",
+                                  lines / duration, "lines/s",
+                                  lower_is_better=False))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return results that regressed more than `threshold` percent."""
+    baseline_values = {item["name"]: item["value"] for item in baseline}
+    regressions = []
+    for item in results:
+        base = baseline_values.get(item["name"])
+        if not base:
+            continue
+        change = (item["value"] - base) / base * 100.0
+        if not item["lower_is_better"]:
+            change = -change
+        item["baseline"] = base
+        item["change"] = change
+        if change > threshold:
+            regressions.append(item)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Amount of repeats to take the median of.")
+    parser.add_argument("--lines", type=int, default=200000,
+                        help="Lines of output to measure throughput with.")
+    parser.add_argument("--baseline",
+                        help="JSON file of a previous run to compare with.")
+    parser.add_argument("--save_baseline",
+                        help="Write the results to this JSON file.")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="Percentage a benchmark must have become worse "
+                             "to be reported as regression.")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="ayon_launch_scripts_benchmarks_")
+    try:
+        with environment(
+            AYON_LAUNCH_SCRIPTS_CACHE_DIR=os.path.join(directory, "cache"),
+            AYON_LAUNCH_SCRIPTS_METRICS="0",
+            AYON_BUNDLE_NAME="benchmark",
+        ):
+            ayon_applications, lib, run_script = import_modules()
+            ayon_applications.configure(create_fake_hosts(directory))
+
+            script_path = os.path.join(directory, "empty_script.py")
+            with open(script_path, "w") as f:
+                f.write("")
+
+            results = []
+            results += bench_addon_import(args.repeat)
+            results += bench_find_app_variant(lib, args.repeat)
+            results += bench_env_resolution(lib, args.repeat)
+            results += bench_run_script_arguments(
+                ayon_applications, run_script, script_path, args.repeat)
+            results += bench_launch_overhead(
+                lib, run_script, script_path, args.repeat)
+            results += bench_output_throughput(
+                lib, run_script, script_path, args.lines,
+                max(args.repeat // 3, 1))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    width = max(len(item["name"]) for item in results)
+    for item in results:
+        line = (
+            f"{item['name']:<{width}}  {item['value']:>12.2f} {item['unit']}"
+        )
+        change = item.pop("change", None)
+        item.pop("baseline", None)
+        if change is not None:
+            if change > 0:
+                line += f"  ({change:.1f}% worse)"
+            else:
+                line += f"  ({-change:.1f}% better)"
+        if item in regressions:
+            line += "  REGRESSION"
+        print(line)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Saved baseline to: {args.save_baseline}")
+
+    if regressions:
+        print(f"Found {len(regressions)} regressions of more than "
+              f"{args.threshold:g}% worse than baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Minimal stand-in for `ayon_applications` to benchmark without AYON server.
+
+Applications are configured with `configure()` instead of coming from the
+addon settings, e.g. to point them to the fake host executables of the
+benchmarks. Only the interface used by `ayon_launch_scripts` is provided.
+"""
+import os
+import subprocess
+
+# Configured executables per host and variant, see `configure()`
+_APPLICATIONS = {}
+
+# When set `ApplicationLaunchContext.launch` only records the launch
+DRY_RUN = False
+
+
+def configure(applications):
+    """Set the available applications.
+
+    Args:
+        applications (dict[str, dict[str, str]]): Executable path per variant
+            per host name, e.g. `{"maya": {"2024": "/path/to/maya"}}`.
+
+    """
+    _APPLICATIONS.clear()
+    _APPLICATIONS.update(applications)
+
+
+class ApplicationNotFound(Exception):
+    pass
+
+
+class ApplicationExecutableNotFound(Exception):
+    pass
+
+
+class ApplicationExecutable:
+    def __init__(self, executable):
+        self.executable_path = str(executable)
+
+    def __str__(self):
+        return self.executable_path
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}> {self.executable_path}"
+
+    def as_args(self):
+        return [self.executable_path]
+
+    def exists(self):
+        return os.path.exists(self.executable_path)
+
+
+class Application:
+    def __init__(self, group, name, executables):
+        self.group = group
+        self.name = name
+        self.executables = [
+            ApplicationExecutable(executable) for executable in executables
+        ]
+        self.enabled = True
+        self.redirect_output = True
+
+    @property
+    def host_name(self):
+        return self.group.name
+
+    @property
+    def full_name(self):
+        return f"{self.group.name}/{self.name}"
+
+    def find_executable(self):
+        for executable in self.executables:
+            if executable.exists():
+                return executable
+        return None
+
+
+class ApplicationGroup:
+    def __init__(self, name, variants):
+        self.name = name
+        self.enabled = True
+        self.variants = {
+            variant: Application(self, variant, [executable])
+            for variant, executable in variants.items()
+        }
+
+
+class ApplicationManager:
+    def __init__(self):
+        self.app_groups = {
+            name: ApplicationGroup(name, variants)
+            for name, variants in _APPLICATIONS.items()
+        }
+        self.applications = {
+            app.full_name: app
+            for group in self.app_groups.values()
+            for app in group.variants.values()
+        }
+
+    def find_latest_available_variant_for_group(self, group_name):
+        group = self.app_groups.get(group_name)
+        if group is None:
+            return None
+        for variant in sorted(group.variants.values(),
+                              key=lambda app: app.name,
+                              reverse=True):
+            if variant.find_executable():
+                return variant
+        return None
+
+
+class ApplicationLaunchContext:
+    """Launch the executable with `app_args` in `env` like the real one"""
+
+    # Last launched context, e.g. to inspect the constructed arguments
+    last_context = None
+
+    def __init__(self, application, executable, env=None, **data):
+        self.application = application
+        self.executable = executable
+        self.env = env if env is not None else os.environ.copy()
+        self.data = data
+        self.launch_args = executable.as_args() + list(
+            data.get("app_args") or [])
+        self.kwargs = {}
+        self.process = None
+
+    def launch(self):
+        ApplicationLaunchContext.last_context = self
+        if DRY_RUN:
+            return None
+        self.process = subprocess.Popen(self.launch_args,
+                                        env=self.env,
+                                        **self.kwargs)
+        return self.process
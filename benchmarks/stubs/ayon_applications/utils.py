@@ -0,0 +1,21 @@
+import os
+
+# Amount of environment variables to mimic the size of a real environment
+FAKE_ENV_SIZE = 300
+
+
+def get_app_environments_for_context(
+    project_name, folder_path, task_name, app_name, env=None
+):
+    """Return launch environment like the real function, without the server"""
+    env = dict(os.environ if env is None else env)
+    env.update({
+        "AYON_PROJECT_NAME": project_name,
+        "AYON_FOLDER_PATH": folder_path,
+        "AYON_TASK_NAME": task_name,
+        "AYON_APP_NAME": app_name,
+        "AYON_HOST_NAME": app_name.split("/", 1)[0],
+    })
+    for index in range(FAKE_ENV_SIZE):
+        env[f"AYON_BENCHMARK_{index}"] = f"{app_name}:{index}"
+    return env
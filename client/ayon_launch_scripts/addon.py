@@ -1,15 +1,69 @@
 """Launch scripts addon for AYON."""
+import contextlib
+import functools
+import json
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+import time
 
 from ayon_core.addon import click_wrap, AYONAddon, IPluginPaths
 
-from .lib import find_app_variant, print_stdout_until_timeout
-from .run_script import (
-    run_script as _run_script
+from . import tracing
+from .cache import get_bundle_name
+from .events import EVENTS_FILE_ENV, EventProgressPrinter
+from .heartbeat import start_monitor as start_heartbeat_monitor
+from .limits import (
+    EXIT_CODE_CPU_LIMIT,
+    LimitExceededError,
+    MemoryLimit,
+    get_preexec_fn,
+    is_cpu_limit_exit
+)
+from .logcapture import LogCapture
+from .resources import (
+    ResourceSampler,
+    format_usage,
+    is_supported as is_resource_sampling_supported
+)
+from .profiling import (
+    get_profile_path,
+    print_profile_summary,
+    wrap_script as wrap_script_profiled
+)
+from .lib import (
+    CACHES,
+    OUTPUT_INHERIT,
+    OUTPUT_MODES,
+    OUTPUT_RAW,
+    OUTPUT_RELAY,
+    POLL_INTERVAL,
+    find_app_variant,
+    get_application_manager,
+    get_last_workfiles,
+    install_termination_handlers,
+    load_manifest,
+    print_stdout_until_timeout
 )
 from .version import __version__
 
+PUBLISH_SCRIPT_PATH = os.path.join(os.path.dirname(__file__),
+                                   "scripts",
+                                   "publish_script.py")
+MANIFEST_KEYS = (
+    "project_name", "folder_path", "task_name", "filepath", "app_name"
+)
+PUBLISH_SCRIPTS_ENV_KEYS = (
+    "PUBLISH_PRE_WORKFILE_SCRIPTS",
+    "PUBLISH_PRE_SCRIPTS",
+    "PUBLISH_POST_SCRIPTS",
+)
+# Seconds between resource usage samples when not passed explicitly
+DEFAULT_RESOURCE_INTERVAL = 5.0
+
 
 class LaunchScriptsAddon(AYONAddon, IPluginPaths):
     label = "Publish Workfile"
@@ -36,7 +90,440 @@ class LaunchScriptsAddon(AYONAddon, IPluginPaths):
 @click_wrap.group(LaunchScriptsAddon.name,
                   help="Publish Workfile cli commands.")
 def cli_main():
-    pass
+    # Do not orphan launched applications when terminated
+    install_termination_handlers()
+
+
+def _log_capture_options(func):
+    """Add the command line options to create a `LogCapture`"""
+    options = [
+        click_wrap.option("--log_archive",
+                          help="Write the full output to this gzip "
+                               "compressed file."),
+        click_wrap.option("--log_archive_max_mb",
+                          type=float,
+                          default=500.0,
+                          help="Stop writing to the log archive after this "
+                               "many megabytes of uncompressed output."),
+        click_wrap.option("--tail_lines",
+                          type=int,
+                          default=0,
+                          help="Repeat this many last lines of output when "
+                               "the application fails."),
+        click_wrap.option("--collapse_repeats",
+                          is_flag=True,
+                          default=False,
+                          help="Print runs of identical lines of output only "
+                               "once with the amount of repeats."),
+        click_wrap.option("--filter", "log_filters",
+                          multiple=True,
+                          help="Regular expression of lines of output to "
+                               "not print, e.g. known noise."),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _limit_options(func):
+    """Add the command line options to limit the application's resources"""
+    options = [
+        click_wrap.option("--max_memory_mb",
+                          type=float,
+                          help="Terminate the application when it and its "
+                               "child processes use more resident memory "
+                               "than this many megabytes. Linux only."),
+        click_wrap.option("--max_cpu_seconds",
+                          type=int,
+                          help="Terminate the application or any of its "
+                               "child processes after using this many "
+                               "seconds of CPU time."),
+        click_wrap.option("--max_open_files",
+                          type=int,
+                          help="Maximum amount of files the application and "
+                               "each of its child processes can open."),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _trace_option(func):
+    """Add the `--trace_file` option and trace the command as a span"""
+    @functools.wraps(func)
+    def wrapper(*args, trace_file=None, **kwargs):
+        if trace_file:
+            tracing.enable(trace_file)
+        attributes = {
+            key: kwargs.get(key) for key in MANIFEST_KEYS
+        }
+        with tracing.span(func.__name__, **attributes):
+            return func(*args, **kwargs)
+
+    return click_wrap.option(
+        "--trace_file",
+        help="Append trace spans of this command and the application to "
+             "this file as OTLP JSON lines."
+    )(wrapper)
+
+
+def _validate_output_options(output, log_file, log_capture_options):
+    """Raise error for output options that would be silently ignored.
+
+    Raises:
+        ValueError: When the output mode is invalid or the output is not
+            relayed line by line for the log capture options that need it.
+
+    """
+    if output not in OUTPUT_MODES:
+        raise ValueError(
+            "--output must be one of {}, got: {}".format(
+                ", ".join(OUTPUT_MODES), output))
+
+    line_options = [
+        name for name, key in (
+            ("--filter", "log_filters"),
+            ("--collapse_repeats", "collapse_repeats"),
+            ("--tail_lines", "tail_lines"),
+        )
+        if log_capture_options.get(key)
+    ]
+    if log_file or output == OUTPUT_INHERIT:
+        if log_capture_options.get("log_archive"):
+            line_options.append("--log_archive")
+        if line_options:
+            raise ValueError(
+                "{} can not be used with --log_file or --output {}, the "
+                "output is not captured".format(
+                    ", ".join(line_options), OUTPUT_INHERIT))
+    elif output == OUTPUT_RAW and line_options:
+        raise ValueError(
+            "{} can not be used with --output {}, the output is forwarded "
+            "as is".format(", ".join(line_options), OUTPUT_RAW))
+
+
+def _validate_serve_options(serve_port,
+                            output,
+                            log_file,
+                            log_capture_options,
+                            **options):
+    """Raise error for options that would be ignored by a served host.
+
+    The served host was launched by the `serve` command, so the options to
+    launch and watch the application do not apply to it.
+
+    Args:
+        serve_port (Optional[int]): Port of the served host, if any.
+        output (str): The output mode.
+        log_file (Optional[str]): The log file, if any.
+        log_capture_options (dict): Options to create a `LogCapture`.
+        **options: Other option values by their option name.
+
+    Raises:
+        ValueError: When any of the options is set with `serve_port`.
+
+    """
+    if not serve_port:
+        return
+
+    names = [f"--{name}" for name, value in options.items() if value]
+    if output != OUTPUT_RELAY:
+        names.append("--output")
+    if log_file:
+        names.append("--log_file")
+    names.extend(
+        name for name, key in (
+            ("--log_archive", "log_archive"),
+            ("--filter", "log_filters"),
+            ("--collapse_repeats", "collapse_repeats"),
+            ("--tail_lines", "tail_lines"),
+        )
+        if log_capture_options.get(key)
+    )
+    if names:
+        raise ValueError(
+            "{} can not be used with --serve_port, the served host was "
+            "launched by the serve command".format(", ".join(names)))
+
+
+def _create_log_capture(
+    log_archive=None,
+    log_archive_max_mb=None,
+    tail_lines=0,
+    collapse_repeats=False,
+    log_filters=()
+):
+    """Return `LogCapture` for the `_log_capture_options` if any are set"""
+    if not any((log_archive, tail_lines, collapse_repeats, log_filters)):
+        return None
+    return LogCapture(
+        archive_path=log_archive,
+        archive_max_bytes=(
+            int(log_archive_max_mb * 1024 * 1024)
+            if log_archive_max_mb else None
+        ),
+        tail_lines=tail_lines,
+        collapse_repeats=collapse_repeats,
+        filters=log_filters
+    )
+
+
+def _get_job_metrics(command, **context):
+    """Return job metrics to record with `_record_job_metrics`"""
+    metrics = dict(context)
+    metrics.update({
+        "command": command,
+        "addon_version": __version__,
+        "bundle_name": get_bundle_name(),
+    })
+    return metrics
+
+
+def _record_job_metrics(metrics, phases=None):
+    """Record job metrics unless disabled, never failing the job"""
+    from .metrics import MetricsStore, is_metrics_enabled
+
+    if not is_metrics_enabled():
+        return
+
+    import sqlite3
+
+    try:
+        MetricsStore().record_job(metrics, phases)
+    except (sqlite3.Error, OSError) as exc:
+        print(f"Failed to record job metrics: {exc}")
+
+
+def _update_job_metrics(metrics, start, returncode, usage=None):
+    """Add duration, exit code and resource usage of the application"""
+    metrics["wall_seconds"] = time.time() - start
+    metrics["returncode"] = returncode
+    if usage:
+        metrics["peak_rss_bytes"] = usage["peak_rss_bytes"]
+        metrics["cpu_seconds"] = usage["cpu_seconds"]
+
+
+def _submit_script(metrics, script_path, **kwargs):
+    """Run script in the served host, updating metrics even when failing"""
+    from .serve import EXIT_CODE_TIMEOUT, submit_script
+
+    start = time.time()
+    returncode = 1
+    try:
+        returncode = submit_script(script_path, **kwargs)
+    except TimeoutError:
+        returncode = EXIT_CODE_TIMEOUT
+        raise
+    finally:
+        _update_job_metrics(metrics, start, returncode)
+    return returncode
+
+
+def _get_phase_durations(report):
+    """Return duration per phase from a publish report"""
+    return {
+        row["name"]: row["duration"]
+        for row in report.get("timings", {}).get("phases", [])
+    }
+
+
+def _launch_and_wait(
+    project_name,
+    folder_path,
+    task_name,
+    app_name,
+    script_path,
+    env,
+    timeout=None,
+    stall_timeout=None,
+    output=OUTPUT_RELAY,
+    log_file=None,
+    prefix=None,
+    launch_lock=None,
+    log_capture=None,
+    events_file=None,
+    profile_file=None,
+    resource_interval=None,
+    max_memory_mb=None,
+    max_cpu_seconds=None,
+    max_open_files=None,
+    metrics=None,
+    stop_event=None
+):
+    """Launch application with script, relay its output and wait for it.
+
+    Args:
+        project_name (str): The project name.
+        folder_path (str): The folder path.
+        task_name (str): The task name.
+        app_name (str): The application name.
+        script_path (str): The python script to run.
+        env (dict): Base environment to launch with.
+        timeout (Optional[float]): Seconds after which the application is
+            terminated.
+        stall_timeout (Optional[float]): Seconds without progress after
+            which the application is terminated.
+        output (str): How to handle the output, one of `OUTPUT_MODES`.
+        log_file (Optional[str]): Let the application write its output
+            directly to this file instead.
+        prefix (Optional[str]): Prefix for relayed output lines. Defaults
+            to the application name.
+        launch_lock (Optional[threading.Lock]): Lock to hold while launching.
+        log_capture (Optional[LogCapture]): Archive, filter and collapse the
+            relayed output.
+        events_file (Optional[str]): Let the application write its event
+            stream to this file and print progress from it.
+        profile_file (Optional[str]): Run the script under cProfile and
+            write the stats to this file.
+        resource_interval (Optional[float]): Seconds between samples of the
+            resource usage of the application's process tree, which is
+            printed when the application shuts down.
+        max_memory_mb (Optional[float]): Terminate the application when its
+            process tree exceeds this resident memory.
+        max_cpu_seconds (Optional[int]): CPU time limit of each process.
+        max_open_files (Optional[int]): Open files limit of each process.
+        metrics (Optional[dict]): Job metrics to add the duration, exit code
+            and resource usage of the application to.
+        stop_event (Optional[threading.Event]): Terminate the application
+            once this event is set, e.g. when another thread got interrupted.
+
+    Returns:
+        int: The application's return code, or `EXIT_CODE_MEMORY_LIMIT` or
+            `EXIT_CODE_CPU_LIMIT` when it exceeded its limits.
+
+    Raises:
+        RuntimeError: When the application timed out, stalled or was
+            stopped by `stop_event`.
+
+    """
+    if output not in OUTPUT_MODES:
+        raise ValueError(
+            "Output must be one of {}, got: {}".format(
+                ", ".join(OUTPUT_MODES), output))
+
+    if max_memory_mb and not is_resource_sampling_supported():
+        raise ValueError("Memory limit is only supported on Linux")
+    preexec_fn = get_preexec_fn(max_cpu_seconds, max_open_files)
+
+    # Imports `ayon_applications` so only import it once we launch
+    from .run_script import run_script as _run_script
+
+    if log_file:
+        stdout = open(log_file, "ab")
+    elif output == OUTPUT_INHERIT:
+        stdout = None
+    else:
+        stdout = subprocess.PIPE
+
+    env = env.copy()
+    heartbeat = start_heartbeat_monitor(env, stall_timeout)
+    watchers = []
+    if stop_event is not None:
+        def check_stopped():
+            if stop_event.is_set():
+                raise RuntimeError("Application stopped")
+
+        watchers.append(check_stopped)
+    if events_file:
+        events_file = os.path.abspath(events_file)
+        env[EVENTS_FILE_ENV] = events_file
+        watchers.append(EventProgressPrinter(events_file))
+    if profile_file:
+        script_path = wrap_script_profiled(script_path, env, profile_file)
+    start = time.time()
+    with tracing.span("host",
+                      app_name=app_name,
+                      script=script_path) as span_attributes:
+        # Spans recorded in the host become children of this span
+        env.update(tracing.get_env())
+        try:
+            with launch_lock or contextlib.nullcontext():
+                with tracing.span("launch"):
+                    launched_app = _run_script(
+                        project_name=project_name,
+                        folder_path=folder_path,
+                        task_name=task_name,
+                        app_name=app_name,
+                        script_path=script_path,
+                        env=env,
+                        stdout=stdout,
+                        preexec_fn=preexec_fn
+                    )
+            sampler = None
+            if max_memory_mb or (
+                max_cpu_seconds and is_resource_sampling_supported()
+            ):
+                # Sample often enough to terminate before memory runs out
+                # and to tell whether a killed process hit the CPU limit
+                sampler = ResourceSampler(
+                    launched_app.pid,
+                    min(resource_interval or POLL_INTERVAL, POLL_INTERVAL)
+                )
+                watchers.append(sampler)
+                if max_memory_mb:
+                    watchers.append(MemoryLimit(
+                        sampler, int(max_memory_mb * 1024 * 1024)))
+            elif resource_interval and is_resource_sampling_supported():
+                sampler = ResourceSampler(launched_app.pid, resource_interval)
+                watchers.append(sampler)
+
+            limit_error = None
+            try:
+                print_stdout_until_timeout(launched_app, timeout, app_name,
+                                           prefix=prefix,
+                                           heartbeat=heartbeat,
+                                           raw=output == OUTPUT_RAW,
+                                           log_capture=log_capture,
+                                           watchers=watchers)
+            except LimitExceededError as exc:
+                limit_error = exc
+            except RuntimeError:
+                # Timed out or stalled, the application was terminated
+                if metrics is not None:
+                    _update_job_metrics(
+                        metrics,
+                        start,
+                        launched_app.wait(),
+                        sampler.get_usage() if sampler else None
+                    )
+                raise
+        finally:
+            if heartbeat:
+                heartbeat.cleanup()
+            if log_file:
+                # The application has its own handle to the file
+                stdout.close()
+
+        # Ensure we wait so that we can get the return code
+        returncode = launched_app.wait()
+        if limit_error:
+            print(limit_error)
+            returncode = limit_error.exit_code
+        elif max_cpu_seconds and is_cpu_limit_exit(
+            returncode,
+            max_cpu_seconds,
+            sampler.max_process_cpu if sampler else None
+        ):
+            print("Application exceeded CPU time limit of "
+                  f"{max_cpu_seconds} seconds")
+            returncode = EXIT_CODE_CPU_LIMIT
+        span_attributes["returncode"] = returncode
+        usage = sampler.get_usage() if sampler else None
+        if usage and resource_interval:
+            print(f"Resource usage: {format_usage(usage)}")
+            span_attributes.update(
+                (f"resources.{key}", value) for key, value in usage.items()
+            )
+
+    if metrics is not None:
+        _update_job_metrics(metrics, start, returncode, usage)
+
+    tail = log_capture.get_tail() if log_capture else ""
+    if returncode != 0 and tail:
+        print(f"Application failed, last lines of output:\n{tail}", end="")
+    if profile_file:
+        print_profile_summary(profile_file)
+    return returncode
 
 
 @cli_main.command()
@@ -61,50 +548,174 @@ def cli_main():
                    help="App name, specific variant 'maya/2023' or just 'maya' to "
                         "take latest found variant for which current machine has "
                         "an existing executable.")
+@click_wrap.option("-port", "--serve_port",
+                   type=int,
+                   help="Run the script in a host kept alive by the `serve` "
+                        "command on this local port instead of launching "
+                        "a new host.")
+@click_wrap.option("--timeout",
+                   type=float,
+                   help="Seconds after which the application and all its "
+                        "child processes are terminated.")
+@click_wrap.option("--stall_timeout",
+                   type=float,
+                   help="Seconds without heartbeat or output after which the "
+                        "application is considered stalled. A stack dump of "
+                        "the application is printed before it is "
+                        "terminated.")
+@click_wrap.option("--output",
+                   default=OUTPUT_RELAY,
+                   help="How to show the application output: 'relay' prints "
+                        "each line prefixed with the application name, "
+                        "'raw' forwards the output as is and 'inherit' lets "
+                        "the application write directly to this console. "
+                        "Only 'relay' supports filtering, collapsing and "
+                        "repeating the last lines of output.")
+@click_wrap.option("--log_file",
+                   help="Let the application write its output directly to "
+                        "this file instead of showing it.")
+@click_wrap.option("--events_file",
+                   help="Let the application write a JSON lines event stream "
+                        "of its progress to this file.")
+@click_wrap.option("--profile",
+                   is_flag=True,
+                   default=False,
+                   help="Run the script in the application under cProfile "
+                        "and write the stats to a .prof file next to the "
+                        "log file.")
+@click_wrap.option("--resource_interval",
+                   type=float,
+                   help="Seconds between samples of the memory, CPU and I/O "
+                        "usage of the application and its child processes, "
+                        "reported when it shuts down. Defaults to 5, use 0 "
+                        "to disable. Linux only.")
+@_log_capture_options
+@_limit_options
+@_trace_option
 def run_script(project_name,
                folder_path,
                task_name,
                filepath,
                app_name,
-               timeout=None):
-    app_name = find_app_variant(app_name)
-    launched_app = _run_script(
+               serve_port=None,
+               timeout=None,
+               stall_timeout=None,
+               output=OUTPUT_RELAY,
+               log_file=None,
+               events_file=None,
+               profile=False,
+               resource_interval=None,
+               max_memory_mb=None,
+               max_cpu_seconds=None,
+               max_open_files=None,
+               **log_capture_options):
+    _validate_output_options(output, log_file, log_capture_options)
+    _validate_serve_options(serve_port,
+                            output,
+                            log_file,
+                            log_capture_options,
+                            stall_timeout=stall_timeout,
+                            events_file=events_file,
+                            profile=profile,
+                            resource_interval=resource_interval,
+                            max_memory_mb=max_memory_mb,
+                            max_cpu_seconds=max_cpu_seconds,
+                            max_open_files=max_open_files)
+    if resource_interval is None:
+        resource_interval = DEFAULT_RESOURCE_INTERVAL
+    if serve_port:
+        metrics = _get_job_metrics(
+            "run_script",
+            project_name=project_name,
+            folder_path=folder_path,
+            task_name=task_name,
+            app_name=app_name,
+            filepath=filepath
+        )
+        try:
+            returncode = _submit_script(
+                metrics,
+                filepath,
+                port=serve_port,
+                project_name=project_name,
+                folder_path=folder_path,
+                task_name=task_name,
+                app_name=app_name,
+                env=tracing.get_env() or None,
+                timeout=timeout
+            )
+        finally:
+            # Timed out or lost the served host, still record the job
+            _record_job_metrics(metrics)
+        print(f"Script finished with returncode: {returncode}")
+        sys.exit(returncode)
+
+    with tracing.span("find_app_variant", app_name=app_name):
+        app_name = find_app_variant(app_name)
+    metrics = _get_job_metrics(
+        "run_script",
         project_name=project_name,
         folder_path=folder_path,
         task_name=task_name,
         app_name=app_name,
-        script_path=filepath
+        filepath=filepath
     )
-
-    print_stdout_until_timeout(launched_app, timeout, app_name)
-
-    launched_app.wait()  # ensure we wait so that we can get the return code
-    print(f"Application shut down with returncode: {launched_app.returncode}")
-    sys.exit(launched_app.returncode)  # Transfer the error code
+    try:
+        returncode = _launch_and_wait(
+            project_name=project_name,
+            folder_path=folder_path,
+            task_name=task_name,
+            app_name=app_name,
+            script_path=filepath,
+            env=os.environ.copy(),
+            timeout=timeout,
+            stall_timeout=stall_timeout,
+            output=output,
+            log_file=log_file,
+            log_capture=_create_log_capture(**log_capture_options),
+            events_file=events_file,
+            profile_file=(
+                get_profile_path(log_file, log_capture_options["log_archive"])
+                if profile else None
+            ),
+            resource_interval=resource_interval,
+            max_memory_mb=max_memory_mb,
+            max_cpu_seconds=max_cpu_seconds,
+            max_open_files=max_open_files,
+            metrics=metrics
+        )
+    except RuntimeError:
+        # Timed out or stalled, still record the job
+        _record_job_metrics(metrics)
+        raise
+    print(f"Application shut down with returncode: {returncode}")
+    _record_job_metrics(metrics)
+    sys.exit(returncode)  # Transfer the error code
 
 
 @cli_main.command()
 @click_wrap.option("-project", "--project_name",
-                   required=True,
                    envvar="AYON_PROJECT_NAME",
                    help="Project name")
 @click_wrap.option("-folder", "--folder_path",
-                   required=True,
                    envvar="AYON_FOLDER_PATH",
                    help="Folder path")
 @click_wrap.option("-task", "--task_name",
-                   required=True,
                    envvar="AYON_TASK_NAME",
                    help="Task name")
 @click_wrap.option("-path", "--filepath",
-                   required=True,
                    help="Absolute filepath to workfile to publish")
 @click_wrap.option("-app", "--app_name",
                    envvar="AYON_APP_NAME",
-                   required=True,
                    help="App name, specific variant 'maya/2023' or just 'maya'"
                         " to take latest found variant for which current"
                         " machine has an existing executable.")
+@click_wrap.option("-manifest", "--manifest",
+                   help="JSON file listing entries with 'project_name', "
+                        "'folder_path', 'task_name', 'filepath' and optionally "
+                        "'app_name' to publish in batch instead of a single "
+                        "workfile. Missing values default to the other "
+                        "arguments.")
 @click_wrap.option("-prework", "--pre_workfile_script",
                    multiple=True,
                    help="Pre process script path before workfile open")
@@ -116,17 +727,111 @@ def run_script(project_name,
                    help="Post process script path")
 @click_wrap.option("-c", "--comment",
                    help="Publish comment")
-def publish(project_name,
-            folder_path,
-            task_name,
-            filepath,
+@click_wrap.option("-port", "--serve_port",
+                   type=int,
+                   help="Publish in a host kept alive by the `serve` command "
+                        "on this local port instead of launching a new host. "
+                        "Not supported with a manifest.")
+@click_wrap.option("--timeout",
+                   type=float,
+                   help="Seconds after which the application and all its "
+                        "child processes are terminated.")
+@click_wrap.option("--stall_timeout",
+                   type=float,
+                   help="Seconds without heartbeat or output after which the "
+                        "application is considered stalled. A stack dump of "
+                        "the application is printed before it is "
+                        "terminated.")
+@click_wrap.option("--output",
+                   default=OUTPUT_RELAY,
+                   help="How to show the application output: 'relay' prints "
+                        "each line prefixed with the application name, "
+                        "'raw' forwards the output as is and 'inherit' lets "
+                        "the application write directly to this console. "
+                        "Only 'relay' supports filtering, collapsing and "
+                        "repeating the last lines of output.")
+@click_wrap.option("--log_file",
+                   help="Let the application write its output directly to "
+                        "this file instead of showing it.")
+@click_wrap.option("--events_file",
+                   help="Let the application write a JSON lines event stream "
+                        "of its progress to this file.")
+@click_wrap.option("--profile",
+                   is_flag=True,
+                   default=False,
+                   help="Run the script in the application under cProfile "
+                        "and write the stats to a .prof file next to the "
+                        "log file.")
+@click_wrap.option("--resource_interval",
+                   type=float,
+                   help="Seconds between samples of the memory, CPU and I/O "
+                        "usage of the application and its child processes, "
+                        "reported when it shuts down. Defaults to 5, use 0 "
+                        "to disable. Linux only.")
+@click_wrap.option("--result_json",
+                   help="Write a JSON report of the published instances, "
+                        "version ids, phase durations and errors to this "
+                        "file.")
+@click_wrap.option("--skip_unchanged",
+                   is_flag=True,
+                   default=False,
+                   help="Skip workfiles without launching the application "
+                        "when the workfile did not change and none of the "
+                        "products loaded in it got a newer version since it "
+                        "last published successfully with the same scripts.")
+@click_wrap.option("--offline_checks",
+                   is_flag=True,
+                   default=False,
+                   help="Make the decision of the 'quit_on_no_outdated' and, "
+                        "for Maya ASCII workfiles, "
+                        "'quit_on_only_workfile_instance' pre-publish scripts "
+                        "before launching, skipping the launch when they "
+                        "would quit. Other workfiles are checked against the "
+                        "inputs of their last publish.")
+@_log_capture_options
+@_limit_options
+@_trace_option
+def publish(project_name=None,
+            folder_path=None,
+            task_name=None,
+            filepath=None,
             app_name=None,
+            manifest=None,
             pre_workfile_script=None,
             pre_publish_script=None,
             post_publish_script=None,
             comment=None,
-            timeout=None):
+            serve_port=None,
+            timeout=None,
+            stall_timeout=None,
+            output=OUTPUT_RELAY,
+            log_file=None,
+            events_file=None,
+            result_json=None,
+            skip_unchanged=False,
+            offline_checks=False,
+            profile=False,
+            resource_interval=None,
+            max_memory_mb=None,
+            max_cpu_seconds=None,
+            max_open_files=None,
+            **log_capture_options):
     """Publish a workfile standalone for a host."""
+    _validate_output_options(output, log_file, log_capture_options)
+    _validate_serve_options(serve_port,
+                            output,
+                            log_file,
+                            log_capture_options,
+                            manifest=manifest,
+                            stall_timeout=stall_timeout,
+                            events_file=events_file,
+                            profile=profile,
+                            resource_interval=resource_interval,
+                            max_memory_mb=max_memory_mb,
+                            max_cpu_seconds=max_cpu_seconds,
+                            max_open_files=max_open_files)
+    if resource_interval is None:
+        resource_interval = DEFAULT_RESOURCE_INTERVAL
 
     # The entry point should be a script that opens the workfile since the
     # `run_script` interface doesn't have an "open with file" argument due to
@@ -135,22 +840,14 @@ def publish(project_name,
     # is to just open in the host instead and allow the script itself to open
     # a file.
 
-    print(f"Using context {project_name} > {folder_path} > {task_name}")
-    print(f"Publishing workfile: {filepath}")
-
-    if not os.path.exists(filepath):
-        raise RuntimeError(f"Filepath does not exist: {filepath}")
-
     # Pass specific arguments to the publish script using environment variables
     env = os.environ.copy()
-    env["PUBLISH_WORKFILE"] = filepath
 
     # Process scripts input arguments
-    for key, scripts in {
-        "PUBLISH_PRE_WORKFILE_SCRIPTS": pre_workfile_script,
-        "PUBLISH_PRE_SCRIPTS": pre_publish_script,
-        "PUBLISH_POST_SCRIPTS": post_publish_script,
-    }.items():
+    for key, scripts in zip(
+        PUBLISH_SCRIPTS_ENV_KEYS,
+        (pre_workfile_script, pre_publish_script, post_publish_script)
+    ):
         script_paths = []
         for script in scripts:
             # Allow referring to locally embedded scripts with just their
@@ -169,23 +866,1005 @@ def publish(project_name,
 
     if comment:
         env["PUBLISH_COMMENT"] = comment
+    if skip_unchanged:
+        from .publish_index import RECORD_PUBLISH_ENV
+
+        # Record the publish to skip it the next time while unchanged
+        env[RECORD_PUBLISH_ENV] = "1"
+
+    profile_file = None
+    if profile:
+        profile_file = get_profile_path(log_file,
+                                        log_capture_options["log_archive"])
+
+    if manifest:
+        entries = load_manifest(
+            manifest,
+            required_keys=MANIFEST_KEYS,
+            defaults={
+                "project_name": project_name,
+                "folder_path": folder_path,
+                "task_name": task_name,
+                "app_name": app_name,
+            }
+        )
+        _publish_batch(entries, env,
+                       timeout=timeout,
+                       stall_timeout=stall_timeout,
+                       output=output,
+                       log_file=log_file,
+                       events_file=events_file,
+                       result_json=result_json,
+                       skip_unchanged=skip_unchanged,
+                       offline_checks=offline_checks,
+                       profile_file=profile_file,
+                       resource_interval=resource_interval,
+                       max_memory_mb=max_memory_mb,
+                       max_cpu_seconds=max_cpu_seconds,
+                       max_open_files=max_open_files,
+                       log_capture_options=log_capture_options)
+        return
+
+    missing = [
+        name for name, value in {
+            "--project_name": project_name,
+            "--folder_path": folder_path,
+            "--task_name": task_name,
+            "--filepath": filepath,
+            "--app_name": app_name,
+        }.items() if not value
+    ]
+    if missing:
+        raise ValueError(
+            "Missing required arguments: {}".format(", ".join(missing)))
+
+    print(f"Using context {project_name} > {folder_path} > {task_name}")
+    print(f"Publishing workfile: {filepath}")
+
+    if not os.path.exists(filepath):
+        raise RuntimeError(f"Filepath does not exist: {filepath}")
+
+    env["PUBLISH_WORKFILE"] = filepath
+
+    # The served host matches just the host name when no variant is given
+    requested_app_name = app_name
+    with tracing.span("find_app_variant", app_name=app_name):
+        app_name = find_app_variant(app_name)
+    context = {
+        "project_name": project_name,
+        "folder_path": folder_path,
+        "task_name": task_name,
+        "app_name": app_name,
+    }
+    report = _get_unlaunched_publish_report(
+        {**context, "filepath": filepath}, env, skip_unchanged, offline_checks
+    )
+    if report:
+        report.update(context)
+        _print_publish_reports([report])
+        if result_json:
+            _write_json(result_json, report)
+        return
+
+    staging_dir = tempfile.mkdtemp(prefix="ayon_launch_scripts_")
+    report_path = os.path.join(staging_dir, "result.json")
+    env["PUBLISH_RESULT_JSON"] = report_path
+    metrics = _get_job_metrics(
+        "publish",
+        project_name=project_name,
+        folder_path=folder_path,
+        task_name=task_name,
+        app_name=app_name,
+        filepath=filepath,
+        workfile_size=os.path.getsize(filepath)
+    )
+    try:
+        if serve_port:
+            returncode = _submit_script(
+                metrics,
+                PUBLISH_SCRIPT_PATH,
+                port=serve_port,
+                project_name=project_name,
+                folder_path=folder_path,
+                task_name=task_name,
+                app_name=requested_app_name,
+                # Only the publish arguments, the served host has its own
+                # application environment
+                env={
+                    **{
+                        key: value for key, value in env.items()
+                        if os.environ.get(key) != value
+                    },
+                    **tracing.get_env()
+                },
+                timeout=timeout
+            )
+        else:
+            returncode = _launch_and_wait(
+                project_name=project_name,
+                folder_path=folder_path,
+                task_name=task_name,
+                app_name=app_name,
+                script_path=PUBLISH_SCRIPT_PATH,
+                env=env,
+                timeout=timeout,
+                stall_timeout=stall_timeout,
+                output=output,
+                log_file=log_file,
+                log_capture=_create_log_capture(**log_capture_options),
+                events_file=events_file,
+                profile_file=profile_file,
+                resource_interval=resource_interval,
+                max_memory_mb=max_memory_mb,
+                max_cpu_seconds=max_cpu_seconds,
+                max_open_files=max_open_files,
+                metrics=metrics
+            )
+        print(f"Application shut down with returncode: {returncode}")
+        report = _read_publish_report(report_path, filepath, returncode)
+    except (RuntimeError, OSError) as exc:
+        # Timed out, stalled or lost the served host, still report and
+        # record the failure
+        print(f"Application failed: {exc}")
+        returncode = 1
+        report = _get_failed_publish_report(filepath, returncode, str(exc))
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    _record_job_metrics(metrics, _get_phase_durations(report))
+
+    report.update(context)
+    _record_publish(report, env)
+    _print_publish_reports([report])
+    if result_json:
+        _write_json(result_json, report)
+    sys.exit(returncode)  # Transfer the error code
+
+
+def _get_failed_publish_report(filepath, returncode, message=None):
+    """Return publish report for a workfile the host never published."""
+    if message is None:
+        message = (
+            f"Application shut down with returncode {returncode} before "
+            "publishing"
+        )
+    return {
+        "filepath": filepath,
+        "status": "failed",
+        "succeed_with_message": False,
+        "message": None,
+        "instances": [],
+        "version_ids": [],
+        "phases": [],
+        "errors": [{"message": message}],
+        "returncode": returncode,
+    }
+
+
+def _get_skipped_publish_report(filepath, message, status="skipped"):
+    """Return publish report for a workfile skipped before launching."""
+    return {
+        "filepath": filepath,
+        "status": status,
+        "succeed_with_message": status == "skipped",
+        "message": message,
+        "instances": [],
+        "version_ids": [],
+        "phases": [],
+        "errors": [],
+        "returncode": 0,
+    }
+
+
+def _get_unlaunched_publish_report(entry,
+                                   env,
+                                   skip_unchanged=False,
+                                   offline_checks=False):
+    """Return publish report if manifest entry can be skipped without launch.
+
+    Returns:
+        Optional[dict]: The report of the skipped publish, if skipped.
+
+    """
+    if skip_unchanged and _is_publish_unchanged(entry, env):
+        from .publish_index import STATUS_UNCHANGED
+
+        return _get_skipped_publish_report(
+            entry["filepath"],
+            "Workfile and its loaded products are unchanged since its last "
+            "publish",
+            status=STATUS_UNCHANGED
+        )
+
+    if offline_checks:
+        from .workfile_checks import get_skip_message
+
+        pre_publish_scripts = [
+            path for path in env.get("PUBLISH_PRE_SCRIPTS", "").split(
+                os.pathsep)
+            if path
+        ]
+        try:
+            message = get_skip_message(entry, pre_publish_scripts)
+        except Exception as exc:
+            print(f"Failed to check workfile before launch: {exc}")
+            message = None
+        if message:
+            print(f"Skipping workfile: {entry['filepath']} ({message})")
+            return _get_skipped_publish_report(entry["filepath"], message)
+    return None
+
+
+def _get_publish_scripts(env):
+    """Return the publish scripts, publishing with others may differ"""
+    return [env.get(key, "") for key in PUBLISH_SCRIPTS_ENV_KEYS]
+
+
+def _is_publish_unchanged(entry, env):
+    """Return whether manifest entry is unchanged since its last publish"""
+    from .publish_index import get_index_key, is_unchanged
+
+    key = get_index_key(entry["project_name"],
+                                entry["folder_path"],
+                                entry["task_name"],
+                                entry["app_name"],
+                                entry["filepath"])
+    try:
+        unchanged = is_unchanged(key,
+                                 entry["project_name"],
+                                 entry["filepath"],
+                                 _get_publish_scripts(env))
+    except Exception as exc:
+        print(f"Failed to look up last publish: {exc}")
+        return False
+    if unchanged:
+        print(f"Skipping unchanged workfile: {entry['filepath']}")
+    return unchanged
+
+
+def _record_publish(report, env):
+    """Record successful publish to skip it while unchanged, never failing"""
+    from .publish_index import (
+        RECORD_PUBLISH_ENV,
+        get_index_key,
+        record_publish
+    )
+
+    if env.get(RECORD_PUBLISH_ENV) != "1":
+        return
+    # Only when the workfile was opened, as such its containers are known
+    if report["status"] not in {"published", "skipped"}:
+        return
+    if report.get("last_version_ids") is None:
+        return
+    key = get_index_key(report["project_name"],
+                        report["folder_path"],
+                        report["task_name"],
+                        report["app_name"],
+                        report["filepath"])
+    try:
+        record_publish(key,
+                       report["project_name"],
+                       report["filepath"],
+                       _get_publish_scripts(env),
+                       report["last_version_ids"])
+    except Exception as exc:
+        print(f"Failed to record publish: {exc}")
 
+
+def _read_publish_report(path, filepath, returncode):
+    """Return the publish report written by the host.
+
+    When the host shut down before writing the report a failed report is
+    returned instead.
+    """
+    if not os.path.exists(path):
+        return _get_failed_publish_report(filepath, returncode)
+    with open(path, "r") as f:
+        report = json.load(f)
+    report["returncode"] = returncode
+    return report
+
+
+def _print_publish_reports(reports):
+    print("Publish results:")
+    for report in reports:
+        message = f"  {report['status']}: {report['filepath']}"
+        if report.get("errors"):
+            message += f" ({report['errors'][0]['message']})"
+        elif report.get("message"):
+            message += f" ({report['message']})"
+        print(message)
+        for instance in report.get("instances", []):
+            state = "published" if instance["published"] else "skipped"
+            print(f"    {state}: {instance['label']}")
+
+
+def _write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def _publish_batch(entries,
+                   env,
+                   log_capture_options=None,
+                   result_json=None,
+                   skip_unchanged=False,
+                   offline_checks=False,
+                   profile_file=None,
+                   timeout=None,
+                   **kwargs):
+    """Publish manifest entries launching one host per project and variant.
+
+    Each host session publishes all its entries one after another so that
+    the host only launches once. A failing entry does not stop the other
+    entries from publishing: entries that can not be launched are reported
+    as failed and when the host crashes the entry it was publishing is
+    reported as failed and a new host session publishes the remaining ones.
+    When the host fails before publishing any entry, all its entries are
+    reported as failed instead since relaunching would fail the same way.
+
+    The `log_capture_options` create a log capture per host session, the
+    reports of all entries are written to `result_json`, if any, each host
+    session is profiled to a file numbered after `profile_file`, if any,
+    entries are skipped before launching with `skip_unchanged` and
+    `offline_checks`, `timeout` applies per entry so a host session gets
+    it multiplied by its number of entries and any other keyword arguments
+    are passed on to `_launch_and_wait`.
+    """
+    # Group the entries per host session. A session can switch between
+    # folders and tasks but not between projects.
+    sessions = {}
+    results = []
+    for entry in entries:
+        if not os.path.exists(entry["filepath"]):
+            message = f"Filepath does not exist: {entry['filepath']}"
+            print(message)
+            report = _get_failed_publish_report(entry["filepath"], None,
+                                                message)
+            results.append({**entry, **report})
+            continue
+        try:
+            app_name = find_app_variant(entry["app_name"])
+        except ValueError as exc:
+            print(f"Failed to find application: {exc}")
+            report = _get_failed_publish_report(entry["filepath"], None,
+                                                str(exc))
+            results.append({**entry, **report})
+            continue
+        entry["app_name"] = app_name
+        report = _get_unlaunched_publish_report(entry, env, skip_unchanged,
+                                                offline_checks)
+        if report:
+            results.append({**entry, **report})
+            continue
+        key = (entry["project_name"], app_name)
+        sessions.setdefault(key, []).append(entry)
+
+    staging_dir = tempfile.mkdtemp(prefix="ayon_launch_scripts_")
+    pending = list(sessions.items())
+    index = 0
+    try:
+        while pending:
+            (project_name, app_name), session_entries = pending.pop(0)
+            print(f"Publishing {len(session_entries)} workfiles in "
+                  f"{app_name} for project {project_name}")
+
+            manifest_path = os.path.join(staging_dir, f"manifest_{index}.json")
+            results_path = os.path.join(staging_dir, f"results_{index}.json")
+            with open(manifest_path, "w") as f:
+                json.dump(session_entries, f)
+
+            session_env = env.copy()
+            session_env["PUBLISH_MANIFEST"] = manifest_path
+            session_env["PUBLISH_BATCH_RESULTS"] = results_path
+
+            # Launch in the context of the first entry
+            first_entry = session_entries[0]
+            session_metrics = {}
+            try:
+                returncode = _launch_and_wait(
+                    project_name=project_name,
+                    folder_path=first_entry["folder_path"],
+                    task_name=first_entry["task_name"],
+                    app_name=app_name,
+                    script_path=PUBLISH_SCRIPT_PATH,
+                    env=session_env,
+                    log_capture=_create_log_capture(
+                        **(log_capture_options or {})),
+                    profile_file=(
+                        "{}_{}.prof".format(
+                            os.path.splitext(profile_file)[0], index)
+                        if profile_file else None
+                    ),
+                    metrics=session_metrics,
+                    timeout=(
+                        timeout * len(session_entries) if timeout else None
+                    ),
+                    **kwargs
+                )
+            except RuntimeError as exc:
+                print(f"Application failed: {exc}")
+                returncode = None
+            print(f"Application shut down with returncode: {returncode}")
+
+            session_results = []
+            if os.path.exists(results_path):
+                with open(results_path, "r") as f:
+                    session_results = json.load(f)
+
+            # The host crashed publishing the first entry it did not report,
+            # the entries after it are published in a new host session.
+            # Without any report the host likely fails to start at all.
+            unreached = session_entries[len(session_results):]
+            failed_entries = unreached[:1] if session_results else unreached
+            for entry in failed_entries:
+                report = _get_failed_publish_report(entry["filepath"],
+                                                    returncode)
+                session_results.append({**entry, **report})
+            if len(unreached) > len(failed_entries):
+                print(f"Relaunching {app_name} for the remaining "
+                      f"{len(unreached) - 1} workfiles")
+                pending.insert(0, ((project_name, app_name), unreached[1:]))
+            for result in session_results:
+                result["returncode"] = returncode
+
+                # Record each entry as a job, the duration and resource usage
+                # are of the whole host session
+                metrics = _get_job_metrics(
+                    "publish_batch",
+                    project_name=result["project_name"],
+                    folder_path=result["folder_path"],
+                    task_name=result["task_name"],
+                    app_name=app_name,
+                    filepath=result["filepath"],
+                    workfile_size=os.path.getsize(result["filepath"]),
+                    peak_rss_bytes=session_metrics.get("peak_rss_bytes"),
+                    cpu_seconds=session_metrics.get("cpu_seconds"),
+                    returncode=1 if result["status"] == "failed" else 0
+                )
+                _record_job_metrics(metrics, _get_phase_durations(result))
+                _record_publish(result, env)
+            results.extend(session_results)
+            index += 1
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    _print_publish_reports(results)
+    if result_json:
+        _write_json(result_json, results)
+
+    failed = [result for result in results if result["status"] == "failed"]
+    print(f"Published {len(results) - len(failed)}/{len(results)} workfiles "
+          f"with {len(failed)} failures")
+    sys.exit(1 if failed else 0)
+
+
+@cli_main.command()
+@click_wrap.option("-project", "--project_name",
+                   required=True,
+                   envvar="AYON_PROJECT_NAME",
+                   help="Project name")
+@click_wrap.option("-folder", "--folder_path",
+                   required=True,
+                   envvar="AYON_FOLDER_PATH",
+                   help="Folder path")
+@click_wrap.option("-task", "--task_name",
+                   required=True,
+                   envvar="AYON_TASK_NAME",
+                   help="Task name")
+@click_wrap.option("-app", "--app_name",
+                   envvar="AYON_APP_NAME",
+                   required=True,
+                   help="App name, specific variant 'maya/2023' or just 'maya'"
+                        " to take latest found variant for which current"
+                        " machine has an existing executable.")
+@click_wrap.option("-port", "--serve_port",
+                   type=int,
+                   help="Local port to accept scripts on. Defaults to 50730.")
+@click_wrap.option("--max_jobs",
+                   type=int,
+                   help="Relaunch the host after it ran this many scripts. "
+                        "Defaults to 50, 0 never relaunches.")
+@click_wrap.option("--max_rss",
+                   type=float,
+                   help="Relaunch the host when its resident memory exceeds "
+                        "this many megabytes after a script.")
+def serve(project_name,
+          folder_path,
+          task_name,
+          app_name,
+          serve_port=None,
+          max_jobs=None,
+          max_rss=None):
+    """Keep a headless host alive to run scripts submitted to it.
+
+    Submit scripts with `run-script --serve_port` or `publish --serve_port`
+    as the same user, or pass the token as `LAUNCH_SCRIPTS_SERVE_TOKEN` to
+    other users. The host is relaunched
+    after `max_jobs` scripts or when exceeding `max_rss` memory so state
+    leaking between scripts can't accumulate indefinitely.
+    """
+    from .serve import (
+        DEFAULT_MAX_JOBS,
+        DEFAULT_PORT,
+        SERVE_MAX_JOBS_ENV,
+        SERVE_MAX_RSS_ENV,
+        SERVE_PORT_ENV,
+        SERVE_TOKEN_ENV,
+        get_token_path,
+        write_token
+    )
+
+    if not serve_port:
+        serve_port = DEFAULT_PORT
+    if max_jobs is None:
+        max_jobs = DEFAULT_MAX_JOBS
     script_path = os.path.join(os.path.dirname(__file__),
                                "scripts",
-                               "publish_script.py")
+                               "serve_script.py")
 
     app_name = find_app_variant(app_name)
-    launched_app = _run_script(
+    print(f"Serving {app_name} for context "
+          f"{project_name} > {folder_path} > {task_name}")
+
+    # Only clients that can read the token file, or were given the token,
+    # can run scripts in the host
+    token = write_token(serve_port, os.environ.get(SERVE_TOKEN_ENV))
+    print(f"Wrote token for clients to: {get_token_path(serve_port)}")
+    try:
+        while True:
+            env = os.environ.copy()
+            env[SERVE_PORT_ENV] = str(serve_port)
+            env[SERVE_MAX_JOBS_ENV] = str(max_jobs or 0)
+            env[SERVE_TOKEN_ENV] = token
+            if max_rss:
+                env[SERVE_MAX_RSS_ENV] = str(max_rss)
+
+            returncode = _launch_and_wait(
+                project_name=project_name,
+                folder_path=folder_path,
+                task_name=task_name,
+                app_name=app_name,
+                script_path=script_path,
+                env=env
+            )
+            if returncode != 0:
+                # Do not keep relaunching a host that fails to serve
+                print(f"Application shut down with returncode: {returncode}")
+                sys.exit(returncode)
+
+            print("Relaunching application..")
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(get_token_path(serve_port))
+
+
+@cli_main.command()
+@click_wrap.option("-manifest", "--manifest",
+                   required=True,
+                   help="JSON file listing entries with 'project_name', "
+                        "'folder_path', 'task_name', 'app_name' and the "
+                        "'filepath' of the script to run.")
+@click_wrap.option("-j", "--jobs",
+                   type=int,
+                   help="Maximum number of applications to run concurrently. "
+                        "Defaults to the number of CPU cores.")
+@click_wrap.option("--timeout",
+                   type=float,
+                   help="Seconds after which the application and all its "
+                        "child processes are terminated.")
+@click_wrap.option("--stall_timeout",
+                   type=float,
+                   help="Seconds without heartbeat or output after which the "
+                        "application is considered stalled. A stack dump of "
+                        "the application is printed before it is "
+                        "terminated.")
+def run_batch(manifest,
+              jobs=None,
+              timeout=None,
+              stall_timeout=None):
+    """Run the scripts listed in a manifest in concurrent headless hosts."""
+    entries = load_manifest(manifest, required_keys=MANIFEST_KEYS)
+    if not jobs:
+        jobs = os.cpu_count() or 1
+
+    # Launching runs the application's prelaunch hooks which are not
+    # guaranteed to be thread-safe, so only the launch is serialized
+    launch_lock = threading.Lock()
+    # Set on interrupt to terminate the running applications
+    stop_event = threading.Event()
+    width = len(str(len(entries)))
+
+    def run_entry(index, entry):
+        label = f"[{index:0{width}d}] {entry['app_name']}"
+        start = time.time()
+        try:
+            with launch_lock:
+                app_name = find_app_variant(entry["app_name"])
+            if stop_event.is_set():
+                raise RuntimeError("Batch was interrupted")
+            returncode = _launch_and_wait(
+                project_name=entry["project_name"],
+                folder_path=entry["folder_path"],
+                task_name=entry["task_name"],
+                app_name=app_name,
+                script_path=entry["filepath"],
+                env=os.environ.copy(),
+                timeout=timeout,
+                stall_timeout=stall_timeout,
+                prefix=f"{label}: ",
+                launch_lock=launch_lock,
+                stop_event=stop_event
+            )
+        except Exception as exc:
+            print(f"{label}: Failed to run: {exc}")
+            returncode = 1
+
+        print(f"{label}: Application shut down with returncode: {returncode}")
+        return returncode, time.time() - start
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    print(f"Running {len(entries)} scripts with {jobs} concurrent jobs")
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = [
+            executor.submit(run_entry, index, entry)
+            for index, entry in enumerate(entries)
+        ]
+        results = [future.result() for future in futures]
+    except KeyboardInterrupt:
+        # Only this thread is interrupted, so stop the queued entries and
+        # let each worker terminate its application
+        print("Interrupted, terminating running applications..")
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    print("Batch results:")
+    for index, (entry, (returncode, duration)) in enumerate(
+        zip(entries, results)
+    ):
+        print(f"  [{index:0{width}d}] returncode {returncode} "
+              f"in {duration:.1f}s: {entry['project_name']} > "
+              f"{entry['folder_path']} > {entry['task_name']} > "
+              f"{entry['app_name']} > {entry['filepath']}")
+
+    failed = sum(1 for returncode, _duration in results if returncode != 0)
+    print(f"Finished {len(results) - failed}/{len(results)} scripts "
+          f"with {failed} failures")
+    sys.exit(1 if failed else 0)
+
+
+@cli_main.command()
+@click_wrap.option("--clear",
+                   is_flag=True,
+                   default=False,
+                   help="Remove all cached entries and statistics.")
+def cache(clear=False):
+    """Show statistics of the on-disk caches or clear them."""
+    from .publish_index import PUBLISH_INDEX
+
+    for json_cache in CACHES + (PUBLISH_INDEX,):
+        if clear:
+            json_cache.invalidate()
+            print(f"Cleared cache: {json_cache.name}")
+            continue
+
+        stats = json_cache.get_stats()
+        print(f"{json_cache.name}: {stats['entries']} entries, "
+              f"{stats['hits']} hits, {stats['misses']} misses "
+              f"({json_cache.path})")
+
+
+@cli_main.command()
+@click_wrap.option("-project", "--project_name",
+                   required=True,
+                   envvar="AYON_PROJECT_NAME",
+                   help="Project name")
+@click_wrap.option("-folder", "--folder_path",
+                   help="Only include tasks of this folder and its "
+                        "subfolders. Defaults to the whole project.")
+@click_wrap.option("-app", "--app_name",
+                   required=True,
+                   help="App name, e.g. 'maya/2023' or just 'maya'. Its host "
+                        "defines the workfile template and extensions.")
+@click_wrap.option("-j", "--jobs",
+                   type=int,
+                   default=16,
+                   help="Amount of work directories to scan in parallel.")
+@click_wrap.option("--manifest_json",
+                   help="Write the found workfiles to this JSON file as "
+                        "manifest for `publish --manifest`.")
+def last_workfiles(project_name,
+                   app_name,
+                   folder_path=None,
+                   jobs=16,
+                   manifest_json=None):
+    """List the last workfile of each task in a project or folder."""
+    workfiles = get_last_workfiles(
         project_name=project_name,
+        host_name=app_name.split("/", 1)[0],
         folder_path=folder_path,
-        task_name=task_name,
-        app_name=app_name,
-        script_path=script_path,
-        env=env
+        max_workers=jobs
+    )
+    for workfile in workfiles:
+        print(f"{workfile['folder_path']} > {workfile['task_name']}: "
+              f"{workfile['filepath']} (v{workfile['version']:03d})")
+    print(f"Found {len(workfiles)} workfiles")
+
+    if manifest_json:
+        _write_json(manifest_json, [
+            {
+                "project_name": project_name,
+                "folder_path": workfile["folder_path"],
+                "task_name": workfile["task_name"],
+                "app_name": app_name,
+                "filepath": workfile["filepath"],
+            }
+            for workfile in workfiles
+        ])
+        print(f"Wrote manifest to: {manifest_json}")
+
+
+@cli_main.command()
+@click_wrap.option("-path", "--filepath",
+                   required=True,
+                   help="Maya ASCII workfile to inspect.")
+@click_wrap.option("--result_json",
+                   help="Write the containers, instances and references to "
+                        "this JSON file.")
+def inspect_workfile(filepath, result_json=None):
+    """List containers, instances and references of a Maya ASCII workfile.
+
+    The workfile is read without launching Maya.
+    """
+    from .maya_ascii import inspect_maya_ascii
+
+    info = inspect_maya_ascii(filepath)
+    print(f"Containers ({len(info['containers'])}):")
+    for container in info["containers"]:
+        print(f"  {container['name']}: {container['representation']}")
+    print(f"Instances ({len(info['instances'])}):")
+    for instance in info["instances"]:
+        state = "active" if instance["active"] else "inactive"
+        print(f"  {instance['name']}: {instance['productType']} ({state})")
+    print(f"References ({len(info['references'])}):")
+    for reference in info["references"]:
+        print(f"  {reference}")
+
+    if result_json:
+        _write_json(result_json, info)
+
+
+@cli_main.command()
+@click_wrap.option("--group_by",
+                   multiple=True,
+                   default=["host"],
+                   help="Group jobs by 'host', 'app', 'project', 'task' or "
+                        "'command'. Can be passed multiple times.")
+@click_wrap.option("--phase",
+                   help="Phase to report the durations of, e.g. "
+                        "'open_workfile'. Defaults to the whole job.")
+@click_wrap.option("--days",
+                   type=float,
+                   help="Only include jobs of the last amount of days.")
+@click_wrap.option("-project", "--project_name",
+                   help="Only include jobs of this project.")
+@click_wrap.option("--host_name",
+                   help="Only include jobs of this host, e.g. 'maya'.")
+@click_wrap.option("--compare_days",
+                   type=float,
+                   help="Compare the jobs of the last amount of days with "
+                        "the same amount of days before.")
+@click_wrap.option("--compare_versions",
+                   nargs=2,
+                   help="Compare the jobs of two addon versions, e.g. "
+                        "'--compare_versions 1.0.0 1.1.0'.")
+@click_wrap.option("--compare_bundles",
+                   nargs=2,
+                   help="Compare the jobs of two bundles.")
+@click_wrap.option("--threshold",
+                   type=float,
+                   default=20.0,
+                   help="Percentage a phase must have become slower to be "
+                        "flagged as regression when comparing.")
+def stats(group_by=("host",),
+          phase=None,
+          days=None,
+          project_name=None,
+          host_name=None,
+          compare_days=None,
+          compare_versions=None,
+          compare_bundles=None,
+          threshold=20.0):
+    """Show job duration percentiles or compare them to find regressions."""
+    from .metrics import (
+        GROUP_BY_COLUMNS,
+        TOTAL_PHASE,
+        MetricsStore,
+        compare as compare_metrics,
+        summarize as summarize_metrics
     )
 
-    print_stdout_until_timeout(launched_app, timeout, app_name)
+    if not phase:
+        phase = TOTAL_PHASE
+    unknown = set(group_by) - set(GROUP_BY_COLUMNS)
+    if unknown:
+        raise ValueError(
+            "Group by must be any of {}, got: {}".format(
+                ", ".join(GROUP_BY_COLUMNS), ", ".join(sorted(unknown))))
+
+    store = MetricsStore()
+    filters = {"project_name": project_name, "host_name": host_name}
+    now = time.time()
+
+    if compare_days or compare_versions or compare_bundles:
+        if compare_days:
+            window = compare_days * 24 * 60 * 60
+            label = (
+                f"last {compare_days:g} days vs the {compare_days:g} days "
+                "before"
+            )
+            baseline = store.get_jobs(since=now - 2 * window,
+                                      until=now - window,
+                                      **filters)
+            current = store.get_jobs(since=now - window, **filters)
+        else:
+            key, (old, new) = (
+                ("addon_version", compare_versions) if compare_versions
+                else ("bundle_name", compare_bundles)
+            )
+            label = f"{key} {new} vs {old}"
+            since = now - days * 24 * 60 * 60 if days else None
+            baseline = store.get_jobs(since=since, **{key: old}, **filters)
+            current = store.get_jobs(since=since, **{key: new}, **filters)
+
+        rows = compare_metrics(baseline, current, group_by, threshold)
+        print(f"Comparing {label} ({len(current)} vs {len(baseline)} jobs)")
+        if not rows:
+            print("No jobs to compare")
+            return
+        width = max(len(row["group"]) for row in rows)
+        phase_width = max(len(row["phase"]) for row in rows)
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['group']:<{width}}  {row['phase']:<{phase_width}}  "
+                  f"{row['baseline']:>9.2f}s -> {row['current']:>9.2f}s  "
+                  f"{row['change']:>+7.1f}%  "
+                  f"({row['baseline_jobs']} -> {row['current_jobs']} jobs)"
+                  f"{flag}")
+        regressions = sum(1 for row in rows if row["regression"])
+        print(f"Found {regressions} regressions of more than "
+              f"{threshold:g}% slower")
+        return
+
+    since = now - days * 24 * 60 * 60 if days else None
+    rows = summarize_metrics(store.get_jobs(since=since, **filters),
+                             group_by,
+                             phase)
+    print(f"Durations of {phase} in seconds ({store.path})")
+    if not rows:
+        print("No jobs recorded")
+        return
+
+    def format_value(value, scale=1.0):
+        return f"{value / scale:>8.1f}" if value is not None else f"{'-':>8}"
+
+    header = " > ".join(group_by)
+    width = max(len(header), *(len(row["group"]) for row in rows))
+    print(f"{header:<{width}}  {'jobs':>6}  {'failed':>6}  "
+          f"{'p50':>8}  {'p90':>8}  {'p99':>8}  {'max':>8}  "
+          f"{'rss p50':>8}  {'rss max':>8}")
+    megabyte = 1024 * 1024
+    for row in rows:
+        print(f"{row['group']:<{width}}  {row['jobs']:>6}  "
+              f"{row['failed']:>6}  {format_value(row['p50'])}  "
+              f"{format_value(row['p90'])}  {format_value(row['p99'])}  "
+              f"{format_value(row['max'])}  "
+              f"{format_value(row['rss_p50'], megabyte)}  "
+              f"{format_value(row['rss_max'], megabyte)}")
+    print("Memory in megabytes")
+
+
+@cli_main.command()
+@click_wrap.option("-project", "--project_name",
+                   required=True,
+                   envvar="AYON_PROJECT_NAME",
+                   help="Project name")
+@click_wrap.option("-folder", "--folder_path",
+                   required=True,
+                   envvar="AYON_FOLDER_PATH",
+                   help="Folder path")
+@click_wrap.option("-task", "--task_name",
+                   required=True,
+                   envvar="AYON_TASK_NAME",
+                   help="Task name")
+@click_wrap.option("-app", "--app_name",
+                   multiple=True,
+                   help="App name, specific variant 'maya/2023' or just "
+                        "'maya' for all its variants. Defaults to all "
+                        "variants with an executable on this machine. Can be "
+                        "passed multiple times.")
+@click_wrap.option("-n", "--count",
+                   type=int,
+                   default=5,
+                   help="Amount of times to launch each variant.")
+@click_wrap.option("--timeout",
+                   type=float,
+                   default=600.0,
+                   help="Seconds after which a launch is terminated.")
+@click_wrap.option("--import_time",
+                   is_flag=True,
+                   default=False,
+                   help="Also measure the Python import time on startup, if "
+                        "the host's Python supports `PYTHONPROFILEIMPORTTIME`."
+                        " This slows down the startup itself.")
+@click_wrap.option("--result_json",
+                   help="Write all measurements and distributions to this "
+                        "JSON file.")
+def bench_startup(project_name,
+                  folder_path,
+                  task_name,
+                  app_name=(),
+                  count=5,
+                  timeout=600.0,
+                  import_time=False,
+                  result_json=None):
+    """Measure the cold start latency of application variants."""
+    from .startup_benchmark import (
+        get_supported_app_names,
+        measure_startup,
+        summarize_startups
+    )
+
+    app_names = get_supported_app_names(get_application_manager())
+    if app_name:
+        app_names = [
+            name for name in app_names
+            if name in app_name or name.split("/", 1)[0] in app_name
+        ]
+    if not app_names:
+        raise ValueError("No application variants found to benchmark")
+
+    results = {}
+    for name in app_names:
+        measurements = []
+        for index in range(count):
+            print(f"Launching {name} ({index + 1}/{count})")
+            try:
+                measurement = measure_startup(
+                    project_name=project_name,
+                    folder_path=folder_path,
+                    task_name=task_name,
+                    app_name=name,
+                    timeout=timeout,
+                    import_time=import_time
+                )
+            except Exception as exc:
+                print(f"Failed to launch {name}: {exc}")
+                continue
+            if measurement["returncode"] != 0:
+                print(f"{name} exited with returncode "
+                      f"{measurement['returncode']}")
+            measurements.append(measurement)
+        results[name] = {
+            "measurements": measurements,
+            "distribution": summarize_startups(measurements),
+        }
+
+    print("Startup seconds per variant (min / p50 / p90 / max):")
+    for name, variant_results in results.items():
+        print(f"{name} ({len(variant_results['measurements'])} launches)")
+        for metric, distribution in variant_results["distribution"].items():
+            if distribution is None:
+                print(f"  {metric:<13} -")
+                continue
+            print(f"  {metric:<13} {distribution['min']:>8.2f} "
+                  f"{distribution['p50']:>8.2f} {distribution['p90']:>8.2f} "
+                  f"{distribution['max']:>8.2f}")
 
-    launched_app.wait()  # ensure we wait so that we can get the return code
-    print(f"Application shut down with returncode: {launched_app.returncode}")
-    sys.exit(launched_app.returncode)  # Transfer the error code
+    if result_json:
+        _write_json(result_json, results)
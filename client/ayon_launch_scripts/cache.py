@@ -0,0 +1,225 @@
+"""Small on-disk caches shared between processes of the same machine.
+
+Jobs usually run as separate processes so in-memory caching would not help
+when fanning out many jobs. Instead these caches are stored as JSON files in
+the AYON launcher local directory, or in `AYON_LAUNCH_SCRIPTS_CACHE_DIR` when
+set. Writes are atomic, but concurrent writers may drop each other's entries
+which is acceptable for a cache.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "AYON_LAUNCH_SCRIPTS_CACHE_DIR"
+
+# Disable all caching when set to "0"
+CACHE_ENABLED_ENV = "AYON_LAUNCH_SCRIPTS_CACHE"
+
+
+def get_cache_dir() -> str:
+    """Return directory to store the on-disk caches in."""
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir:
+        return cache_dir
+
+    try:
+        from ayon_core.lib import get_launcher_local_dir
+        return get_launcher_local_dir("launch_scripts")
+    except ImportError:
+        # Older ayon-core
+        from ayon_core.lib import get_ayon_appdirs
+        return get_ayon_appdirs("launch_scripts")
+
+
+def get_bundle_name() -> str:
+    """Return the active bundle name to key cached settings by."""
+    return (
+        os.environ.get("AYON_BUNDLE_NAME")
+        or os.environ.get("AYON_STUDIO_BUNDLE_NAME")
+        or ""
+    )
+
+
+def is_cache_enabled() -> bool:
+    return os.environ.get(CACHE_ENABLED_ENV) != "0"
+
+
+class JsonCache:
+    """Key-value cache persisted as a JSON file.
+
+    Entries expire after `ttl` seconds and the oldest entries are evicted
+    when exceeding `max_entries`.
+
+    Args:
+        name (str): Name of the cache, used as filename.
+        ttl (Optional[float]): Seconds after which an entry expires.
+        max_entries (Optional[int]): Maximum amount of entries to keep.
+        track_stats (bool): Persist hit and miss counts. Each lookup
+            appends a byte to a separate stats file instead of rewriting
+            the cache, the counts are folded into the cache on `set`.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        track_stats: bool = False
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.track_stats = track_stats
+        self._path = None
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            self._path = os.path.join(get_cache_dir(), f"{self.name}.json")
+        return self._path
+
+    @property
+    def stats_path(self) -> str:
+        return os.path.join(get_cache_dir(), f"{self.name}.stats")
+
+    def _record_lookup(self, hit: bool):
+        try:
+            os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+            with open(self.stats_path, "ab") as f:
+                f.write(b"h" if hit else b"m")
+        except OSError as exc:
+            log.debug(f"Failed to record cache lookup: {exc}")
+
+    def _pop_lookups(self) -> tuple:
+        """Return and remove hits and misses recorded since last `set`."""
+        try:
+            with open(self.stats_path, "rb") as f:
+                lookups = f.read()
+            os.remove(self.stats_path)
+        except OSError:
+            return 0, 0
+        return lookups.count(b"h"), lookups.count(b"m")
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            log.warning(f"Ignoring unreadable cache {self.path}: {exc}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self, data: dict):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to temporary file first so readers never see partial data
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            log.warning(f"Failed to write cache {self.path}: {exc}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(
+        self,
+        key: str,
+        validate: Optional[Callable[[Any], bool]] = None
+    ) -> Optional[Any]:
+        """Return cached value or None if missing, expired or invalid.
+
+        Args:
+            key (str): Cache key.
+            validate (Optional[Callable[[Any], bool]]): Additional check
+                whether the cached value is still valid.
+
+        """
+        if not is_cache_enabled():
+            return None
+
+        value = self._get_valid_value(self._load(), key, validate)
+        if self.track_stats:
+            self._record_lookup(value is not None)
+        return value
+
+    def _get_valid_value(self, data, key, validate):
+        entry = data.get("entries", {}).get(key)
+        if entry is None:
+            return None
+
+        if self.ttl and time.time() - entry["time"] > self.ttl:
+            return None
+
+        value = entry["value"]
+        if validate is not None and not validate(value):
+            return None
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store value in the cache."""
+        if not is_cache_enabled():
+            return
+
+        data = self._load()
+        entries = data.setdefault("entries", {})
+        entries[key] = {"time": time.time(), "value": value}
+
+        if self.max_entries and len(entries) > self.max_entries:
+            oldest = sorted(entries, key=lambda k: entries[k]["time"])
+            for old_key in oldest[:len(entries) - self.max_entries]:
+                entries.pop(old_key)
+
+        if self.track_stats:
+            hits, misses = self._pop_lookups()
+            stats = data.setdefault("stats", {"hits": 0, "misses": 0})
+            stats["hits"] += hits
+            stats["misses"] += misses
+        self._save(data)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Remove an entry, or all entries and stats when no key is given."""
+        if key is None and self.track_stats:
+            self._pop_lookups()
+        data = self._load()
+        if not data:
+            return
+        if key is None:
+            data = {}
+        elif data.get("entries", {}).pop(key, None) is None:
+            return
+        self._save(data)
+
+    def get_stats(self) -> dict:
+        """Return amount of entries and hit and miss counts.
+
+        Returns:
+            dict: With `entries`, `hits` and `misses` keys.
+
+        """
+        data = self._load()
+        stats = data.get("stats", {})
+        hits = stats.get("hits", 0)
+        misses = stats.get("misses", 0)
+        if self.track_stats:
+            try:
+                with open(self.stats_path, "rb") as f:
+                    lookups = f.read()
+            except OSError:
+                lookups = b""
+            hits += lookups.count(b"h")
+            misses += lookups.count(b"m")
+        return {
+            "entries": len(data.get("entries", {})),
+            "hits": hits,
+            "misses": misses,
+        }
@@ -0,0 +1,134 @@
+"""Machine-readable event stream from the launched host.
+
+Inside the host `emit()` appends events as JSON lines to the file passed by
+the CLI through `LAUNCH_SCRIPTS_EVENTS_FILE`. Each event is an object with
+at least a `type` and `time` key, e.g.:
+    {"type": "phase_start", "time": 1700000000.0, "phase": "publish"}
+
+Event types emitted by the publish script:
+    - `phase_start` / `phase_end`: with `phase` and optionally `script` or
+        `filepath`. `phase_end` also has `duration` in seconds.
+    - `instance`: with `label`, `product_type` and `active`.
+    - `plugin`: with `plugin`, `instance`, `success` and `duration`.
+    - `progress`: with `progress` percentage.
+    - `error`: with `message` and optionally `plugin` and `instance`.
+    - `timings`: with `filepath` and the `phases`, `plugins` and `instances`
+        timings, each a list of `name`, `duration` and `count`.
+
+Other tools can read the file with `EventReader` instead of scraping stdout.
+
+`EventReader` holds back a partially written last line until a later read, so
+it can follow the file while the host is still writing to it.
+"""
+import json
+import os
+import time
+from typing import List
+
+from . import heartbeat
+
+EVENTS_FILE_ENV = "LAUNCH_SCRIPTS_EVENTS_FILE"
+
+
+def emit(event_type: str, **data):
+    """Append an event to the event stream, if any.
+
+    This also reports a heartbeat since any event means progress.
+
+    Args:
+        event_type (str): The event type.
+        **data: JSON serializable data of the event.
+
+    """
+    event = {"type": event_type, "time": time.time()}
+    event.update(data)
+    line = json.dumps(event, default=str)
+
+    path = os.environ.get(EVENTS_FILE_ENV)
+    if path:
+        with open(path, "a") as f:
+            f.write(line + "\n")
+
+    heartbeat.beat(line)
+
+
+class EventReader:
+    """Read events appended to an event stream file.
+
+    Args:
+        path (str): The events file.
+        from_end (bool): Skip the events already in the file.
+
+    """
+
+    def __init__(self, path: str, from_end: bool = False):
+        self.path = path
+        self._offset = 0
+        if from_end and os.path.exists(path):
+            self._offset = os.path.getsize(path)
+        self._partial = b""
+
+    def read(self) -> List[dict]:
+        """Return the events appended since the previous read."""
+        try:
+            if os.path.getsize(self.path) <= self._offset:
+                return []
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return []
+        self._offset += len(data)
+
+        # The last line may still be partially written
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+
+        events = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line.decode("utf-8")))
+            except ValueError:
+                continue
+        return events
+
+
+class EventProgressPrinter:
+    """Print progress of the launched host from its event stream.
+
+    Call the printer periodically while the host runs.
+
+    Args:
+        path (str): The events file the host writes to.
+        prefix (str): Prefix for printed lines.
+
+    """
+
+    def __init__(self, path: str, prefix: str = "Progress: "):
+        self.reader = EventReader(path, from_end=True)
+        self.prefix = prefix
+
+    def __call__(self):
+        for event in self.reader.read():
+            message = self.format_event(event)
+            if message:
+                print(f"{self.prefix}{message}")
+
+    @staticmethod
+    def format_event(event: dict) -> str:
+        event_type = event.get("type")
+        if event_type == "phase_start":
+            target = event.get("script") or event.get("filepath") or ""
+            return f"Started {event['phase']} {target}".rstrip()
+        if event_type == "phase_end":
+            return (
+                f"Finished {event['phase']} in "
+                f"{event.get('duration', 0):.1f}s"
+            )
+        if event_type == "progress":
+            return f"{event['progress']}%"
+        if event_type == "error":
+            return f"Error: {event.get('message')}"
+        return ""
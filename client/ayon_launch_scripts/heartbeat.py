@@ -0,0 +1,212 @@
+"""Heartbeats from the launched host to detect stalled sessions.
+
+Inside the host call `beat()` whenever progress is made. It touches the
+heartbeat file passed by the CLI through `LAUNCH_SCRIPTS_HEARTBEAT_FILE`.
+The CLI uses `HeartbeatMonitor` to detect that neither a heartbeat nor any
+output occurred for a while, after which it requests a Python stack dump from
+the host before terminating it so it's visible where the host stalled.
+
+On Linux and macOS the stack dump is triggered with `SIGUSR1` through
+`faulthandler`. Windows has no such signal so there the host arms
+`faulthandler.dump_traceback_later` with the stall timeout on each heartbeat
+instead.
+
+Houdini, Blender and Nuke run the script through `scripts/heartbeat_script.py`
+which calls `install()` first, so stalls before the first heartbeat are dumped
+too.
+"""
+import faulthandler
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from typing import Optional
+
+HEARTBEAT_FILE_ENV = "LAUNCH_SCRIPTS_HEARTBEAT_FILE"
+STACK_DUMP_FILE_ENV = "LAUNCH_SCRIPTS_STACK_DUMP_FILE"
+STALL_TIMEOUT_ENV = "LAUNCH_SCRIPTS_STALL_TIMEOUT"
+WRAPPED_SCRIPT_ENV = "LAUNCH_SCRIPTS_HEARTBEAT_SCRIPT"
+
+WRAPPER_SCRIPT_PATH = os.path.join(os.path.dirname(__file__),
+                                   "scripts",
+                                   "heartbeat_script.py")
+
+# Seconds to wait for the host to write the stack dump
+STACK_DUMP_WAIT = 2.0
+
+# Opened stack dump file, faulthandler requires it to remain open
+_stack_dump_file = None
+
+
+def install():
+    """Register the stack dump handler in the host.
+
+    This is called on the first `beat()` but can be called earlier to also
+    support stack dumps when stalling before the first heartbeat.
+    """
+    global _stack_dump_file
+    if _stack_dump_file is not None:
+        return
+
+    path = os.environ.get(STACK_DUMP_FILE_ENV)
+    if not path:
+        return
+
+    _stack_dump_file = open(path, "a")
+    if hasattr(signal, "SIGUSR1"):
+        # Do not chain, the default action of SIGUSR1 is to terminate
+        faulthandler.register(signal.SIGUSR1,
+                              file=_stack_dump_file,
+                              all_threads=True,
+                              chain=False)
+
+    # Write the process id so the CLI knows which process to signal, the
+    # launched process may be a wrapper around the actual host process
+    beat("Installed stack dump handler")
+
+
+def beat(message: str = ""):
+    """Report progress to the CLI that launched this host.
+
+    Args:
+        message (str): Optional description of the current progress.
+
+    """
+    path = os.environ.get(HEARTBEAT_FILE_ENV)
+    if not path:
+        return
+
+    install()
+    with open(path, "w") as f:
+        f.write(f"{os.getpid()}\n{message}")
+
+    stall_timeout = os.environ.get(STALL_TIMEOUT_ENV)
+    if (
+        stall_timeout
+        and _stack_dump_file is not None
+        and not hasattr(signal, "SIGUSR1")
+    ):
+        # Dump the stack ourselves if no heartbeat follows in time. This
+        # cancels the previously armed dump.
+        faulthandler.dump_traceback_later(float(stall_timeout),
+                                          file=_stack_dump_file)
+
+
+def wrap_script(script_path: str, env: dict) -> str:
+    """Return the script to launch to install the handler before `script_path`.
+
+    For hosts that run the script directly, without a launch script or
+    command in which `install()` can be called first.
+
+    Args:
+        script_path (str): The python script to run.
+        env (dict): Environment for the host to launch, updated in place.
+
+    Returns:
+        str: The wrapper script to run in the host instead.
+
+    """
+    env[WRAPPED_SCRIPT_ENV] = script_path
+    return WRAPPER_SCRIPT_PATH
+
+
+class HeartbeatMonitor:
+    """Detect a stalled host from its heartbeats and output.
+
+    Args:
+        stall_timeout (float): Seconds without heartbeat or output after
+            which the host is considered stalled.
+
+    """
+
+    def __init__(self, stall_timeout: float):
+        self.stall_timeout = stall_timeout
+        self._directory = tempfile.mkdtemp(prefix="ayon_launch_scripts_")
+        self.heartbeat_path = os.path.join(self._directory, "heartbeat")
+        self.stack_dump_path = os.path.join(self._directory, "stack.txt")
+        self._last_activity = time.time()
+
+    def get_env(self) -> dict:
+        """Return environment variables to pass to the launched host."""
+        return {
+            HEARTBEAT_FILE_ENV: self.heartbeat_path,
+            STACK_DUMP_FILE_ENV: self.stack_dump_path,
+            STALL_TIMEOUT_ENV: str(self.stall_timeout),
+        }
+
+    def notify_output(self):
+        """Register output of the host as activity."""
+        self._last_activity = time.time()
+
+    def _read_heartbeat(self):
+        try:
+            with open(self.heartbeat_path, "r") as f:
+                pid, _, message = f.read().partition("\n")
+            return int(pid), message
+        except (OSError, ValueError):
+            return None, ""
+
+    def is_stalled(self) -> bool:
+        last_activity = self._last_activity
+        try:
+            last_activity = max(last_activity,
+                                os.stat(self.heartbeat_path).st_mtime)
+        except OSError:
+            pass
+        return time.time() - last_activity > self.stall_timeout
+
+    def get_stack_dump(self) -> Optional[str]:
+        """Request and return a stack dump of the stalled host.
+
+        Returns:
+            Optional[str]: The stack dump or None if the host did not
+                write any.
+
+        """
+        pid, message = self._read_heartbeat()
+        if message:
+            print(f"Last heartbeat: {message}")
+
+        if pid and hasattr(signal, "SIGUSR1"):
+            try:
+                os.kill(pid, signal.SIGUSR1)
+            except OSError:
+                pass
+            else:
+                time.sleep(STACK_DUMP_WAIT)
+
+        try:
+            with open(self.stack_dump_path, "r") as f:
+                return f.read() or None
+        except OSError:
+            return None
+
+    def cleanup(self):
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+def start_monitor(
+    env: dict,
+    stall_timeout: Optional[float]
+) -> Optional[HeartbeatMonitor]:
+    """Return heartbeat monitor and pass its settings in `env`.
+
+    Args:
+        env (dict): Environment for the host to launch, updated in place.
+        stall_timeout (Optional[float]): Seconds without progress after which
+            the host is considered stalled. No monitor is created if not set.
+
+    Returns:
+        Optional[HeartbeatMonitor]: The monitor, if any.
+
+    """
+    if not stall_timeout:
+        return None
+    monitor = HeartbeatMonitor(stall_timeout)
+    env.update(monitor.get_env())
+    if sys.platform == "win32":
+        # Make sure faulthandler writes the dump before the CLI gives up
+        monitor.stall_timeout += STACK_DUMP_WAIT
+    return monitor
@@ -1,22 +1,240 @@
+import json
 import logging
 import os
+import queue
+import signal
 import subprocess
 import sys
+import threading
 import time
-from typing import Optional
-
-from ayon_applications import ApplicationManager
-from ayon_core.pipeline import Anatomy, registered_host
-from ayon_core.pipeline.context_tools import get_current_project_name
-from ayon_core.pipeline.template_data import get_template_data_with_names
-from ayon_core.pipeline.workfile import (
-    get_workfile_template_key_from_context,
-    get_last_workfile_with_version,
-    get_workdir_with_workdir_data
-)
+from typing import Callable, Iterable, Optional
+
+from .cache import JsonCache, get_bundle_name
+from .heartbeat import HeartbeatMonitor
+from .logcapture import LogCapture
+
+# `ayon_applications` and `ayon_core.pipeline` are imported where used, this
+# module is imported on addon discovery so it must stay cheap to import.
 
 log = logging.getLogger(__name__)
 
+# Ways to handle the output of launched applications
+OUTPUT_RELAY = "relay"  # Print each line prefixed with application name
+OUTPUT_RAW = "raw"  # Forward output in chunks as is
+OUTPUT_INHERIT = "inherit"  # Application writes directly to our stdout
+OUTPUT_MODES = (OUTPUT_RELAY, OUTPUT_RAW, OUTPUT_INHERIT)
+OUTPUT_CHUNK_SIZE = 64 * 1024
+# Seconds between checks for timeouts, heartbeats and events
+POLL_INTERVAL = 1.0
+# Context of the launched application, always set explicitly
+CONTEXT_ENV_KEYS = (
+    "AYON_PROJECT_NAME",
+    "AYON_FOLDER_PATH",
+    "AYON_TASK_NAME",
+    "AYON_APP_NAME",
+    "AYON_HOST_NAME",
+)
+# Variables that select the server, bundle and settings the application
+# environment is resolved from
+SETTINGS_ENV_KEYS = (
+    "AYON_SERVER_URL",
+    "AYON_BUNDLE_NAME",
+    "AYON_STUDIO_BUNDLE_NAME",
+    "AYON_USE_STAGING",
+    "AYON_USE_DEV",
+    "AYON_DEFAULT_SETTINGS_VARIANT",
+)
+# Additional variables referenced by the application environment settings,
+# separated by commas
+ENVIRONMENT_KEYS_ENV = "AYON_LAUNCH_SCRIPTS_ENVIRONMENT_KEYS"
+
+# Resolved application variants and executables per bundle
+_APP_EXECUTABLE_CACHE = JsonCache("app_executables", ttl=24 * 60 * 60)
+# Resolved application environments per bundle and context
+_APP_ENVIRONMENT_CACHE = JsonCache(
+    "app_environments", ttl=60 * 60, max_entries=256, track_stats=True
+)
+# Last workfile per work directory, per project and host, validated by the
+# directory modification time
+_WORKFILE_INDEX_CACHE = JsonCache("workfile_index", max_entries=64)
+CACHES = (_APP_EXECUTABLE_CACHE, _APP_ENVIRONMENT_CACHE, _WORKFILE_INDEX_CACHE)
+# Objects built from the settings, shared within this process per bundle
+_SESSION_CACHE = {}
+
+
+def _get_session_cached(key: str, create: Callable):
+    """Return object shared within this process, created once per bundle"""
+    bundle_name = get_bundle_name()
+    cached = _SESSION_CACHE.get(key)
+    if cached is None or cached[0] != bundle_name:
+        cached = (bundle_name, create())
+        _SESSION_CACHE[key] = cached
+    return cached[1]
+
+
+def clear_session_cache():
+    """Create the application manager and host extensions again on next use.
+
+    They are otherwise only created again when the active bundle changes,
+    so call this to pick up changed settings in a long running process like
+    the tray.
+    """
+    _SESSION_CACHE.clear()
+
+
+def get_application_manager():
+    """Return the ApplicationManager shared within this process.
+
+    Returns:
+        ApplicationManager: The application manager.
+
+    """
+    def create():
+        from ayon_applications import ApplicationManager
+
+        return ApplicationManager()
+
+    return _get_session_cached("application_manager", create)
+
+
+def _is_cached_executable_valid(value):
+    """Return whether cached executable was not modified since caching"""
+    try:
+        return os.stat(value["executable"]).st_mtime == value["mtime"]
+    except OSError:
+        return False
+
+
+def _cache_app_executable(app_names, app_name, executable):
+    """Store resolved application and executable for the given names"""
+    executable = str(executable)
+    try:
+        mtime = os.stat(executable).st_mtime
+    except OSError:
+        return
+    value = {"app_name": app_name, "executable": executable, "mtime": mtime}
+    bundle_name = get_bundle_name()
+    for name in app_names:
+        _APP_EXECUTABLE_CACHE.set(f"{bundle_name}|{name}", value)
+
+
+def find_app_executable(app):
+    """Return existing executable for application.
+
+    The result is cached on disk per bundle until the executable changes.
+
+    Args:
+        app (Application): The application.
+
+    Returns:
+        Optional[ApplicationExecutable]: The executable, if any found.
+
+    """
+    cached = _APP_EXECUTABLE_CACHE.get(
+        f"{get_bundle_name()}|{app.full_name}",
+        validate=_is_cached_executable_valid
+    )
+    if cached:
+        from ayon_applications import ApplicationExecutable
+
+        return ApplicationExecutable(cached["executable"])
+
+    executable = app.find_executable()
+    if executable:
+        _cache_app_executable([app.full_name], app.full_name, executable)
+    return executable
+
+
+def _get_environment_digest(env):
+    """Return digest of variables the application environment builds on.
+
+    Only the variables that select the settings and the ones listed in
+    `AYON_LAUNCH_SCRIPTS_ENVIRONMENT_KEYS` are included, variables that
+    differ per job, like on the farm, do not prevent cache hits.
+    """
+    import hashlib
+
+    keys = set(SETTINGS_ENV_KEYS)
+    keys.update(
+        key.strip() for key in env.get(ENVIRONMENT_KEYS_ENV, "").split(",")
+        if key.strip()
+    )
+    items = sorted((key, env[key]) for key in keys if key in env)
+    return hashlib.sha1(json.dumps(items).encode("utf-8")).hexdigest()
+
+
+def _is_cached_environment_valid(value):
+    """Return whether the cached differences apply to current environment.
+
+    Variables the application environment extends, like `PATH`, must still
+    have the value the differences were computed from.
+    """
+    base = value.get("base") if isinstance(value, dict) else None
+    if base is None:
+        return False
+    return all(os.environ.get(key) == base_value
+               for key, base_value in base.items())
+
+
+def get_app_environments(project_name, folder_path, task_name, app_name):
+    """Return environment changes to launch application in a context.
+
+    Resolving the environment queries the AYON server for settings, anatomy
+    and entities, so the result is cached on disk per bundle and context.
+    Only the differences with the current environment are cached, together
+    with the current values of the changed variables, which must still match
+    for the differences to be applied. The cache is also keyed by a digest
+    of the variables the settings depend on, see `_get_environment_digest`.
+    The context variables are always returned, even if already set to the
+    same value.
+
+    Args:
+        project_name (str): The project name.
+        folder_path (str): The folder path.
+        task_name (str): The task name.
+        app_name (str): The application name.
+
+    Returns:
+        dict[str, str]: Environment variables to set.
+
+    """
+    key = "|".join((
+        get_bundle_name(),
+        project_name,
+        folder_path,
+        task_name,
+        app_name,
+        _get_environment_digest(os.environ)
+    ))
+    cached = _APP_ENVIRONMENT_CACHE.get(
+        key, validate=_is_cached_environment_valid
+    )
+    if cached is not None:
+        log.debug(f"Using cached application environment for {key}")
+        return cached["env"]
+
+    from ayon_applications.utils import get_app_environments_for_context
+
+    app_env = get_app_environments_for_context(
+        project_name,
+        folder_path,
+        task_name,
+        app_name
+    )
+    env = {
+        env_key: value for env_key, value in app_env.items()
+        if env_key in CONTEXT_ENV_KEYS or os.environ.get(env_key) != value
+    }
+    _APP_ENVIRONMENT_CACHE.set(key, {
+        "env": env,
+        # The context is part of the key and always set
+        "base": {
+            env_key: os.environ.get(env_key) for env_key in env
+            if env_key not in CONTEXT_ENV_KEYS
+        },
+    })
+    return env
+
 
 def get_last_workfile_for_task(
     project_name=None,
@@ -39,6 +257,15 @@ def get_last_workfile_for_task(
         tuple: (str: filepath, int: Version number)
 
     """
+    from ayon_core.pipeline import Anatomy, registered_host
+    from ayon_core.pipeline.context_tools import get_current_project_name
+    from ayon_core.pipeline.template_data import get_template_data_with_names
+    from ayon_core.pipeline.workfile import (
+        get_workfile_template_key_from_context,
+        get_last_workfile_with_version,
+        get_workdir_with_workdir_data
+    )
+
     # Default fallbacks
     if project_name is None:
         project_name = get_current_project_name()
@@ -93,6 +320,225 @@ def get_last_workfile_for_task(
     return filename, version
 
 
+def get_host_workfile_extensions():
+    """Return workfile extensions per host name.
+
+    Collecting them initializes all addons, so the result is cached within
+    this process like the application manager.
+
+    Returns:
+        dict[str, list[str]]: Workfile extensions per host name.
+
+    """
+    def create():
+        from ayon_core.addon import AddonsManager, IHostAddon
+
+        host_workfile_extensions = {}
+        for addon in AddonsManager().addons:
+            if isinstance(addon, IHostAddon):
+                host_workfile_extensions[addon.host_name] = (
+                    addon.get_workfile_extensions()
+                )
+        return host_workfile_extensions
+
+    return _get_session_cached("host_workfile_extensions", create)
+
+
+def _is_in_folder(path, folder_path):
+    if not folder_path:
+        return True
+    folder_path = folder_path.rstrip("/")
+    return path == folder_path or path.startswith(folder_path + "/")
+
+
+def _scan_work_root(work_root, file_template, template_data, extensions,
+                    indexed=None):
+    """Return index entry with the last workfile of a work directory.
+
+    The indexed entry is returned as is when the directory was not modified
+    since, otherwise the directory is listed again.
+
+    Returns:
+        Optional[dict]: The index entry, None if the directory is missing.
+
+    """
+    try:
+        mtime_ns = os.stat(work_root).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    entry = {
+        "mtime_ns": mtime_ns,
+        "file_template": file_template,
+        "extensions": sorted(extensions),
+        "filepath": None,
+        "version": None,
+    }
+    if indexed and all(
+        indexed.get(key) == entry[key]
+        for key in ("mtime_ns", "file_template", "extensions")
+    ):
+        return indexed
+
+    # Only resolve versions from the template for directories that have
+    # any workfile candidates at all, most task work roots are empty
+    lower_extensions = {extension.lower() for extension in extensions}
+    with os.scandir(work_root) as entries:
+        has_candidates = any(
+            os.path.splitext(dir_entry.name)[1].lower() in lower_extensions
+            and dir_entry.is_file()
+            for dir_entry in entries
+        )
+    if has_candidates:
+        from ayon_core.pipeline.workfile import get_last_workfile_with_version
+
+        filename, version = get_last_workfile_with_version(
+            work_root, file_template, template_data, extensions
+        )
+        if filename:
+            entry["filepath"] = os.path.join(work_root, filename)
+            entry["version"] = version
+    return entry
+
+
+def get_last_workfiles(
+    project_name,
+    host_name,
+    folder_path=None,
+    extensions=None,
+    max_workers=16
+):
+    """Return last existing workfile of each task in a project.
+
+    Unlike calling `get_last_workfile_for_task` per task this queries the
+    folders, tasks, settings and anatomy once and resolves the workfile
+    template once per task type. The work directories are scanned in
+    parallel and the result per directory is stored in an on-disk index so
+    only directories modified since the last call are listed again.
+
+    Args:
+        project_name (str): Project name.
+        host_name (str): Host name, e.g. `maya`.
+        folder_path (Optional[str]): Only include tasks of this folder and
+            its subfolders.
+        extensions (Optional[list[str]]): Filename extensions to look for.
+            Defaults to the workfile extensions of the host.
+        max_workers (int): Amount of work directories to scan in parallel.
+
+    Returns:
+        list[dict]: Per task with a workfile its `folder_path`, `task_name`,
+            `filepath` and `version`, sorted by folder path and task name.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import ayon_api
+    from ayon_core.pipeline import Anatomy
+    from ayon_core.pipeline.template_data import get_template_data
+    from ayon_core.pipeline.workfile import (
+        get_workdir_with_workdir_data,
+        get_workfile_template_key
+    )
+    from ayon_core.settings import get_project_settings
+
+    if extensions is None:
+        try:
+            extensions = get_host_workfile_extensions()[host_name]
+        except KeyError as exc:
+            raise ValueError(
+                f"Unknown extension for host {host_name}") from exc
+
+    project_entity = ayon_api.get_project(project_name)
+    if not project_entity:
+        raise ValueError(f"Project not found: {project_name}")
+
+    folder_entities = {
+        folder_entity["id"]: folder_entity
+        for folder_entity in ayon_api.get_folders(project_name)
+        if _is_in_folder(folder_entity["path"], folder_path)
+    }
+    if not folder_entities:
+        raise ValueError(f"Folder not found: {folder_path}")
+    task_entities = ayon_api.get_tasks(
+        project_name,
+        folder_ids=set(folder_entities) if folder_path else None
+    )
+
+    project_settings = get_project_settings(project_name)
+    anatomy = Anatomy(project_name, project_entity=project_entity)
+    template_keys = {}
+    tasks = []
+    for task_entity in task_entities:
+        folder_entity = folder_entities.get(task_entity["folderId"])
+        if folder_entity is None:
+            continue
+
+        task_type = task_entity["taskType"]
+        if task_type not in template_keys:
+            template_keys[task_type] = get_workfile_template_key(
+                project_name=project_name,
+                task_type=task_type,
+                host_name=host_name,
+                project_settings=project_settings
+            )
+        template_key = template_keys[task_type]
+
+        data = get_template_data(
+            project_entity, folder_entity, task_entity, host_name,
+            project_settings
+        )
+        data["root"] = anatomy.roots
+        work_root = get_workdir_with_workdir_data(
+            workdir_data=data,
+            project_name=project_name,
+            anatomy=anatomy,
+            template_key=template_key
+        )
+        file_template = anatomy.get_template_item("work", template_key, "file")
+        tasks.append((
+            folder_entity["path"],
+            task_entity["name"],
+            str(work_root),
+            str(file_template),
+            data
+        ))
+
+    index_key = f"{project_name}|{host_name}"
+    index = _WORKFILE_INDEX_CACHE.get(index_key) or {}
+
+    def scan(task):
+        _, _, work_root, file_template, data = task
+        return _scan_work_root(work_root, file_template, data, extensions,
+                               index.get(work_root))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        entries = list(executor.map(scan, tasks))
+
+    workfiles = []
+    rescanned = 0
+    for task, entry in zip(tasks, entries):
+        task_folder_path, task_name, work_root, _, _ = task
+        if entry is None:
+            index.pop(work_root, None)
+            continue
+        if entry is not index.get(work_root):
+            rescanned += 1
+            index[work_root] = entry
+        if entry["filepath"]:
+            workfiles.append({
+                "folder_path": task_folder_path,
+                "task_name": task_name,
+                "filepath": entry["filepath"],
+                "version": entry["version"],
+            })
+    log.debug(f"Scanned {rescanned} of {len(tasks)} work directories, "
+              "others were unchanged since indexed")
+    _WORKFILE_INDEX_CACHE.set(index_key, index)
+
+    workfiles.sort(key=lambda item: (item["folder_path"], item["task_name"]))
+    return workfiles
+
+
 def find_app_variant(app_name, application_manager=None):
     """Searches for relevant application.
 
@@ -102,6 +548,9 @@ def find_app_variant(app_name, application_manager=None):
     If app equals e.g. `maya/2023` or `houdini/19.0.435` (exact key for app
     variant) then it will try and launch that application.
 
+    The resolved variant is cached on disk per bundle until its executable
+    changes or the cache expires.
+
     Arguments:
         application_manager (ApplicationManager)
         app_name (str): Name of host or full application name, e.g.
@@ -114,8 +563,15 @@ def find_app_variant(app_name, application_manager=None):
         ValueError: if no valid application variant found
     """
 
+    cached = _APP_EXECUTABLE_CACHE.get(
+        f"{get_bundle_name()}|{app_name}",
+        validate=_is_cached_executable_valid
+    )
+    if cached:
+        return cached["app_name"]
+
     if application_manager is None:
-        application_manager = ApplicationManager()
+        application_manager = get_application_manager()
 
     if "/" in app_name:
         host, variant_key = app_name.split("/", 1)
@@ -138,6 +594,7 @@ def find_app_variant(app_name, application_manager=None):
         if not variant:
             raise ValueError("No executable for {} found".format(host))
         variant_key = variant.name
+        executable = variant.find_executable()
     else:
         # ensure the requested version is available on this machine
         if variant_key not in app_group.variants:
@@ -154,30 +611,300 @@ def find_app_variant(app_name, application_manager=None):
         else:
             raise ValueError("No executable for {} found".format(app_name))
 
-    return f"{host}/{variant_key}"
+    full_name = f"{host}/{variant_key}"
+    if executable:
+        _cache_app_executable({app_name, full_name}, full_name, executable)
+
+    return full_name
+
+
+def kill_process_tree(popen: subprocess.Popen, grace_period: float = 10.0):
+    """Terminate process and all its child processes.
+
+    The processes are first asked to terminate and are killed if they are
+    still running after `grace_period` seconds. On Linux and macOS this
+    relies on the process being launched in its own process group, see
+    `run_script`.
+
+    Args:
+        popen (subprocess.Popen): The launched process.
+        grace_period (float): Seconds to wait before killing.
+
+    """
+    if sys.platform == "win32":
+        # Without /F taskkill asks the processes to close gracefully
+        subprocess.call(["taskkill", "/T", "/PID", str(popen.pid)],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            popen.wait(grace_period)
+        except subprocess.TimeoutExpired:
+            pass
+        subprocess.call(["taskkill", "/T", "/F", "/PID", str(popen.pid)],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+
+    try:
+        process_group = os.getpgid(popen.pid)
+    except ProcessLookupError:
+        process_group = None
+
+    # Never signal our own process group in case the process was not
+    # launched in its own group
+    if process_group is None or process_group == os.getpgid(0):
+        popen.terminate()
+        try:
+            popen.wait(grace_period)
+        except subprocess.TimeoutExpired:
+            popen.kill()
+        return
+
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process_group, sig)
+        except ProcessLookupError:
+            # All processes in the group have ended
+            return
+        if sig == signal.SIGTERM:
+            try:
+                popen.wait(grace_period)
+            except subprocess.TimeoutExpired:
+                pass
+
+
+def install_termination_handlers():
+    """Terminate launched applications when this process gets terminated.
+
+    Applications are launched in their own session, see `run_script`, so
+    they do not receive the signals sent to this process or its terminal.
+    Instead SIGTERM and SIGHUP raise `KeyboardInterrupt` like Ctrl+C does,
+    on which the application's process tree is terminated. Signals that are
+    already handled or ignored, e.g. with `nohup`, are left as is.
+
+    This must be called from the main thread.
+    """
+    if sys.platform == "win32":
+        return
+    for sig in (signal.SIGTERM, signal.SIGHUP):
+        if signal.getsignal(sig) == signal.SIG_DFL:
+            signal.signal(sig, signal.default_int_handler)
+
+
+def _enqueue_lines(stream, lines: queue.Queue):
+    """Put each line of stream in the queue followed by None at the end"""
+    try:
+        for line in stream:
+            lines.put(line)
+    finally:
+        lines.put(None)
+
+
+def _enqueue_chunks(stream, chunks: queue.Queue):
+    """Put chunks as read from stream in the queue followed by None"""
+    fd = stream.fileno()
+    try:
+        while True:
+            chunk = os.read(fd, OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.put(chunk)
+    finally:
+        chunks.put(None)
 
 
 def print_stdout_until_timeout(
-    popen: subprocess.Popen, timeout: Optional[float] = None, app_name: str = None
+    popen: subprocess.Popen,
+    timeout: Optional[float] = None,
+    app_name: str = None,
+    prefix: str = None,
+    heartbeat: Optional[HeartbeatMonitor] = None,
+    raw: bool = False,
+    log_capture: Optional[LogCapture] = None,
+    watchers: Iterable[Callable[[], None]] = ()
 ):
     """Print stdout until app close.
 
-    If app remains open for longer than `timeout` then app is terminated.
+    If app remains open for longer than `timeout` then app and its child
+    processes are terminated, even if the app does not output anything.
+
+    If a `heartbeat` monitor is passed the app is also terminated when it
+    stalls, after printing a stack dump of where it stalled.
+
+    Each line is prefixed with `prefix`, which defaults to the `app_name`.
+    With `raw` the output is instead forwarded in large chunks as is, without
+    decoding or prefixing each line, which is much cheaper for very verbose
+    applications.
+
+    If the app's stdout is not captured, e.g. when it inherits stdout or
+    writes to a log file, this only waits for the app to close.
+
+    A `log_capture` archives the output and filters and collapses the lines
+    to print. Its last printed lines are included in the error on timeout.
+
+    Each of the `watchers` is called about every second while the app runs
+    and once after it closed, e.g. to consume its event stream. When a
+    watcher raises an error while the app runs, the app and its child
+    processes are terminated.
+
+    Raises:
+        RuntimeError: When the timeout is reached or the app stalled.
 
     """
-    time_start = time.time()
-    prefix = f"{app_name}: " if app_name else " "
+    deadline = time.monotonic() + timeout if timeout else None
+    if prefix is None:
+        prefix = f"{app_name}: " if app_name else " "
     default_encoding = sys.getdefaultencoding()
 
-    for line in popen.stdout:
-        # Print stdout, remove windows carriage return and decode according to system encoding
-        line = line.replace(b"\r", b"")
-        line_str = line.decode(default_encoding, errors="ignore")
-        print(f"{prefix}{line_str}", end="")
+    def failure(message):
+        tail = log_capture.get_tail() if log_capture else ""
+        if tail:
+            message += f"\nLast lines of output:\n{tail}"
+        return RuntimeError(message)
+
+    next_poll = 0.0
+
+    def check_progress():
+        nonlocal next_poll
+        now = time.monotonic()
+        if deadline and now > deadline:
+            kill_process_tree(popen)
+            raise failure(f"Timeout reached after {timeout} seconds")
+
+        # Avoid checking files for each line of very verbose output
+        if now < next_poll:
+            return
+        next_poll = now + POLL_INTERVAL
+
+        try:
+            for watcher in watchers:
+                watcher()
+        except Exception:
+            kill_process_tree(popen)
+            raise
+
+        if heartbeat and heartbeat.is_stalled():
+            stack_dump = heartbeat.get_stack_dump()
+            if stack_dump:
+                print(f"Stack dump of stalled application:\n{stack_dump}")
+            kill_process_tree(popen)
+            raise failure(
+                "Application stalled without progress for "
+                f"{heartbeat.stall_timeout} seconds")
+
+    # Read stdout in a thread so we can enforce the timeout without
+    # depending on the process producing any output
+    lines = queue.Queue()
+    if popen.stdout is not None:
+        reader = threading.Thread(
+            target=_enqueue_chunks if raw else _enqueue_lines,
+            args=(popen.stdout, lines),
+            daemon=True
+        )
+        reader.start()
+    else:
+        # Nothing to relay
+        lines.put(None)
+    stdout_buffer = getattr(sys.stdout, "buffer", None)
+
+    try:
+        while True:
+            check_progress()
+            try:
+                line = lines.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if line is None:
+                break
 
-        if timeout and time.time() - time_start > timeout:
-            popen.terminate()
-            raise RuntimeError("Timeout reached")
+            if heartbeat:
+                heartbeat.notify_output()
+            if log_capture:
+                log_capture.archive(line)
+
+            if raw and stdout_buffer is not None:
+                sys.stdout.flush()
+                stdout_buffer.write(line)
+                stdout_buffer.flush()
+                continue
+
+            # Print stdout, remove windows carriage return and decode
+            # according to system encoding
+            line = line.replace(b"\r", b"")
+            line_str = line.decode(default_encoding, errors="ignore")
+            if raw:
+                print(line_str, end="", flush=True)
+            elif log_capture:
+                for show_line in log_capture.process(line_str):
+                    print(f"{prefix}{show_line}", end="")
+            else:
+                print(f"{prefix}{line_str}", end="")
+
+        if log_capture:
+            for show_line in log_capture.close():
+                print(f"{prefix}{show_line}", end="")
+
+        # Output may end before the process does
+        if deadline or heartbeat or watchers:
+            while popen.poll() is None:
+                check_progress()
+                time.sleep(POLL_INTERVAL)
+
+        for watcher in watchers:
+            watcher()
+    except KeyboardInterrupt:
+        kill_process_tree(popen)
+        raise
+    finally:
+        if log_capture:
+            log_capture.close()
+
+
+def load_manifest(path, required_keys, defaults=None):
+    """Load JSON manifest file listing entries to process in batch.
+
+    The manifest is a JSON list of objects, e.g.:
+        [
+            {
+                "project_name": "my_project",
+                "folder_path": "/asset/char_hero",
+                "task_name": "modeling",
+                "filepath": "/path/to/workfile.ma"
+            }
+        ]
+
+    Args:
+        path (str): Path to the JSON manifest.
+        required_keys (Iterable[str]): Keys each entry must have a value for.
+        defaults (Optional[dict]): Default values for keys not set in an
+            entry, e.g. the context passed on the command line.
+
+    Returns:
+        list[dict]: The manifest entries.
+
+    Raises:
+        ValueError: if manifest is not a list or an entry misses required keys
+
+    """
+    with open(path, "r") as f:
+        entries = json.load(f)
+
+    if not isinstance(entries, list):
+        raise ValueError(f"Manifest must be a list of entries: {path}")
+
+    defaults = {
+        key: value for key, value in (defaults or {}).items()
+        if value is not None
+    }
+    result = []
+    for index, entry in enumerate(entries):
+        entry = {**defaults, **entry}
+        missing = [key for key in required_keys if not entry.get(key)]
+        if missing:
+            raise ValueError(
+                "Manifest entry {} is missing: {}".format(
+                    index, ", ".join(missing))
+            )
+        result.append(entry)
+    return result
 
 
 def succeed_with_message(message):
@@ -189,8 +916,22 @@ def succeed_with_message(message):
     """
     print(message)
     os.environ["__PUBLISH_EXIT_AS_SUCCESS"] = "1"
+    os.environ["__PUBLISH_EXIT_MESSAGE"] = message
 
 
 def is_success_shutdown():
     """Detects whether `succeed_with_message` was called."""
-    return os.getenv("__PUBLISH_EXIT_AS_SUCCESS") == "1"
\ No newline at end of file
+    return os.getenv("__PUBLISH_EXIT_AS_SUCCESS") == "1"
+
+
+def get_success_shutdown_message():
+    """Return message passed to `succeed_with_message`, if called."""
+    if not is_success_shutdown():
+        return None
+    return os.getenv("__PUBLISH_EXIT_MESSAGE")
+
+
+def reset_success_shutdown():
+    """Reset the state of `succeed_with_message` being called."""
+    os.environ.pop("__PUBLISH_EXIT_AS_SUCCESS", None)
+    os.environ.pop("__PUBLISH_EXIT_MESSAGE", None)
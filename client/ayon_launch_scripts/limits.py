@@ -0,0 +1,129 @@
+"""Memory, CPU time and open file limits for the launched application.
+
+The CPU time and open file limits are applied as rlimits to the launched
+process, which its child processes inherit. The CPU time limit applies per
+process: on reaching it the process receives `SIGXCPU`, and `SIGKILL` shortly
+after if it keeps running or ignores `SIGXCPU`. As `SIGKILL` may have other
+causes, it only counts as hitting the limit when a process of the sampled
+tree reached the CPU time limit.
+
+The memory limit applies to the resident memory of the whole process tree
+instead, as sampled by `ResourceSampler`, because an address space rlimit
+makes most applications fail on startup already by reserving far more
+virtual memory than they use. The process tree is terminated as soon as it
+exceeds the limit.
+
+Both limits make the job exit with a distinct exit code so the farm can tell
+them apart from regular failures.
+"""
+import signal
+import sys
+from typing import Callable, Optional
+
+from .resources import ResourceSampler, format_bytes
+
+EXIT_CODE_MEMORY_LIMIT = 201
+EXIT_CODE_CPU_LIMIT = 202
+
+# Seconds after the CPU time limit before the process is killed
+CPU_LIMIT_GRACE_PERIOD = 5
+
+
+class LimitExceededError(RuntimeError):
+    """The application exceeded one of its limits.
+
+    Args:
+        message (str): Description of the exceeded limit.
+        exit_code (int): Exit code to exit the job with.
+
+    """
+
+    def __init__(self, message: str, exit_code: int):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+def get_preexec_fn(
+    max_cpu_seconds: Optional[int] = None,
+    max_open_files: Optional[int] = None
+) -> Optional[Callable[[], None]]:
+    """Return function that applies the rlimits in the launched process.
+
+    Returns:
+        Optional[Callable[[], None]]: The function to pass as `preexec_fn`
+            to `subprocess.Popen` or None if no limits are set.
+
+    Raises:
+        ValueError: When limits are set on a platform without rlimits.
+
+    """
+    if not max_cpu_seconds and not max_open_files:
+        return None
+
+    if sys.platform == "win32":
+        raise ValueError("CPU time and open file limits are not supported "
+                         "on Windows")
+    import resource
+
+    def preexec_fn():
+        if max_cpu_seconds:
+            resource.setrlimit(
+                resource.RLIMIT_CPU,
+                (max_cpu_seconds, max_cpu_seconds + CPU_LIMIT_GRACE_PERIOD)
+            )
+        if max_open_files:
+            resource.setrlimit(resource.RLIMIT_NOFILE,
+                               (max_open_files, max_open_files))
+
+    return preexec_fn
+
+
+def is_cpu_limit_exit(
+    returncode: int,
+    max_cpu_seconds: Optional[int] = None,
+    max_process_cpu: Optional[float] = None
+) -> bool:
+    """Return whether the application was terminated by the CPU limit.
+
+    Applications launched through a shell script, like Maya on Linux, exit
+    with 128 plus the signal number instead of a negative returncode.
+
+    Args:
+        returncode (int): Returncode of the application.
+        max_cpu_seconds (Optional[int]): The CPU time limit.
+        max_process_cpu (Optional[float]): Highest CPU time of a single
+            process in the tree, see `ResourceSampler.max_process_cpu`.
+
+    """
+    if returncode in {-signal.SIGXCPU, 128 + signal.SIGXCPU}:
+        return True
+    return (
+        returncode in {-signal.SIGKILL, 128 + signal.SIGKILL}
+        and bool(max_cpu_seconds)
+        and max_process_cpu is not None
+        and max_process_cpu >= max_cpu_seconds
+    )
+
+
+class MemoryLimit:
+    """Watcher that raises an error when the process tree uses too much memory.
+
+    Args:
+        sampler (ResourceSampler): Sampler of the process tree, which should
+            be called before this watcher.
+        max_bytes (int): Maximum resident memory of the process tree.
+
+    """
+
+    def __init__(self, sampler: ResourceSampler, max_bytes: int):
+        self.sampler = sampler
+        self.max_bytes = max_bytes
+
+    def __call__(self):
+        if self.sampler.rss > self.max_bytes:
+            raise LimitExceededError(
+                "Application exceeded memory limit of "
+                f"{format_bytes(self.max_bytes)} using "
+                f"{format_bytes(self.sampler.rss)}",
+                EXIT_CODE_MEMORY_LIMIT
+            )
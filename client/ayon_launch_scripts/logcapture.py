@@ -0,0 +1,119 @@
+"""Bounded capture of the output of launched applications.
+
+Long farm jobs can output the same warning hundreds of thousands of times.
+`LogCapture` reduces what is shown by dropping lines matching noise filters
+and collapsing runs of identical lines, keeps the last lines in memory to
+report on failure and archives the full output to a gzip compressed file
+of limited size.
+"""
+import collections
+import gzip
+import re
+from typing import Iterable, List, Optional
+
+
+class LogCapture:
+    """Filter, collapse, archive and remember the last lines of output.
+
+    Args:
+        archive_path (Optional[str]): Gzip compressed file to write the full
+            output to.
+        archive_max_bytes (Optional[int]): Stop archiving after this many
+            uncompressed bytes.
+        tail_lines (int): Amount of last shown lines to remember.
+        collapse_repeats (bool): Show runs of identical lines only once
+            followed by how many times it repeated.
+        filters (Iterable[str]): Regular expressions of lines to not show.
+
+    """
+
+    def __init__(
+        self,
+        archive_path: Optional[str] = None,
+        archive_max_bytes: Optional[int] = None,
+        tail_lines: int = 0,
+        collapse_repeats: bool = False,
+        filters: Iterable[str] = ()
+    ):
+        self.archive_path = archive_path
+        self.archive_max_bytes = archive_max_bytes
+        self.collapse_repeats = collapse_repeats
+        self.filters = [re.compile(pattern) for pattern in filters]
+        self.filtered_count = 0
+
+        self._tail = collections.deque(maxlen=tail_lines or None)
+        self._keep_tail = bool(tail_lines)
+        self._previous_line = None
+        self._repeat_count = 0
+        self._archive = None
+        self._archived_bytes = 0
+        if archive_path:
+            self._archive = gzip.open(archive_path, "ab")
+
+    def archive(self, data: bytes):
+        """Write raw output to the archive, up to the maximum size."""
+        if self._archive is None:
+            return
+
+        if self.archive_max_bytes:
+            remaining = self.archive_max_bytes - self._archived_bytes
+            if len(data) >= remaining:
+                self._archive.write(data[:max(remaining, 0)])
+                self._archive.write(
+                    b"\n... log truncated after %d bytes\n"
+                    % self.archive_max_bytes
+                )
+                self._archive.close()
+                self._archive = None
+                return
+
+        self._archive.write(data)
+        self._archived_bytes += len(data)
+
+    def process(self, line: str) -> List[str]:
+        """Return the lines to show for a line of output.
+
+        Args:
+            line (str): Decoded line of output, including line ending.
+
+        Returns:
+            List[str]: Lines to show, which may be none at all.
+
+        """
+        if any(pattern.search(line) for pattern in self.filters):
+            self.filtered_count += 1
+            return []
+
+        lines = []
+        if self.collapse_repeats:
+            if line == self._previous_line:
+                self._repeat_count += 1
+                return []
+            lines.extend(self._flush_repeats())
+            self._previous_line = line
+
+        lines.append(line)
+        if self._keep_tail:
+            self._tail.extend(lines)
+        return lines
+
+    def _flush_repeats(self) -> List[str]:
+        if not self._repeat_count:
+            return []
+        line = f"... previous line repeated {self._repeat_count} times\n"
+        self._repeat_count = 0
+        return [line]
+
+    def close(self) -> List[str]:
+        """Close the archive and return any lines still left to show."""
+        lines = self._flush_repeats()
+        if self._keep_tail:
+            self._tail.extend(lines)
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+        return lines
+
+    def get_tail(self) -> str:
+        """Return the last shown lines."""
+        return "".join(self._tail)
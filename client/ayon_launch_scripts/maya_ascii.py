@@ -0,0 +1,257 @@
+"""Inspect Maya ASCII workfiles without Maya.
+
+Reads the AYON containers, publish instances and file references from a
+`.ma` file so decisions like "are there outdated containers" can be made
+before launching Maya at all.
+
+The file is streamed line by line and only the statements of object sets
+and file references are parsed, so even multi-GB scenes are inspected in
+bounded memory. This relies on the layout Maya writes: top-level statements
+like `createNode` start at the beginning of a line and the statements that
+apply to the created node, and any continuation lines, are indented.
+
+Only the standard library is used so workfiles can be inspected by the CLI
+before any host or AYON module is available.
+"""
+import json
+import os
+import re
+import shlex
+from typing import Dict, Iterator, List, Optional
+
+# Object set `id` values of AYON containers and publish instances
+CONTAINER_IDS = {"ayon.container", "pyblish.avalon.container"}
+INSTANCE_IDS = {"ayon.create.instance", "pyblish.avalon.instance"}
+
+# Lines are cut off at this length, statements we parse are much shorter
+# but e.g. long data arrays may be written on a single line
+MAX_LINE_LENGTH = 64 * 1024
+MAX_STATEMENT_LENGTH = 1024 * 1024
+
+_TRUE_VALUES = {"yes", "true", "on", "1"}
+# Prefix of list and dict attribute values the Maya creators store as JSON
+_JSON_PREFIX = "JSON::"
+# Long strings are split over lines as `"abc"\n\t\t+ "def"`
+_STRING_CONCATENATION_REGEX = re.compile(r'"\s*\+\s*"')
+# Copy number Maya appends to paths of files referenced more than once
+_COPY_NUMBER_REGEX = re.compile(r"\{\d+\}$")
+
+
+def _iter_lines(f) -> Iterator[bytes]:
+    """Yield lines of binary file, cut off at `MAX_LINE_LENGTH`."""
+    while True:
+        line = f.readline(MAX_LINE_LENGTH)
+        if not line:
+            return
+        if not line.endswith(b"\n"):
+            # Skip the remainder of the line
+            remainder = line
+            while remainder and not remainder.endswith(b"\n"):
+                remainder = f.readline(MAX_LINE_LENGTH)
+        yield line
+
+
+def _is_indented(line: bytes) -> bool:
+    return line[:1] in (b"\t", b" ")
+
+
+def _iter_statements(f) -> Iterator[tuple]:
+    """Yield `(indented, statement)` of statements relevant to inspect.
+
+    Statements are collected up to their closing `;`, including the indented
+    continuation lines Maya wraps long statements onto. Top-level statements
+    are always yielded, the indented statements that follow them only when
+    the caller sent `True` for the last top-level statement, i.e. when it
+    created an object set.
+    """
+    in_object_set = False
+    statement = None
+    statement_indented = False
+    for line in _iter_lines(f):
+        if statement is not None:
+            if _is_indented(line):
+                # Continuation of a statement wrapped over multiple lines
+                if len(statement) < MAX_STATEMENT_LENGTH:
+                    statement += line
+                if line.rstrip().endswith(b";"):
+                    in_object_set = yield statement_indented, statement
+                    statement = None
+                continue
+
+            # Continuation lines are always indented, so the statement
+            # ended without `;`
+            in_object_set = yield statement_indented, statement
+            statement = None
+
+        indented = _is_indented(line)
+        if indented and not in_object_set:
+            continue
+        if not line.strip() or line.startswith(b"//"):
+            # Empty line or comment
+            continue
+        if line.rstrip().endswith(b";"):
+            in_object_set = yield indented, line
+        else:
+            statement = line
+            statement_indented = indented
+
+    if statement is not None:
+        yield statement_indented, statement
+
+
+def _parse_statement(statement: bytes) -> List[str]:
+    """Return the words of a MEL statement, unquoting strings."""
+    text = statement.decode("utf-8", errors="replace").strip()
+    text = _STRING_CONCATENATION_REGEX.sub("", text.rstrip(";"))
+    try:
+        return shlex.split(text, posix=True)
+    except ValueError:
+        return text.split()
+
+
+def _get_flag(words: List[str], *flags: str) -> Optional[str]:
+    for index, word in enumerate(words[:-1]):
+        if word in flags:
+            return words[index + 1]
+    return None
+
+
+def _get_set_attr(words: List[str]) -> Optional[tuple]:
+    """Return attribute name and value of a `setAttr` statement, if any."""
+    for index, word in enumerate(words):
+        if word.startswith("."):
+            values = words[index + 1:]
+            if values[:1] == ["-type"]:
+                values = values[2:]
+            if not values:
+                return None
+            return word[1:], " ".join(values)
+    return None
+
+
+def _to_bool(value: Optional[str], default: bool = True) -> bool:
+    if value is None:
+        return default
+    return value.strip().lower() in _TRUE_VALUES
+
+
+def _to_list(value: Optional[str]) -> List[str]:
+    """Return list attribute value, stored as JSON or as a single value."""
+    if not value:
+        return []
+    if value.startswith(_JSON_PREFIX):
+        value = value[len(_JSON_PREFIX):]
+    try:
+        items = json.loads(value)
+    except ValueError:
+        return [value]
+    if not isinstance(items, list):
+        return [value]
+    return [str(item) for item in items]
+
+
+def inspect_maya_ascii(path: str) -> Dict[str, list]:
+    """Return AYON containers, publish instances and references in `.ma`.
+
+    Only the workfile itself is inspected, not the files it references.
+
+    Args:
+        path (str): Path to the Maya ASCII file.
+
+    Returns:
+        dict: With keys:
+            - `containers`: list of dicts with `name`, `representation`,
+                `loader` and `namespace`.
+            - `instances`: list of dicts with `name`, `productType`,
+                `productName`, `families`, `creator_identifier` and
+                `active`.
+            - `references`: list of referenced file paths as written in the
+                file, which may contain environment variables.
+
+    Raises:
+        ValueError: When the file is not a Maya ASCII file.
+
+    """
+    object_sets = []
+    references = []
+    current = None
+    with open(path, "rb") as f:
+        if not f.readline(MAX_LINE_LENGTH).startswith(b"//Maya ASCII"):
+            raise ValueError(f"Not a Maya ASCII file: {path}")
+
+        statements = _iter_statements(f)
+        in_object_set = None
+        while True:
+            try:
+                indented, statement = statements.send(in_object_set)
+            except StopIteration:
+                break
+
+            if indented:
+                words = _parse_statement(statement) or [""]
+                if words[0] == "addAttr":
+                    # Unchanged bool attributes are only written as default
+                    name = _get_flag(words, "-ln", "-longName")
+                    default = _get_flag(words, "-dv", "-defaultValue")
+                    if name and default is not None:
+                        current["attributes"].setdefault(name, default)
+                elif words[0] == "setAttr":
+                    attribute = _get_set_attr(words)
+                    if attribute:
+                        current["attributes"][attribute[0]] = attribute[1]
+                continue
+
+            words = statement.split(None, 1)
+            command = words[0] if words else b""
+            current = None
+            if command == b"createNode":
+                words = _parse_statement(statement)
+                if len(words) > 1 and words[1] == "objectSet":
+                    current = {
+                        "name": _get_flag(words, "-n", "-name"),
+                        "attributes": {},
+                    }
+                    object_sets.append(current)
+            elif command == b"file":
+                words = _parse_statement(statement)
+                if "-r" in words or "-rdi" in words:
+                    reference = _COPY_NUMBER_REGEX.sub("", words[-1])
+                    if reference not in references:
+                        references.append(reference)
+            in_object_set = current is not None
+
+    containers = []
+    instances = []
+    for object_set in object_sets:
+        attributes = object_set["attributes"]
+        set_id = attributes.get("id")
+        if set_id in CONTAINER_IDS:
+            containers.append({
+                "name": object_set["name"],
+                "representation": attributes.get("representation"),
+                "loader": attributes.get("loader"),
+                "namespace": attributes.get("namespace"),
+            })
+        elif set_id in INSTANCE_IDS:
+            instances.append({
+                "name": object_set["name"],
+                "productType": (
+                    attributes.get("productType") or attributes.get("family")
+                ),
+                "productName": (
+                    attributes.get("productName") or attributes.get("subset")
+                ),
+                "families": _to_list(attributes.get("families")),
+                "creator_identifier": attributes.get("creator_identifier"),
+                "active": _to_bool(attributes.get("active")),
+            })
+
+    return {
+        "containers": containers,
+        "instances": instances,
+        "references": references,
+    }
+
+
+def is_maya_ascii(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == ".ma"
@@ -0,0 +1,339 @@
+"""Local store of job metrics to track performance over time.
+
+Each `run-script` and `publish` job appends a row with its context, the
+application variant, the workfile size, its duration, peak memory and exit
+code together with the duration of each phase to a SQLite database in the
+cache directory, or `AYON_LAUNCH_SCRIPTS_METRICS_DB` when set. The `stats`
+command reports percentiles from it and compares time windows or versions
+to find performance regressions.
+"""
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .cache import get_cache_dir
+
+METRICS_DB_ENV = "AYON_LAUNCH_SCRIPTS_METRICS_DB"
+
+# Disable recording metrics when set to "0"
+METRICS_ENABLED_ENV = "AYON_LAUNCH_SCRIPTS_METRICS"
+
+# Duration of the whole job as compared like a phase
+TOTAL_PHASE = "total"
+
+# Columns of the jobs table that can be grouped by
+GROUP_BY_COLUMNS = {
+    "host": "host_name",
+    "app": "app_name",
+    "project": "project_name",
+    "task": "task_name",
+    "command": "command",
+}
+
+JOB_COLUMNS = (
+    "time",
+    "command",
+    "project_name",
+    "folder_path",
+    "task_name",
+    "app_name",
+    "host_name",
+    "addon_version",
+    "bundle_name",
+    "filepath",
+    "workfile_size",
+    "wall_seconds",
+    "peak_rss_bytes",
+    "cpu_seconds",
+    "returncode",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time REAL NOT NULL,
+    command TEXT,
+    project_name TEXT,
+    folder_path TEXT,
+    task_name TEXT,
+    app_name TEXT,
+    host_name TEXT,
+    addon_version TEXT,
+    bundle_name TEXT,
+    filepath TEXT,
+    workfile_size INTEGER,
+    wall_seconds REAL,
+    peak_rss_bytes INTEGER,
+    cpu_seconds REAL,
+    returncode INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_time ON jobs (time);
+CREATE TABLE IF NOT EXISTS phases (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    phase TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phases_job_id ON phases (job_id);
+"""
+
+
+def get_metrics_path() -> str:
+    """Return path of the metrics database."""
+    return (
+        os.environ.get(METRICS_DB_ENV)
+        or os.path.join(get_cache_dir(), "metrics.sqlite")
+    )
+
+
+def is_metrics_enabled() -> bool:
+    return os.environ.get(METRICS_ENABLED_ENV) != "0"
+
+
+class MetricsStore:
+    """SQLite store of job metrics.
+
+    Args:
+        path (Optional[str]): The database file, defaults to
+            `get_metrics_path()`.
+
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_metrics_path()
+
+    def _connect(self) -> "sqlite3.Connection":
+        import sqlite3
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Concurrent jobs may write at the same time
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.executescript(SCHEMA)
+        return connection
+
+    def record_job(
+        self,
+        job: dict,
+        phases: Optional[Dict[str, float]] = None
+    ):
+        """Append a job with the duration of its phases.
+
+        Args:
+            job (dict): Values for the `JOB_COLUMNS`, missing values are
+                stored as NULL and `time` defaults to now.
+            phases (Optional[Dict[str, float]]): Duration in seconds per
+                phase name.
+
+        """
+        values = {key: job.get(key) for key in JOB_COLUMNS}
+        if values["time"] is None:
+            values["time"] = time.time()
+        if values["host_name"] is None and values["app_name"]:
+            values["host_name"] = values["app_name"].split("/", 1)[0]
+
+        connection = self._connect()
+        try:
+            with connection:
+                cursor = connection.execute(
+                    "INSERT INTO jobs ({}) VALUES ({})".format(
+                        ", ".join(JOB_COLUMNS),
+                        ", ".join("?" for _ in JOB_COLUMNS)
+                    ),
+                    [values[key] for key in JOB_COLUMNS]
+                )
+                connection.executemany(
+                    "INSERT INTO phases (job_id, phase, duration) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (cursor.lastrowid, phase, duration)
+                        for phase, duration in (phases or {}).items()
+                    ]
+                )
+        finally:
+            connection.close()
+
+    def get_jobs(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        **filters
+    ) -> List[dict]:
+        """Return jobs with their phases, oldest first.
+
+        Args:
+            since (Optional[float]): Only jobs from this time onwards.
+            until (Optional[float]): Only jobs before this time.
+            **filters: Only jobs with these values for the `JOB_COLUMNS`,
+                e.g. `addon_version="1.2.0"`.
+
+        Returns:
+            List[dict]: The jobs, each with a `phases` dict of durations.
+
+        """
+        conditions = []
+        parameters = []
+        if since is not None:
+            conditions.append("time >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("time < ?")
+            parameters.append(until)
+        for key, value in filters.items():
+            if key not in JOB_COLUMNS:
+                raise ValueError(f"Unknown job column: {key}")
+            if value is not None:
+                conditions.append(f"{key} = ?")
+                parameters.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        if not os.path.exists(self.path):
+            return []
+        connection = self._connect()
+        try:
+            jobs = {
+                row["id"]: dict(row, phases={})
+                for row in connection.execute(
+                    f"SELECT * FROM jobs {where} ORDER BY time", parameters)
+            }
+            for row in connection.execute(
+                f"SELECT job_id, phase, duration FROM phases WHERE job_id IN "
+                f"(SELECT id FROM jobs {where})",
+                parameters
+            ):
+                phases = jobs[row["job_id"]]["phases"]
+                phases[row["phase"]] = (
+                    phases.get(row["phase"], 0.0) + row["duration"])
+        finally:
+            connection.close()
+        return list(jobs.values())
+
+
+def percentile(values: Sequence[float], percent: float) -> Optional[float]:
+    """Return percentile of values with linear interpolation."""
+    if not values:
+        return None
+    values = sorted(values)
+    index = (len(values) - 1) * percent / 100.0
+    lower = int(index)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+def get_group_key(job: dict, group_by: Iterable[str]) -> str:
+    return " > ".join(
+        str(job.get(GROUP_BY_COLUMNS[key]) or "-") for key in group_by
+    )
+
+
+def get_durations(job: dict) -> Dict[str, float]:
+    """Return duration per phase of a job including its total duration."""
+    durations = dict(job["phases"])
+    if job["wall_seconds"] is not None:
+        durations[TOTAL_PHASE] = job["wall_seconds"]
+    return durations
+
+
+def summarize(
+    jobs: Iterable[dict],
+    group_by: Sequence[str],
+    phase: str = TOTAL_PHASE
+) -> List[dict]:
+    """Return percentiles of duration and peak memory per group.
+
+    Args:
+        jobs (Iterable[dict]): Jobs as returned by `MetricsStore.get_jobs`.
+        group_by (Sequence[str]): Keys of `GROUP_BY_COLUMNS` to group by.
+        phase (str): The phase to report the durations of.
+
+    Returns:
+        List[dict]: Per group the `group`, `jobs`, `failed`, `p50`, `p90`,
+            `p99` and `max` durations and `rss_p50` and `rss_max` peak
+            memory, sorted by group.
+
+    """
+    groups = {}
+    for job in jobs:
+        groups.setdefault(get_group_key(job, group_by), []).append(job)
+
+    rows = []
+    for group, group_jobs in sorted(groups.items()):
+        durations = []
+        for job in group_jobs:
+            job_durations = get_durations(job)
+            if phase in job_durations:
+                durations.append(job_durations[phase])
+        rss = [
+            job["peak_rss_bytes"] for job in group_jobs
+            if job["peak_rss_bytes"]
+        ]
+        rows.append({
+            "group": group,
+            "jobs": len(group_jobs),
+            "failed": sum(1 for job in group_jobs if job["returncode"]),
+            "p50": percentile(durations, 50),
+            "p90": percentile(durations, 90),
+            "p99": percentile(durations, 99),
+            "max": max(durations) if durations else None,
+            "rss_p50": percentile(rss, 50),
+            "rss_max": max(rss) if rss else None,
+        })
+    return rows
+
+
+def compare(
+    baseline_jobs: Iterable[dict],
+    current_jobs: Iterable[dict],
+    group_by: Sequence[str],
+    threshold: float = 20.0
+) -> List[dict]:
+    """Compare median duration of each phase between two sets of jobs.
+
+    Args:
+        baseline_jobs (Iterable[dict]): Jobs to compare against.
+        current_jobs (Iterable[dict]): Jobs to compare.
+        group_by (Sequence[str]): Keys of `GROUP_BY_COLUMNS` to group by.
+        threshold (float): Percentage the median must have increased by to
+            be flagged as regression.
+
+    Returns:
+        List[dict]: Per group and phase present in both sets the `group`,
+            `phase`, `baseline` and `current` median durations, their
+            `baseline_jobs` and `current_jobs` counts, the `change` in
+            percent and whether it is a `regression`. Sorted by change,
+            largest first.
+
+    """
+    def collect(jobs):
+        durations = {}
+        for job in jobs:
+            group = get_group_key(job, group_by)
+            for phase, duration in get_durations(job).items():
+                durations.setdefault((group, phase), []).append(duration)
+        return durations
+
+    baseline = collect(baseline_jobs)
+    current = collect(current_jobs)
+
+    rows = []
+    for key in sorted(set(baseline) & set(current)):
+        group, phase = key
+        baseline_median = percentile(baseline[key], 50)
+        current_median = percentile(current[key], 50)
+        change = (
+            (current_median - baseline_median) / baseline_median * 100.0
+            if baseline_median else 0.0
+        )
+        rows.append({
+            "group": group,
+            "phase": phase,
+            "baseline": baseline_median,
+            "current": current_median,
+            "baseline_jobs": len(baseline[key]),
+            "current_jobs": len(current[key]),
+            "change": change,
+            "regression": change > threshold,
+        })
+    rows.sort(key=lambda row: row["change"], reverse=True)
+    return rows
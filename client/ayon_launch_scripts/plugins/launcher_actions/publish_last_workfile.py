@@ -2,10 +2,10 @@ from __future__ import annotations
 import os
 import platform
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from json import JSONDecodeError
 from typing import Optional, Any
 
-from ayon_core.addon import AddonsManager, IHostAddon
 from ayon_core.lib import (
     get_ayon_username, BoolDef, UILabelDef,
     UISeparatorDef
@@ -27,8 +27,25 @@ from ayon_core.style import load_stylesheet
 
 from qtpy import QtGui, QtCore, QtWidgets
 
+from ayon_launch_scripts.lib import (
+    clear_session_cache,
+    get_application_manager,
+    get_host_workfile_extensions,
+    get_last_workfile_for_task
+)
+from ayon_launch_scripts.workfile_checks import (
+    PRE_POST_SCRIPTS_DIR,
+    get_skip_message
+)
+
 log = logging.getLogger(__name__)
 
+# Runs lookups that query the server or disk off the Qt thread, a single
+# worker so the cached lookups are never computed concurrently
+_EXECUTOR = ThreadPoolExecutor(max_workers=1,
+                               thread_name_prefix="PublishLastWorkfile")
+_caches_warmed_up = False
+
 
 def get_application_qt_icon(application: Application) -> Optional[QtGui.QIcon]:
     """Return QtGui.QIcon for an Application"""
@@ -41,6 +58,64 @@ def get_application_qt_icon(application: Application) -> Optional[QtGui.QIcon]:
     return QtGui.QIcon()
 
 
+def warm_up_caches(refresh: bool = False):
+    """Build the application manager and host extensions in the background.
+
+    They are built once per launcher session and again when the bundle
+    changed, or when `refresh` is set to pick up changed settings.
+    """
+    global _caches_warmed_up
+    if refresh:
+        _EXECUTOR.submit(clear_session_cache)
+    elif _caches_warmed_up:
+        return
+    _caches_warmed_up = True
+    _EXECUTOR.submit(get_application_manager)
+    _EXECUTOR.submit(get_host_workfile_extensions)
+
+
+def find_last_workfile(
+    project_name: str,
+    folder_path: str,
+    task_name: str,
+    host_name: str
+) -> tuple[Optional[str], Optional[int]]:
+    """Return last existing workfile and its version for a task and host"""
+    try:
+        extensions = get_host_workfile_extensions()[host_name]
+    except KeyError as exc:
+        raise ValueError(f"Unknown extension for host {host_name}") from exc
+
+    # Find latest workfile with `AVALON_SCENEDIR` support
+    return get_last_workfile_for_task(
+        project_name=project_name,
+        folder_path=folder_path,
+        task_name=task_name,
+        host_name=host_name,
+        extensions=extensions
+    )
+
+
+def wait_for_future(future: Future, poll_interval: int = 50) -> Any:
+    """Return result of future while keeping the Qt event loop running.
+
+    Waiting on the future directly would freeze the launcher until done.
+    """
+    if not future.done():
+        loop = QtCore.QEventLoop()
+        timer = QtCore.QTimer()
+        timer.setInterval(poll_interval)
+        timer.timeout.connect(lambda: future.done() and loop.quit())
+        timer.start()
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            loop.exec_()
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+            timer.stop()
+    return future.result()
+
+
 def submit_to_deadline(
         job_info: dict,
         plugin_info: dict,
@@ -175,54 +250,55 @@ class PublishLastWorkfile(LauncherAction):
     color = "#ffffff"
     order = 20
 
+    # The Qt event loop keeps running while waiting on lookups, so the action
+    # can be triggered again before the previous run finished
+    _running = False
+
     def is_compatible(self, selection) -> bool:
-        return selection.is_task_selected
+        if not selection.is_task_selected:
+            return False
+        warm_up_caches()
+        return True
 
     def process(self, selection, **kwargs):
-        import ayon_launch_scripts.lib
-        import importlib
-        importlib.reload(ayon_launch_scripts.lib)
-        from ayon_launch_scripts.lib import get_last_workfile_for_task
+        if PublishLastWorkfile._running:
+            log.debug("Publish of last workfile is already in progress")
+            return
+        PublishLastWorkfile._running = True
+        try:
+            self._process(selection)
+        finally:
+            PublishLastWorkfile._running = False
 
+    def _process(self, selection):
         pos = QtGui.QCursor.pos()
 
+        # Hold shift to pick up changed application settings
+        modifiers = QtWidgets.QApplication.keyboardModifiers()
+        warm_up_caches(refresh=bool(modifiers & QtCore.Qt.ShiftModifier))
+
         # Get the environment
         project_name = selection.get_project_name()
         folder_path = selection.get_folder_path()
         task_name = selection.get_task_name()
 
         # Get applications
-        application_manager = ApplicationManager()
+        application_manager = wait_for_future(
+            _EXECUTOR.submit(get_application_manager))
         applications = self.get_project_applications(
             application_manager, selection)
         app = self.choose_app(applications, pos)
         if not app:
             return
 
-        # Get all host extensions
-        addons_manager = AddonsManager()
-        host_workfile_extensions = {}
-        for addon in addons_manager.addons:
-            if isinstance(addon, IHostAddon):
-                host_workfile_extensions[addon.host_name] = (
-                    addon.get_workfile_extensions()
-                )
-
         app_name = app.full_name
-        try:
-            extensions = host_workfile_extensions[app.host_name]
-        except KeyError as exc:
-            raise ValueError(
-                f"Unknown extension for host {app.host_name}") from exc
-
-        # Find latest workfile with `AVALON_SCENEDIR` support
-        workfile, version_number = get_last_workfile_for_task(
-            project_name=project_name,
-            folder_path=folder_path,
-            task_name=task_name,
-            host_name=app.host_name,
-            extensions=extensions
-        )
+        workfile, version_number = wait_for_future(_EXECUTOR.submit(
+            find_last_workfile,
+            project_name,
+            folder_path,
+            task_name,
+            app.host_name
+        ))
         if not workfile:
             raise RuntimeError("No existing workfile found.")
 
@@ -234,7 +310,8 @@ class PublishLastWorkfile(LauncherAction):
             "--folder_path", folder_path,
             "--task_name", task_name,
             "--app_name", str(app.full_name),
-            "--filepath", workfile
+            "--filepath", workfile,
+            "--offline_checks"
         ]
 
         # Define some labeling
@@ -296,6 +373,31 @@ class PublishLastWorkfile(LauncherAction):
             # user cancelled
             return
 
+        if choices["quit_on_no_outdated"]:
+            # Skip submitting when it is known nothing upstream changed
+            try:
+                message = wait_for_future(_EXECUTOR.submit(
+                    get_skip_message,
+                    {
+                        "project_name": project_name,
+                        "folder_path": folder_path,
+                        "task_name": task_name,
+                        "filepath": workfile,
+                    },
+                    [os.path.join(PRE_POST_SCRIPTS_DIR,
+                                  "quit_on_no_outdated.py")]
+                ))
+            except Exception:
+                log.warning("Failed to check for outdated containers",
+                            exc_info=True)
+                message = None
+            if message:
+                QtWidgets.QMessageBox.information(
+                    None, "Publish workfile on farm",
+                    f"Not submitted. {message}"
+                )
+                return
+
         # The order can be important here. Also note that some always apply
         # and are not an artist choice - just because they are always relevant.
         if app.host_name == "maya":
@@ -0,0 +1,87 @@
+"""Profile the script run inside the launched host with cProfile.
+
+When the CLI is asked to profile it runs `scripts/profile_script.py` in the
+host instead of the actual script. That wrapper runs the script passed
+through `LAUNCH_SCRIPTS_PROFILE_SCRIPT` under cProfile and writes the stats
+to `LAUNCH_SCRIPTS_PROFILE_FILE`, which can be inspected with `pstats` or
+e.g. `snakeviz`.
+
+`cProfile` and `pstats` are only imported once used to keep importing the
+addon cheap.
+"""
+import os
+import runpy
+import sys
+import time
+from typing import Optional
+
+PROFILE_FILE_ENV = "LAUNCH_SCRIPTS_PROFILE_FILE"
+PROFILE_SCRIPT_ENV = "LAUNCH_SCRIPTS_PROFILE_SCRIPT"
+
+PROFILE_SCRIPT_PATH = os.path.join(os.path.dirname(__file__),
+                                   "scripts",
+                                   "profile_script.py")
+
+
+def get_profile_path(
+    log_file: Optional[str] = None,
+    log_archive: Optional[str] = None
+) -> str:
+    """Return path to write the profile to, next to the log if any."""
+    log_path = log_file or log_archive
+    if log_path:
+        return f"{os.path.splitext(os.path.abspath(log_path))[0]}.prof"
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    return os.path.abspath(f"launch_scripts_{timestamp}.prof")
+
+
+def wrap_script(script_path: str, env: dict, profile_path: str) -> str:
+    """Return the script to launch to profile `script_path` in the host.
+
+    Args:
+        script_path (str): The python script to profile.
+        env (dict): Environment for the host to launch, updated in place.
+        profile_path (str): The file to write the profile stats to.
+
+    Returns:
+        str: The wrapper script to run in the host instead.
+
+    """
+    env[PROFILE_SCRIPT_ENV] = script_path
+    env[PROFILE_FILE_ENV] = profile_path
+    return PROFILE_SCRIPT_PATH
+
+
+def run_path_profiled(
+    script_path: str,
+    profile_path: str,
+    init_globals: Optional[dict] = None
+):
+    """Run Python script by filepath under cProfile.
+
+    The stats are also written when the script raises an error or exits.
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(runpy.run_path,
+                         script_path,
+                         init_globals=init_globals,
+                         run_name="__main__")
+    finally:
+        profiler.dump_stats(profile_path)
+        print(f"Wrote profile to: {profile_path}")
+        sys.stdout.flush()
+
+
+def print_profile_summary(profile_path: str, limit: int = 20):
+    """Print the functions with the highest cumulative time."""
+    if not os.path.exists(profile_path):
+        print(f"No profile was written to: {profile_path}")
+        return
+
+    import pstats
+
+    stats = pstats.Stats(profile_path, stream=sys.stdout)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
@@ -0,0 +1,182 @@
+"""Skip publishing workfiles that did not change since their last publish.
+
+After a successful publish with `--skip_unchanged` the index stores per workfile and context the
+hash of the workfile, the publish scripts used and the last version of each
+product loaded in the workfile. The last versions are taken by the host when
+it opens the workfile, so a version published while the job runs is not
+mistaken for one the publish already used. Before launching the application
+`publish --skip_unchanged` looks up that entry so jobs of which the workfile
+is unchanged and none of the loaded products got a newer version are skipped
+without launching anything.
+
+The index is stored in the cache directory, or in the file set by
+`AYON_LAUNCH_SCRIPTS_PUBLISH_INDEX` to share it between machines.
+"""
+import os
+from typing import Dict, List, Optional
+
+from .cache import JsonCache
+
+PUBLISH_INDEX_ENV = "AYON_LAUNCH_SCRIPTS_PUBLISH_INDEX"
+# Set for the host when the publish is recorded, only then it takes the last
+# versions of the loaded products
+RECORD_PUBLISH_ENV = "LAUNCH_SCRIPTS_RECORD_PUBLISH"
+
+# Publish report status of workfiles skipped because they are unchanged
+STATUS_UNCHANGED = "unchanged"
+
+
+class PublishIndex(JsonCache):
+    """Last successful publish per workfile and context."""
+
+    @property
+    def path(self) -> str:
+        return os.environ.get(PUBLISH_INDEX_ENV) or super().path
+
+
+PUBLISH_INDEX = PublishIndex("publish_index", max_entries=10000)
+
+
+def get_file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return SHA-256 hex digest of the file contents."""
+    import hashlib
+
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_index_key(
+    project_name: str,
+    folder_path: str,
+    task_name: str,
+    app_name: str,
+    filepath: str
+) -> str:
+    filepath = os.path.normcase(os.path.abspath(filepath))
+    return "|".join((project_name, folder_path, task_name, app_name, filepath))
+
+
+def get_last_version_ids(
+    project_name: str,
+    product_ids: List[str]
+) -> Dict[str, Optional[str]]:
+    """Return id of the last version per product, None if it has none."""
+    import ayon_api
+
+    if not product_ids:
+        return {}
+    last_versions = ayon_api.get_last_versions(
+        project_name, product_ids, fields={"id"}
+    )
+    last_version_ids = {}
+    for product_id in product_ids:
+        version = last_versions.get(product_id)
+        last_version_ids[product_id] = version["id"] if version else None
+    return last_version_ids
+
+
+def get_loaded_product_ids(
+    project_name: str,
+    representation_ids: List[str]
+) -> List[str]:
+    """Return ids of the products the loaded representations belong to."""
+    import ayon_api
+
+    if not representation_ids:
+        return []
+    version_ids = {
+        representation["versionId"]
+        for representation in ayon_api.get_representations(
+            project_name,
+            representation_ids=set(representation_ids),
+            fields={"id", "versionId"}
+        )
+    }
+    if not version_ids:
+        return []
+    return sorted({
+        version["productId"]
+        for version in ayon_api.get_versions(
+            project_name,
+            version_ids=version_ids,
+            fields={"id", "productId"}
+        )
+    })
+
+
+def get_loaded_last_version_ids(
+    project_name: str,
+    representation_ids: List[str]
+) -> Dict[str, Optional[str]]:
+    """Return id of the last version per product loaded in a workfile.
+
+    Args:
+        project_name (str): The project name.
+        representation_ids (List[str]): Representations loaded in the
+            workfile.
+
+    """
+    return get_last_version_ids(
+        project_name,
+        get_loaded_product_ids(project_name, representation_ids)
+    )
+
+
+def record_publish(
+    key: str,
+    project_name: str,
+    filepath: str,
+    scripts: List[str],
+    last_version_ids: Dict[str, Optional[str]]
+):
+    """Store the state of a workfile after it published successfully.
+
+    The workfile is hashed after publishing because publishing may save it.
+
+    Args:
+        key (str): The index key, see `get_index_key`.
+        project_name (str): The project name.
+        filepath (str): The published workfile.
+        scripts (List[str]): The publish scripts that were used.
+        last_version_ids (Dict[str, Optional[str]]): Last version per
+            loaded product when the workfile was opened, see
+            `get_loaded_last_version_ids`.
+
+    """
+    PUBLISH_INDEX.set(key, {
+        "size": os.path.getsize(filepath),
+        "hash": get_file_hash(filepath),
+        "scripts": scripts,
+        "last_version_ids": last_version_ids,
+    })
+
+
+def is_unchanged(
+    key: str,
+    project_name: str,
+    filepath: str,
+    scripts: List[str]
+) -> bool:
+    """Return whether workfile is unchanged since its last publish.
+
+    It is unchanged when it published before with the same scripts, its
+    contents are the same and none of the products loaded in it got a newer
+    version since.
+    """
+    entry = PUBLISH_INDEX.get(key)
+    if not entry or entry["scripts"] != scripts:
+        return False
+
+    # Only hash when the size did not already tell it changed
+    if os.path.getsize(filepath) != entry["size"]:
+        return False
+    if get_file_hash(filepath) != entry["hash"]:
+        return False
+
+    last_version_ids = entry["last_version_ids"]
+    return get_last_version_ids(
+        project_name, list(last_version_ids)
+    ) == last_version_ids
@@ -0,0 +1,189 @@
+"""Sample resource usage of the launched application's process tree.
+
+`ResourceSampler` is called periodically while the application runs and
+reads the memory, CPU time and I/O of each process in the tree from `/proc`.
+The tree consists of all processes in the session of the launched process,
+which `run_script` starts in a new session, so processes reparented after
+their parent exited are still included.
+
+Sampling is only supported on Linux, elsewhere the sampler reports nothing.
+"""
+import os
+import time
+from typing import Dict, Optional
+
+PROC_DIR = "/proc"
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    # Windows
+    _CLOCK_TICKS = _PAGE_SIZE = None
+
+
+def _read_stat(pid: int) -> Optional[dict]:
+    """Return parent, session, CPU seconds and RSS bytes of a process"""
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), "stat"), "r") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    # The command name may contain spaces, so split after its parentheses
+    fields = data[data.rfind(")") + 2:].split()
+    try:
+        return {
+            "ppid": int(fields[1]),
+            "session": int(fields[3]),
+            "cpu": (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS,
+            "rss": int(fields[21]) * _PAGE_SIZE,
+        }
+    except (IndexError, ValueError):
+        return None
+
+
+def _read_io(pid: int) -> Dict[str, int]:
+    """Return bytes read from and written to storage by a process"""
+    io = {}
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), "io"), "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in {"read_bytes", "write_bytes"}:
+                    io[key] = int(value)
+    except (OSError, ValueError):
+        # Not permitted for processes of other users
+        pass
+    return io
+
+
+def is_supported() -> bool:
+    return _CLOCK_TICKS is not None and os.path.isdir(PROC_DIR)
+
+
+class ResourceSampler:
+    """Track resource usage of a process tree from periodic samples.
+
+    Call the sampler periodically while the process runs, samples are taken
+    at most every `interval` seconds.
+
+    Args:
+        pid (int): The root process of the tree.
+        interval (float): Minimum seconds between samples.
+
+    """
+
+    def __init__(self, pid: int, interval: float = 5.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = 0
+        self.rss = 0
+        self.peak_rss = 0
+        # Highest CPU time of a single process, as the CPU rlimit applies
+        # per process
+        self.max_process_cpu = 0.0
+        self._start = time.monotonic()
+        self._end = self._start
+        self._next_sample = 0.0
+        # Last seen CPU time and I/O per process, including exited ones
+        self._cpu = {}
+        self._io = {}
+
+    def __call__(self):
+        now = time.monotonic()
+        if now < self._next_sample:
+            return
+        self._next_sample = now + self.interval
+        self.sample()
+
+    def _get_tree_stats(self) -> Dict[int, dict]:
+        stats = {}
+        for name in os.listdir(PROC_DIR):
+            if not name.isdigit():
+                continue
+            pid = int(name)
+            stat = _read_stat(pid)
+            if stat is not None:
+                stats[pid] = stat
+
+        # Processes in the session of the root process or descending from it
+        tree = {
+            pid: stat for pid, stat in stats.items()
+            if pid == self.pid or stat["session"] == self.pid
+        }
+        added = True
+        while added:
+            added = False
+            for pid, stat in stats.items():
+                if pid not in tree and stat["ppid"] in tree:
+                    tree[pid] = stat
+                    added = True
+        return tree
+
+    def sample(self):
+        """Sample the current resource usage of the process tree"""
+        if not is_supported():
+            return
+
+        tree = self._get_tree_stats()
+        if not tree:
+            return
+        self.samples += 1
+        self._end = time.monotonic()
+        self.rss = sum(stat["rss"] for stat in tree.values())
+        self.peak_rss = max(self.peak_rss, self.rss)
+        for pid, stat in tree.items():
+            self._cpu[pid] = stat["cpu"]
+            self.max_process_cpu = max(self.max_process_cpu, stat["cpu"])
+            io = _read_io(pid)
+            if io:
+                self._io[pid] = io
+
+    def get_usage(self) -> dict:
+        """Return resource usage sampled so far.
+
+        Returns:
+            dict: With `peak_rss_bytes`, `cpu_seconds`, `wall_seconds`,
+                `average_cores`, `read_bytes`, `write_bytes`, `processes`,
+                `child_processes` and `samples`.
+
+        """
+        cpu_seconds = sum(self._cpu.values())
+        wall_seconds = self._end - self._start
+        return {
+            "peak_rss_bytes": self.peak_rss,
+            "cpu_seconds": cpu_seconds,
+            "wall_seconds": wall_seconds,
+            "average_cores": (
+                cpu_seconds / wall_seconds if wall_seconds > 0 else 0.0
+            ),
+            "read_bytes": sum(
+                io.get("read_bytes", 0) for io in self._io.values()),
+            "write_bytes": sum(
+                io.get("write_bytes", 0) for io in self._io.values()),
+            "processes": len(self._cpu),
+            "child_processes": len(set(self._cpu) - {self.pid}),
+            "samples": self.samples,
+        }
+
+
+def format_bytes(size: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_usage(usage: dict) -> str:
+    """Return human readable summary of `ResourceSampler.get_usage()`"""
+    return (
+        f"peak RSS {format_bytes(usage['peak_rss_bytes'])}, "
+        f"CPU time {usage['cpu_seconds']:.1f}s "
+        f"(average {usage['average_cores']:.2f} cores over "
+        f"{usage['wall_seconds']:.1f}s), "
+        f"read {format_bytes(usage['read_bytes'])}, "
+        f"written {format_bytes(usage['write_bytes'])}, "
+        f"{usage['child_processes']} child processes"
+    )
@@ -3,13 +3,18 @@ import sys
 import subprocess
 
 from ayon_applications import (
-    ApplicationManager,
     ApplicationExecutableNotFound,
     ApplicationNotFound,
     ApplicationLaunchContext,
     ApplicationExecutable
 )
-from ayon_applications.utils import get_app_environments_for_context
+
+from . import heartbeat, tracing
+from .lib import (
+    find_app_executable,
+    get_app_environments,
+    get_application_manager
+)
 
 
 def get_relative_executable(executable: ApplicationExecutable,
@@ -28,7 +33,9 @@ def run_script(
     script_path: str,
     headless: bool = True,
     start_last_workfile: bool = False,
-    env: dict = None
+    env: dict = None,
+    stdout=subprocess.PIPE,
+    preexec_fn=None
 ) -> subprocess.Popen:
     """Launch application with the given python script.
 
@@ -43,27 +50,36 @@ def run_script(
         start_last_workfile (booL): Whether to launch with last workfile being
             opened directly.
         env (dict): Base environment to work with.
+        stdout: Where the application writes its output, stderr included.
+            Defaults to a pipe to capture the output from, use None to
+            inherit the current stdout and stderr or pass a file object to
+            write directly to a log file.
+        preexec_fn (Optional[Callable[[], None]]): Function to call in the
+            launched process before the application starts, e.g. to apply
+            resource limits.
 
     Returns:
         Popen: The Blender process.
     """
 
-    application_manager = ApplicationManager()
+    application_manager = get_application_manager()
     app = application_manager.applications.get(app_name)
     if not app:
         raise ApplicationNotFound(app_name)
 
-    executable = app.find_executable()
+    with tracing.span("find_app_executable", app_name=app_name):
+        executable = find_app_executable(app)
     if not executable:
         raise ApplicationExecutableNotFound(app)
 
     # Must-have for proper launch of app
-    app_env = get_app_environments_for_context(
-        project_name,
-        folder_path,
-        task_name,
-        app_name
-    )
+    with tracing.span("get_app_environments", app_name=app_name):
+        app_env = get_app_environments(
+            project_name,
+            folder_path,
+            task_name,
+            app_name
+        )
 
     if env is None:
         env = os.environ.copy()
@@ -71,6 +87,14 @@ def run_script(
 
     # Application specific arguments to launch script
     host_name = app_name.split("/", 1)[0]
+
+    # Maya and Fusion install the stack dump handler in their launch command
+    # or script, other hosts run a wrapper that does so before the script
+    if (
+        heartbeat.STACK_DUMP_FILE_ENV in env
+        and host_name not in {"maya", "fusion"}
+    ):
+        script_path = heartbeat.wrap_script(script_path, env)
     app_args = []
     data = {}
 
@@ -106,6 +130,18 @@ def run_script(
             "execfile(script_path) if sys.version_info.major == 2 else "
             "exec(open(script_path).read())"
         )
+        if heartbeat.STACK_DUMP_FILE_ENV in env:
+            # Allow stack dumps when the script stalls
+            python_command = (
+                "from ayon_launch_scripts import heartbeat; "
+                "heartbeat.install(); "
+            ) + python_command
+        if tracing.TRACE_FILE_ENV in env:
+            # Record the startup time before running the script
+            python_command = (
+                "from ayon_launch_scripts import tracing; "
+                "tracing.record_startup(); "
+            ) + python_command
         mel_command = f'python("{python_command}");'
         if not headless:
             # TODO: If the python command fails then Maya GUI mode will not
@@ -156,6 +192,8 @@ def run_script(
         start_last_workfile=start_last_workfile,
     ))
 
+    tracing.set_launch_time(env)
+
     # Enforce the output to not be redirected to process monitor because
     # otherwise we can't print any stdout here from the process
     app.redirect_output = False
@@ -163,10 +201,21 @@ def run_script(
         app, executable, **data
     )
 
-    # TODO: Do not hardcode this - we might not always want to capture output
-    #  and especially not stderr -> stdout. For now this is used to capture
-    #  the output from the subprocess and log the output accordingly
-    context.kwargs["stdout"] = subprocess.PIPE
-    context.kwargs["stderr"] = subprocess.STDOUT
+    # Capture the output from the subprocess, or write it elsewhere directly
+    # without relaying it through this process
+    if stdout is None:
+        context.kwargs["stdout"] = None
+        context.kwargs["stderr"] = None
+    else:
+        context.kwargs["stdout"] = stdout
+        context.kwargs["stderr"] = subprocess.STDOUT
+
+    # Launch in a new process group so that the application and all its
+    # child processes can be terminated together on timeout
+    if sys.platform != "win32":
+        context.kwargs["start_new_session"] = True
+
+    if preexec_fn is not None:
+        context.kwargs["preexec_fn"] = preexec_fn
 
     return context.launch()
@@ -0,0 +1,16 @@
+# Globals provided by the host, which should remain available to the script
+host_globals = {
+    key: value for key, value in globals().items()
+    if not key.startswith("__")
+}
+
+import os  # noqa: E402
+import runpy  # noqa: E402
+
+from ayon_launch_scripts import heartbeat, tracing  # noqa: E402
+
+tracing.record_startup()
+heartbeat.install()
+runpy.run_path(os.environ[heartbeat.WRAPPED_SCRIPT_ENV],
+               init_globals=host_globals,
+               run_name="__main__")
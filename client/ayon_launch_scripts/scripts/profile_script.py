@@ -0,0 +1,15 @@
+# Globals provided by the host or the host's launch script, e.g. `fusion`,
+# which should remain available to the profiled script
+host_globals = {
+    key: value for key, value in globals().items()
+    if not key.startswith("__")
+}
+
+import os  # noqa: E402
+
+from ayon_launch_scripts import profiling, tracing  # noqa: E402
+
+tracing.record_startup()
+profiling.run_path_profiled(os.environ[profiling.PROFILE_SCRIPT_ENV],
+                            os.environ[profiling.PROFILE_FILE_ENV],
+                            init_globals=host_globals)
@@ -1,15 +1,30 @@
+import contextlib
+import json
 import os
 import sys
 import runpy
+import time
+import traceback
 
+import ayon_api
 import pyblish.api
 import pyblish.util
 
 from ayon_core.pipeline.create import CreateContext
 from ayon_core.pipeline import registered_host
-from ayon_core.host import IPublishHost
+from ayon_core.pipeline.context_tools import change_current_context
+from ayon_core.host import ILoadHost, IPublishHost
 
-from ayon_launch_scripts.lib import is_success_shutdown
+from ayon_launch_scripts import events, heartbeat, tracing
+from ayon_launch_scripts.publish_index import (
+    RECORD_PUBLISH_ENV,
+    get_loaded_last_version_ids
+)
+from ayon_launch_scripts.lib import (
+    get_success_shutdown_message,
+    is_success_shutdown,
+    reset_success_shutdown
+)
 
 
 def run_path(path):
@@ -22,59 +37,232 @@ def run_path(path):
     return result
 
 
-def main():
-    host = registered_host()
-    assert host, "Host must already be installed and registered."
+@contextlib.contextmanager
+def phase(name, report=None, **data):
+    """Emit phase start and end events and trace a span around the context.
 
-    # Get required inputs
-    filepath = os.environ["PUBLISH_WORKFILE"]
+    The duration of the phase is also added to the `report`, if any.
+    """
+    events.emit("phase_start", phase=name, **data)
+    start = time.time()
+    try:
+        with tracing.span(name, **data):
+            yield
+    finally:
+        duration = time.time() - start
+        events.emit("phase_end", phase=name, duration=duration, **data)
+        if report is not None:
+            report["phases"].append(
+                {"phase": name, "duration": duration, **data}
+            )
 
-    # Get optional inputs
-    pre_workfile_scripts = [
-        script for script in
-        os.environ.get("PUBLISH_PRE_WORKFILE_SCRIPTS", "").split(os.pathsep)
-        if script.strip()
-    ]
-    pre_publish_scripts = [
-        script for script in
-        os.environ.get("PUBLISH_PRE_SCRIPTS", "").split(os.pathsep)
-        if script.strip()
-    ]
-    post_publish_scripts = [
+
+def get_instance_label(instance):
+    """Return label of pyblish instance, if any"""
+    if instance is None:
+        return None
+    return instance.data.get("label") or instance.name
+
+
+def get_instance_reports(pyblish_context, create_context=None):
+    """Return whether each instance was published and its version id"""
+    reports = []
+    for instance in pyblish_context:
+        version_entity = instance.data.get("versionEntity") or {}
+        reports.append({
+            "label": get_instance_label(instance),
+            "product_type": instance.data.get("productType"),
+            "published": bool(version_entity),
+            "version_id": version_entity.get("id"),
+        })
+
+    # Inactive instances are not collected by pyblish
+    if create_context is not None:
+        for instance in create_context.instances:
+            if instance.get("active"):
+                continue
+            reports.append({
+                "label": instance.label,
+                "product_type": instance.get("productType"),
+                "published": False,
+                "version_id": None,
+            })
+    return reports
+
+
+def get_loaded_representation_ids(host):
+    """Return ids of the representations loaded in the opened workfile"""
+    if isinstance(host, ILoadHost):
+        containers = host.get_containers()
+    else:
+        ls = getattr(host, "ls", None)
+        containers = ls() if ls else []
+    return sorted({
+        container["representation"] for container in containers
+        if container.get("representation")
+    })
+
+
+def get_timings(phases, plugin_results):
+    """Aggregate durations per phase, plugin and instance.
+
+    Args:
+        phases (list[dict]): Phases with `phase`, `duration` and optionally
+            `script`.
+        plugin_results (list[dict]): Processed plugins with `plugin`,
+            `instance` and `duration`.
+
+    Returns:
+        dict: With `phases`, `plugins` and `instances` timings, each sorted
+            from slowest to fastest.
+
+    """
+    def aggregate(items, key):
+        totals = {}
+        for item in items:
+            name = key(item)
+            total = totals.setdefault(name, {"name": name,
+                                             "duration": 0.0,
+                                             "count": 0})
+            total["duration"] += item["duration"]
+            total["count"] += 1
+        return sorted(totals.values(),
+                      key=lambda total: total["duration"],
+                      reverse=True)
+
+    def get_phase_name(item):
+        script = item.get("script")
+        if script:
+            return f"{item['phase']}: {os.path.basename(script)}"
+        return item["phase"]
+
+    return {
+        "phases": aggregate(phases, get_phase_name),
+        "plugins": aggregate(plugin_results, lambda item: item["plugin"]),
+        "instances": aggregate(
+            plugin_results,
+            # Context plugins have no instance
+            lambda item: item["instance"] or "Context"
+        ),
+    }
+
+
+def print_timings(timings):
+    """Print timings as returned by `get_timings` as tables"""
+    for title, key in [
+        ("Phase", "phases"),
+        ("Plugin", "plugins"),
+        ("Instance", "instances"),
+    ]:
+        rows = timings[key]
+        if not rows:
+            continue
+        width = max(len(title), *(len(row["name"]) for row in rows))
+        print(f"{title:<{width}}  {'Seconds':>9}  {'Count':>5}")
+        for row in rows:
+            print(f"{row['name']:<{width}}  "
+                  f"{row['duration']:>9.2f}  {row['count']:>5}")
+        print()
+    sys.stdout.flush()
+
+
+def get_script_paths(env_key):
+    """Return script paths listed in environment variable"""
+    return [
         script for script in
-        os.environ.get("PUBLISH_POST_SCRIPTS", "").split(os.pathsep)
+        os.environ.get(env_key, "").split(os.pathsep)
         if script.strip()
     ]
 
-    # TODO: What to do if a host does not auto-install? How to know which host
-    #  install to trigger? Can we reliably defer maybe for all hosts?
-    if not host:
-        host = registered_host()
-        assert host, "Must have a registered host active."
 
+def change_context(project_name, folder_path, task_name):
+    """Change the current context of the host if it differs.
+
+    Only switching folder and task is supported, a host session is bound
+    to the project it was launched with.
+    """
+    current_project_name = os.environ.get("AYON_PROJECT_NAME")
+    if project_name != current_project_name:
+        raise RuntimeError(
+            f"Unable to switch from project '{current_project_name}' "
+            f"to '{project_name}' within a host session."
+        )
+
+    if (
+        folder_path == os.environ.get("AYON_FOLDER_PATH")
+        and task_name == os.environ.get("AYON_TASK_NAME")
+    ):
+        return
+
+    folder_entity = ayon_api.get_folder_by_path(project_name, folder_path)
+    if not folder_entity:
+        raise RuntimeError(f"Folder not found: {folder_path}")
+    task_entity = ayon_api.get_task_by_name(
+        project_name, folder_entity["id"], task_name
+    )
+    if not task_entity:
+        raise RuntimeError(f"Task not found: {folder_path} > {task_name}")
+
+    print(f"Changing context to {project_name} > {folder_path} > {task_name}")
+    change_current_context(folder_entity, task_entity)
+
+
+def publish_workfile(
+    host,
+    filepath,
+    pre_workfile_scripts,
+    pre_publish_scripts,
+    post_publish_scripts,
+    report=None
+):
+    """Open workfile, run the pre/post scripts and publish.
+
+    Returns early if any of the scripts called `succeed_with_message`.
+
+    Raises:
+        RuntimeError: When publishing failed.
+
+    """
     for script in pre_workfile_scripts:
         print(f"Running pre-workfile script: {script}")
-        run_path(script)
+        with phase("pre_workfile_script", report, script=script):
+            run_path(script)
         if is_success_shutdown():
             return
 
     # Open workfile, the application should've been launched with the matching
     # context for that workfile
     print(f"Opening workfile: {filepath}")
-    host.open_file(filepath)
+    with phase("open_workfile", report, filepath=filepath):
+        host.open_file(filepath)
+    if report is not None:
+        # Before any pre-publish script gets to update the containers.
+        # Snapshot the last versions now so versions published while this
+        # job runs are not recorded as used by this publish
+        try:
+            representation_ids = get_loaded_representation_ids(host)
+            report["representation_ids"] = representation_ids
+            if os.environ.get(RECORD_PUBLISH_ENV) == "1":
+                report["last_version_ids"] = get_loaded_last_version_ids(
+                    os.environ["AYON_PROJECT_NAME"], representation_ids)
+        except Exception as exc:
+            print(f"Failed to get loaded products: {exc}")
 
     for script in pre_publish_scripts:
         print(f"Running pre-publish script: {script}")
-        run_path(script)
+        with phase("pre_publish_script", report, script=script):
+            run_path(script)
         if is_success_shutdown():
             return
 
     # Trigger publish, catch errors
-    success = publish()
+    with phase("publish", report):
+        success = publish(report)
 
     for script in post_publish_scripts:
         print(f"Running post-publish script: {script}")
-        run_path(script)
+        with phase("post_publish_script", report, script=script):
+            run_path(script)
         if is_success_shutdown():
             return
 
@@ -86,9 +274,154 @@ def main():
         raise RuntimeError("Errors occurred during publishing.")
 
 
-def publish():
+def publish_workfile_with_report(host, filepath, context=None, **scripts):
+    """Publish workfile and return a report of the outcome.
+
+    Unlike `publish_workfile` this does not raise an error when publishing
+    fails but reports it as failed instead.
+
+    Args:
+        host (HostBase): The registered host.
+        filepath (str): The workfile to publish.
+        context (Optional[tuple[str, str, str]]): Project name, folder path
+            and task name to change to before publishing.
+        **scripts: The pre- and post-publish scripts to run.
+
+    Returns:
+        dict: The publish report.
+
+    """
+    # Reset early exit state of a previous publish
+    reset_success_shutdown()
+
+    report = {
+        "filepath": filepath,
+        "status": None,
+        "succeed_with_message": False,
+        "message": None,
+        "instances": [],
+        "version_ids": [],
+        "representation_ids": None,
+        "last_version_ids": None,
+        "phases": [],
+        "plugin_results": [],
+        "errors": [],
+        "timings": {},
+    }
+    try:
+        if context:
+            change_context(*context)
+        publish_workfile(host, filepath, report=report, **scripts)
+    except Exception as exc:
+        traceback.print_exc()
+        events.emit("error", message=str(exc), filepath=filepath)
+        report["status"] = "failed"
+        report["errors"].append({"message": str(exc)})
+    else:
+        report["status"] = "published"
+        if is_success_shutdown():
+            report["succeed_with_message"] = True
+            report["message"] = get_success_shutdown_message()
+
+    report["version_ids"] = [
+        instance["version_id"] for instance in report["instances"]
+        if instance["version_id"]
+    ]
+    if report["status"] == "published" and not report["version_ids"]:
+        # E.g. exited early with `succeed_with_message` before publishing
+        report["status"] = "skipped"
+
+    report["timings"] = get_timings(report["phases"],
+                                    report["plugin_results"])
+    print_timings(report["timings"])
+    events.emit("timings", filepath=filepath, **report["timings"])
+    return report
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def publish_batch(host, manifest_path, results_path, **scripts):
+    """Publish each workfile listed in manifest within this host session.
+
+    A failing entry does not abort the remaining entries. The result of each
+    entry is written to `results_path` as soon as it finishes so that the
+    results are available up to a crash of the host.
+    """
+    with open(manifest_path, "r") as f:
+        entries = json.load(f)
+
+    results = []
+    for index, entry in enumerate(entries):
+        print(f"Batch publish {index + 1}/{len(entries)}: "
+              f"{entry['folder_path']} > {entry['task_name']} > "
+              f"{entry['filepath']}")
+
+        with phase("batch_entry", filepath=entry["filepath"]):
+            report = publish_workfile_with_report(
+                host,
+                entry["filepath"],
+                context=(entry["project_name"],
+                         entry["folder_path"],
+                         entry["task_name"]),
+                **scripts
+            )
+        results.append({**entry, **report})
+        write_json(results_path, results)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+
+def main():
+    tracing.record_startup()
+    host = registered_host()
+    assert host, "Host must already be installed and registered."
+    heartbeat.install()
+
+    # Get optional inputs
+    scripts = {
+        "pre_workfile_scripts": get_script_paths(
+            "PUBLISH_PRE_WORKFILE_SCRIPTS"),
+        "pre_publish_scripts": get_script_paths("PUBLISH_PRE_SCRIPTS"),
+        "post_publish_scripts": get_script_paths("PUBLISH_POST_SCRIPTS"),
+    }
+
+    # TODO: What to do if a host does not auto-install? How to know which host
+    #  install to trigger? Can we reliably defer maybe for all hosts?
+    if not host:
+        host = registered_host()
+        assert host, "Must have a registered host active."
+
+    manifest_path = os.environ.get("PUBLISH_MANIFEST")
+    if manifest_path:
+        publish_batch(host,
+                      manifest_path,
+                      os.environ["PUBLISH_BATCH_RESULTS"],
+                      **scripts)
+        return
+
+    # Get required inputs
+    filepath = os.environ["PUBLISH_WORKFILE"]
+    report = publish_workfile_with_report(host, filepath, **scripts)
+
+    result_path = os.environ.get("PUBLISH_RESULT_JSON")
+    if result_path:
+        write_json(result_path, report)
+
+    if report["status"] == "failed":
+        raise RuntimeError("Errors occurred during publishing.")
+
+
+def publish(report=None):
     """Trigger headless publish in host
 
+    Args:
+        report (Optional[dict]): Publish report to add the instances and
+            errors to.
+
     Returns:
         bool: Whether publish finished successfully without errors
     """
@@ -96,6 +429,7 @@ def publish():
     error_format = "Failed {plugin.__name__}: {error} -- {error.traceback}"
 
     host = registered_host()
+    create_context = None
     if isinstance(host, IPublishHost):
         # New publisher host
         create_context = CreateContext(host)
@@ -109,6 +443,12 @@ def publish():
         pyblish_context = pyblish.api.Context()
         pyblish_context.data["create_context"] = create_context
         pyblish_plugins = create_context.publish_plugins
+
+        for instance in create_context.instances:
+            events.emit("instance",
+                        label=instance.label,
+                        product_type=instance.get("productType"),
+                        active=bool(instance.get("active")))
     else:
         # Legacy publisher host
         pyblish_context = pyblish.api.Context()  # pyblish default behavior
@@ -123,14 +463,28 @@ def publish():
     # TODO: Allow a validation to occur and potentially allow certain "Actions"
     #   to trigger on Validators (or other plugins?) if they exist
 
+    success = True
     for result in pyblish.util.publish_iter(
             context=pyblish_context,
             plugins=pyblish_plugins
     ):
+        instance_label = get_instance_label(result["instance"])
+        plugin_result = {
+            "plugin": result["plugin"].label or result["plugin"].__name__,
+            "instance": instance_label,
+            "success": result["success"],
+            # Pyblish reports the duration in milliseconds
+            "duration": result.get("duration", 0) / 1000.0,
+        }
+        events.emit("plugin", **plugin_result)
+        if report is not None:
+            report["plugin_results"].append(plugin_result)
+
         # Print progress for the Deadline Ayon Plug-in to set the jobs
         # progress.
         if "progress" in result:
             print("Publishing Progress: {}%".format(result["progress"]))
+            events.emit("progress", progress=result["progress"])
 
         for record in result["records"]:
             print("{}: {}".format(result["plugin"].label, record.msg))
@@ -142,9 +496,24 @@ def publish():
             #  to report all validation errors
             error_message = error_format.format(**result)
             print(error_message)
-            return False
+            events.emit("error",
+                        message=str(result["error"]),
+                        plugin=result["plugin"].label,
+                        instance=instance_label)
+            if report is not None:
+                report["errors"].append({
+                    "message": str(result["error"]),
+                    "plugin": result["plugin"].label,
+                    "instance": instance_label,
+                })
+            success = False
+            break
+
+    if report is not None:
+        report["instances"] = get_instance_reports(pyblish_context,
+                                                   create_context)
 
-    return True
+    return success
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+"""Keep the host alive and run scripts submitted by the `serve` command"""
+from ayon_core.pipeline import registered_host
+
+from ayon_launch_scripts import tracing
+from ayon_launch_scripts.serve import serve_from_env
+
+
+def main():
+    tracing.record_startup()
+    host = registered_host()
+    assert host, "Host must already be installed and registered."
+
+    serve_from_env()
+
+
+if __name__ == "__main__":
+    print("Starting serve script..")
+    main()
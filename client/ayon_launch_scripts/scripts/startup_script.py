@@ -0,0 +1,4 @@
+"""Report the time the host started running our script for `bench-startup`"""
+import time
+
+print(f"LAUNCH_SCRIPTS_SCRIPT_START {time.time()}", flush=True)
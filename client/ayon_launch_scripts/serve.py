@@ -0,0 +1,393 @@
+"""Warm host daemon to run many scripts in one already launched host.
+
+The `serve` command launches a headless host with `scripts/serve_script.py`
+which listens on a local socket. Clients (e.g. `run-script --serve_port`)
+submit scripts to it and receive the script's output and exit status back
+without paying the host's cold start again.
+
+The protocol is JSON lines over a localhost TCP connection. The client sends
+a single request line and the host replies with any number of `stdout`
+messages followed by a single `returncode` message. Each request must carry
+the secret token the `serve` command generated for the host, which it stores
+in a file only readable by the user, since any local user can connect to the
+port.
+"""
+import contextlib
+import hmac
+import json
+import os
+import runpy
+import socket
+import sys
+import time
+import traceback
+from typing import Callable, Optional
+
+DEFAULT_PORT = 50730
+DEFAULT_MAX_JOBS = 50
+# Exit code recorded for a submitted script that did not finish in time,
+# like the `timeout` command uses
+EXIT_CODE_TIMEOUT = 124
+
+# Environment variables passed from the `serve` command to the host
+SERVE_PORT_ENV = "LAUNCH_SCRIPTS_SERVE_PORT"
+SERVE_MAX_JOBS_ENV = "LAUNCH_SCRIPTS_SERVE_MAX_JOBS"
+SERVE_MAX_RSS_ENV = "LAUNCH_SCRIPTS_SERVE_MAX_RSS_MB"
+SERVE_TOKEN_ENV = "LAUNCH_SCRIPTS_SERVE_TOKEN"
+
+# Context keys a request must match with the served host
+CONTEXT_ENV_KEYS = {
+    "project_name": "AYON_PROJECT_NAME",
+    "folder_path": "AYON_FOLDER_PATH",
+    "task_name": "AYON_TASK_NAME",
+}
+
+
+def get_token_path(port: int) -> str:
+    """Return path of the file storing the token of the host on a port."""
+    from .cache import get_cache_dir
+
+    return os.path.join(get_cache_dir(), f"serve_{port}.token")
+
+
+def write_token(port: int, token: Optional[str] = None) -> str:
+    """Store token for the host served on a port, readable only by the user.
+
+    Args:
+        port (int): Local port the host is served on.
+        token (Optional[str]): The token, a random one is generated if not
+            passed.
+
+    Returns:
+        str: The token.
+
+    """
+    if not token:
+        token = os.urandom(32).hex()
+    path = get_token_path(port)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        # Restrict a previously existing file too
+        if hasattr(os, "fchmod"):
+            os.fchmod(f.fileno(), 0o600)
+        f.write(token)
+    return token
+
+
+def get_token(port: int) -> str:
+    """Return token to submit scripts to the host served on a port.
+
+    The token is taken from `SERVE_TOKEN_ENV` when set, otherwise from the
+    file the `serve` command wrote.
+
+    Raises:
+        ConnectionError: When no token is found for the port.
+
+    """
+    token = os.environ.get(SERVE_TOKEN_ENV)
+    if token:
+        return token
+    try:
+        with open(get_token_path(port), "r") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        raise ConnectionError(
+            f"No token found for a served host on port {port}, is it served "
+            f"by another user? Set {SERVE_TOKEN_ENV} to its token."
+        ) from None
+
+
+def get_rss_mb() -> Optional[float]:
+    """Return current resident memory of this process in megabytes.
+
+    Returns:
+        Optional[float]: Resident set size or None if it can't be detected
+            on the current platform.
+
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+
+    # Peak instead of current RSS, but good enough to decide on recycling.
+    # Note that macOS reports bytes whereas Linux reports kilobytes.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+class _SocketWriter:
+    """File-like object that sends everything written as `stdout` messages"""
+
+    def __init__(self, connection: socket.socket):
+        self._connection = connection
+
+    def write(self, text: str) -> int:
+        if text:
+            _send_message(self._connection, {"stdout": text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _send_message(connection: socket.socket, message: dict):
+    data = json.dumps(message) + "\n"
+    connection.sendall(data.encode("utf-8"))
+
+
+def _iter_messages(connection: socket.socket):
+    with connection.makefile("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _get_context_mismatch(request: dict) -> Optional[str]:
+    """Return reason why request does not match served context, if any."""
+    for key, env_key in CONTEXT_ENV_KEYS.items():
+        value = request.get(key)
+        if value and value != os.environ.get(env_key):
+            return (
+                f"Requested {key} '{value}' does not match served "
+                f"{key} '{os.environ.get(env_key)}'"
+            )
+
+    # Allow requesting just the host name, e.g. `maya`, or an exact variant
+    app_name = request.get("app_name")
+    served_app_name = os.environ.get("AYON_APP_NAME", "")
+    if app_name:
+        if "/" not in app_name:
+            served_app_name = served_app_name.split("/", 1)[0]
+        if app_name != served_app_name:
+            return (
+                f"Requested application '{app_name}' does not match served "
+                f"application '{served_app_name}'"
+            )
+    return None
+
+
+def run_script_isolated(script_path: str, env: Optional[dict] = None) -> int:
+    """Run Python script in its own namespace and return its exit status.
+
+    Unlike `runpy.run_path` with `init_globals=globals()` the script does not
+    share or leak any globals with the caller or with previously run scripts.
+
+    Args:
+        script_path (str): The python script to run.
+        env (Optional[dict]): Environment variables to set while the script
+            runs. The previous environment is restored afterwards.
+
+    Returns:
+        int: Exit status, zero on success.
+
+    """
+    original_env = os.environ.copy()
+    if env:
+        os.environ.update(env)
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit as exc:
+        if exc.code is None:
+            return 0
+        if isinstance(exc.code, int):
+            return exc.code
+        print(exc.code)
+        return 1
+    except Exception:
+        traceback.print_exc(file=sys.stdout)
+        return 1
+    finally:
+        os.environ.clear()
+        os.environ.update(original_env)
+    return 0
+
+
+def _handle_connection(connection: socket.socket, token: str) -> bool:
+    """Process a single client request.
+
+    Returns:
+        bool: Whether a script was run.
+
+    """
+    request = next(_iter_messages(connection), None)
+    if not request:
+        return False
+
+    if not hmac.compare_digest(str(request.get("token", "")), token):
+        print("Refused request with invalid token")
+        _send_message(connection, {"stdout": "Invalid token\n"})
+        _send_message(connection, {"returncode": 1})
+        return False
+
+    mismatch = _get_context_mismatch(request)
+    if mismatch:
+        _send_message(connection, {"stdout": f"{mismatch}\n"})
+        _send_message(connection, {"returncode": 1})
+        return False
+
+    script_path = request["script_path"]
+    print(f"Running script: {script_path}")
+    writer = _SocketWriter(connection)
+    start = time.time()
+    with contextlib.redirect_stdout(writer), \
+            contextlib.redirect_stderr(writer):
+        returncode = run_script_isolated(script_path, request.get("env"))
+    print(f"Finished script in {time.time() - start:.2f}s "
+          f"with returncode: {returncode}")
+
+    _send_message(connection, {"returncode": returncode})
+    return True
+
+
+def serve_forever(
+    token: str,
+    port: int = DEFAULT_PORT,
+    max_jobs: Optional[int] = DEFAULT_MAX_JOBS,
+    max_rss_mb: Optional[float] = None
+):
+    """Accept and run scripts until the host should be recycled.
+
+    This should be run inside the launched host. Returning from this function
+    means the host is due for recycling, e.g. after `max_jobs` scripts or when
+    its memory usage exceeds `max_rss_mb`, after which the host should quit
+    so the `serve` command can launch a fresh one.
+
+    Args:
+        token (str): Secret each request must carry.
+        port (int): Local port to listen on.
+        max_jobs (Optional[int]): Recycle the host after this many scripts.
+        max_rss_mb (Optional[float]): Recycle the host when its resident
+            memory exceeds this amount of megabytes after a script.
+
+    """
+    if not token:
+        raise ValueError("A token is required to serve scripts")
+
+    jobs = 0
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("127.0.0.1", port))
+        server.listen()
+        print(f"Serving scripts on port {port}")
+        sys.stdout.flush()
+
+        while True:
+            connection, _address = server.accept()
+            with connection:
+                try:
+                    if not _handle_connection(connection, token):
+                        continue
+                except (OSError, ValueError) as exc:
+                    # Client disconnected or sent an invalid request
+                    print(f"Failed to handle request: {exc}")
+                    continue
+            sys.stdout.flush()
+            jobs += 1
+
+            if max_jobs and jobs >= max_jobs:
+                print(f"Recycling host after {jobs} jobs")
+                return
+
+            rss = get_rss_mb()
+            if max_rss_mb and rss and rss > max_rss_mb:
+                print(f"Recycling host using {rss:.0f} MB after {jobs} jobs")
+                return
+
+
+def serve_from_env():
+    """Run `serve_forever` with the settings passed by the `serve` command"""
+    max_rss_mb = os.environ.get(SERVE_MAX_RSS_ENV)
+    serve_forever(
+        token=os.environ.get(SERVE_TOKEN_ENV),
+        port=int(os.environ.get(SERVE_PORT_ENV, DEFAULT_PORT)),
+        max_jobs=int(os.environ.get(SERVE_MAX_JOBS_ENV, DEFAULT_MAX_JOBS)),
+        max_rss_mb=float(max_rss_mb) if max_rss_mb else None
+    )
+
+
+def submit_script(
+    script_path: str,
+    port: int = DEFAULT_PORT,
+    env: Optional[dict] = None,
+    output: Callable[[str], None] = None,
+    connect_timeout: float = 10.0,
+    timeout: Optional[float] = None,
+    token: Optional[str] = None,
+    **context
+) -> int:
+    """Run a script in a host served by the `serve` command.
+
+    Args:
+        script_path (str): The python script to run.
+        port (int): Local port the served host listens on.
+        env (Optional[dict]): Environment variables to set while the script
+            runs in the host.
+        output (Callable[[str], None]): Callback for the script's output.
+            Defaults to writing to stdout.
+        connect_timeout (float): Seconds to wait for the served host to
+            accept the connection.
+        timeout (Optional[float]): Seconds to wait for the script to finish.
+            The script keeps running in the host when timing out, until it
+            fails to write output to the closed connection.
+        token (Optional[str]): Token of the served host. Defaults to the
+            one returned by `get_token`.
+        **context: Optional `project_name`, `folder_path`, `task_name` and
+            `app_name` the served host must match.
+
+    Returns:
+        int: The script's exit status.
+
+    Raises:
+        ConnectionError: When no served host is listening on the port or the
+            connection was closed before the script finished.
+        TimeoutError: When the script did not finish within `timeout`.
+
+    """
+    if output is None:
+        def output(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    request = dict(context)
+    request["token"] = token or get_token(port)
+    request["script_path"] = os.path.abspath(script_path)
+    if env:
+        request["env"] = env
+
+    deadline = time.monotonic() + timeout if timeout else None
+    with socket.create_connection(("127.0.0.1", port),
+                                  timeout=connect_timeout) as connection:
+        # Scripts may run for a long time so only time out reading when
+        # a timeout is given
+        connection.settimeout(timeout)
+        _send_message(connection, request)
+        try:
+            for message in _iter_messages(connection):
+                if "stdout" in message:
+                    output(message["stdout"])
+                if "returncode" in message:
+                    return message["returncode"]
+                if deadline:
+                    connection.settimeout(
+                        max(deadline - time.monotonic(), 0.001))
+        except socket.timeout:
+            raise TimeoutError(
+                f"Timeout reached after {timeout} seconds") from None
+
+    raise ConnectionError("Served host closed connection before script ended")
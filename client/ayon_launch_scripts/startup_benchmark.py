@@ -0,0 +1,148 @@
+"""Measure the cold start latency of application variants.
+
+Each variant is launched through `run_script` with `scripts/startup_script.py`
+which only prints the time it started running. Per launch this records:
+    - `launch`: Seconds until the application process was started, which
+        includes resolving its environment and running its launch hooks.
+    - `first_output`: Seconds until the application printed anything.
+    - `script_start`: Seconds until our script started running.
+    - `exit`: Seconds until the application exited.
+    - `import_time`: Seconds spent importing Python modules at startup as
+        reported by `PYTHONPROFILEIMPORTTIME`, the environment variable
+        equivalent of `-X importtime`, if the host's Python supports it.
+
+All durations are measured from right before launching.
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .lib import find_app_executable, kill_process_tree
+from .metrics import percentile
+from .run_script import run_script
+
+STARTUP_SCRIPT_PATH = os.path.join(os.path.dirname(__file__),
+                                   "scripts",
+                                   "startup_script.py")
+
+SCRIPT_START_PREFIX = "LAUNCH_SCRIPTS_SCRIPT_START "
+
+# E.g. "import time:       512 |       1024 | ayon_core"
+IMPORT_TIME_REGEX = re.compile(r"import time:\s+(\d+) \|\s+\d+ \|")
+
+METRICS = ("launch", "first_output", "script_start", "exit", "import_time")
+
+
+def measure_startup(
+    project_name: str,
+    folder_path: str,
+    task_name: str,
+    app_name: str,
+    timeout: float = 600.0,
+    import_time: bool = False
+) -> Dict[str, Optional[float]]:
+    """Launch application once with an empty script and time its startup.
+
+    Args:
+        project_name (str): The project name.
+        folder_path (str): The folder path.
+        task_name (str): The task name.
+        app_name (str): The full application name, e.g. `maya/2024`.
+        timeout (float): Seconds after which the application is terminated.
+        import_time (bool): Measure the Python import time.
+
+    Returns:
+        Dict[str, Optional[float]]: Seconds per metric of `METRICS` and the
+            `returncode`. Metrics that could not be measured are None.
+
+    """
+    env = os.environ.copy()
+    if import_time:
+        env["PYTHONPROFILEIMPORTTIME"] = "1"
+
+    result = dict.fromkeys(METRICS)
+    start = time.time()
+    popen = run_script(
+        project_name=project_name,
+        folder_path=folder_path,
+        task_name=task_name,
+        app_name=app_name,
+        script_path=STARTUP_SCRIPT_PATH,
+        env=env
+    )
+    result["launch"] = time.time() - start
+
+    timer = threading.Timer(timeout, kill_process_tree, args=(popen,))
+    timer.start()
+    import_microseconds = 0
+    try:
+        for line in popen.stdout:
+            if result["first_output"] is None:
+                result["first_output"] = time.time() - start
+
+            line = line.decode("utf-8", errors="ignore").strip()
+            if line.startswith(SCRIPT_START_PREFIX):
+                script_start = float(line[len(SCRIPT_START_PREFIX):])
+                result["script_start"] = script_start - start
+                continue
+
+            match = IMPORT_TIME_REGEX.match(line)
+            if match and result["script_start"] is None:
+                import_microseconds += int(match.group(1))
+        popen.wait()
+    except KeyboardInterrupt:
+        kill_process_tree(popen)
+        raise
+    finally:
+        timer.cancel()
+
+    result["exit"] = time.time() - start
+    if import_microseconds:
+        result["import_time"] = import_microseconds / 1000000.0
+    result["returncode"] = popen.returncode
+    return result
+
+
+def get_distribution(values: List[float]) -> Optional[Dict[str, float]]:
+    """Return min, median, 90th percentile and max of values, if any"""
+    if not values:
+        return None
+    return {
+        "min": min(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "max": max(values),
+    }
+
+
+def summarize_startups(
+    results: List[Dict[str, Optional[float]]]
+) -> Dict[str, Optional[Dict[str, float]]]:
+    """Return the distribution per metric of multiple startups"""
+    return {
+        metric: get_distribution([
+            result[metric] for result in results
+            if result[metric] is not None
+        ])
+        for metric in METRICS
+    }
+
+
+def get_supported_app_names(application_manager) -> List[str]:
+    """Return enabled application variants with an executable on this machine.
+
+    Only variants of hosts `run_script` supports are returned.
+    """
+    supported_hosts = {
+        "blender", "maya", "houdini", "fusion", "nuke", "nukex", "nukestudio"
+    }
+    app_names = []
+    for app_name, app in application_manager.applications.items():
+        host_name = app_name.split("/", 1)[0]
+        if host_name not in supported_hosts or not app.enabled:
+            continue
+        if find_app_executable(app):
+            app_names.append(app_name)
+    return sorted(app_names)
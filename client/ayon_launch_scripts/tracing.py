@@ -0,0 +1,226 @@
+"""Trace spans across the CLI and the launched host.
+
+The CLI enables tracing with `enable()` and records spans for e.g. resolving
+the application and launching it. The trace context is passed to the host
+through the environment in W3C `traceparent` format so the spans recorded in
+the host with `span()` become children of the CLI's span of that host.
+
+The host should call `record_startup()` as early as possible. It records the
+`host_startup` span from right before the CLI launched the host up to that
+call, which shows how long the launch hooks and the application's own
+startup took before any of our code ran.
+
+Spans of all processes are appended to the same file, each line being an
+OTLP `ExportTraceServiceRequest` in JSON encoding as also written by the
+OpenTelemetry Collector file exporter, so they can be loaded into any OTLP
+compatible tool.
+
+Tracing is disabled unless the trace file is set. Failing to write a span is
+ignored so tracing never breaks the actual work.
+"""
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+TRACE_FILE_ENV = "LAUNCH_SCRIPTS_TRACE_FILE"
+TRACE_PARENT_ENV = "LAUNCH_SCRIPTS_TRACEPARENT"
+LAUNCH_TIME_ENV = "LAUNCH_SCRIPTS_LAUNCH_TIME_NS"
+
+SERVICE_NAME = "ayon_launch_scripts"
+
+# OTLP span kind and status codes
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_startup_recorded = False
+
+
+def enable(path: str):
+    """Record spans of this process and processes it launches to `path`"""
+    os.environ[TRACE_FILE_ENV] = os.path.abspath(path)
+
+
+def is_enabled() -> bool:
+    return bool(os.environ.get(TRACE_FILE_ENV))
+
+
+def _get_stack() -> list:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _get_parent() -> Tuple[Optional[str], Optional[str]]:
+    """Return trace id and span id of the current span, if any."""
+    stack = _get_stack()
+    if stack:
+        return stack[-1]
+
+    # Format: {version}-{trace id}-{parent span id}-{flags}
+    parts = os.environ.get(TRACE_PARENT_ENV, "").split("-")
+    if len(parts) == 4:
+        return parts[1], parts[2]
+    return None, None
+
+
+def get_env() -> dict:
+    """Return environment variables to pass the trace context to a host.
+
+    Returns:
+        dict: The environment variables, empty when tracing is not enabled.
+
+    """
+    if not is_enabled():
+        return {}
+    env = {TRACE_FILE_ENV: os.environ[TRACE_FILE_ENV]}
+    trace_id, span_id = _get_parent()
+    if trace_id and span_id:
+        env[TRACE_PARENT_ENV] = f"00-{trace_id}-{span_id}-01"
+    return env
+
+
+def _format_attributes(attributes: dict) -> list:
+    formatted = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = {"boolValue": value}
+        elif isinstance(value, int):
+            # OTLP JSON encodes 64-bit integers as strings
+            value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            value = {"doubleValue": value}
+        else:
+            value = {"stringValue": str(value)}
+        formatted.append({"key": key, "value": value})
+    return formatted
+
+
+def _write_span(
+    name: str,
+    trace_id: str,
+    span_id: str,
+    parent_id: Optional[str],
+    start_ns: int,
+    end_ns: int,
+    attributes: dict,
+    error: Optional[BaseException] = None
+):
+    path = os.environ.get(TRACE_FILE_ENV)
+    if not path:
+        return
+
+    span_data = {
+        "traceId": trace_id,
+        "spanId": span_id,
+        "name": name,
+        "kind": SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": str(start_ns),
+        "endTimeUnixNano": str(end_ns),
+        "attributes": _format_attributes(attributes),
+        "status": {"code": STATUS_CODE_OK},
+    }
+    if parent_id:
+        span_data["parentSpanId"] = parent_id
+    if error is not None:
+        span_data["status"] = {"code": STATUS_CODE_ERROR,
+                               "message": str(error)}
+
+    request = {
+        "resourceSpans": [{
+            "resource": {"attributes": _format_attributes({
+                "service.name": SERVICE_NAME,
+                "process.pid": os.getpid(),
+                "process.executable.name": os.path.basename(sys.executable),
+            })},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [span_data],
+            }],
+        }]
+    }
+    line = json.dumps(request) + "\n"
+    with _write_lock:
+        try:
+            with open(path, "a") as f:
+                f.write(line)
+        except OSError:
+            # Tracing should never break the actual work
+            pass
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Record a span around the context, if tracing is enabled.
+
+    Spans are nested per thread. The first span of a launched host is a
+    child of the CLI's span that launched it.
+
+    Args:
+        name (str): The span name.
+        **attributes: Attributes of the span.
+
+    Yields:
+        dict: The attributes of the span, to add attributes to that are
+            only known at the end of the span.
+
+    """
+    if not is_enabled():
+        yield {}
+        return
+
+    trace_id, parent_id = _get_parent()
+    if not trace_id:
+        trace_id = os.urandom(16).hex()
+    span_id = os.urandom(8).hex()
+
+    stack = _get_stack()
+    stack.append((trace_id, span_id))
+    start_ns = time.time_ns()
+    error = None
+    try:
+        yield attributes
+    except SystemExit as exc:
+        # Commands exit with the returncode of the application
+        if exc.code:
+            error = exc
+        raise
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        stack.pop()
+        _write_span(name, trace_id, span_id, parent_id,
+                    start_ns, time.time_ns(), attributes, error)
+
+
+def set_launch_time(env: dict):
+    """Store the current time in `env` of a host about to be launched"""
+    if TRACE_FILE_ENV in env:
+        env[LAUNCH_TIME_ENV] = str(time.time_ns())
+
+
+def record_startup():
+    """Record span from the launch of this host up to now.
+
+    Only the first call in a process records the span.
+    """
+    global _startup_recorded
+    if _startup_recorded or not is_enabled():
+        return
+    _startup_recorded = True
+
+    launch_time = os.environ.get(LAUNCH_TIME_ENV)
+    trace_id, parent_id = _get_parent()
+    if not launch_time or not trace_id:
+        return
+    _write_span("host_startup", trace_id, os.urandom(8).hex(), parent_id,
+                int(launch_time), time.time_ns(), {})
@@ -0,0 +1,398 @@
+"""Make the decisions of the quitting pre-publish scripts before launching.
+
+The `quit_on_no_outdated` and `quit_on_only_workfile_instance` pre-publish
+scripts only quit after the host launched and opened the workfile. For Maya
+ASCII workfiles the same decisions are made here by inspecting the file
+with `maya_ascii`, so the launch is skipped altogether.
+
+Other workfiles can not be read without their host. For those
+`quit_on_no_outdated` is decided from the input links recorded on the last
+published workfile version of the task instead, as long as that version was
+published from this workfile and the workfile did not change since.
+
+Only the scripts at the start of the pre-publish scripts are evaluated since
+any other script may change the scene before a later check would run. When a
+check can not be decided offline, e.g. because a referenced file is not a
+Maya ASCII file, the host is launched as usual and the script runs there.
+"""
+import datetime
+import os
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .maya_ascii import inspect_maya_ascii, is_maya_ascii
+
+PRE_POST_SCRIPTS_DIR = os.path.join(os.path.dirname(__file__),
+                                    "pre_post_scripts")
+
+# Maximum depth of nested references to inspect for containers
+MAX_REFERENCE_DEPTH = 8
+
+
+class UndecidableError(Exception):
+    """Raised when a check can not be decided without the host."""
+
+
+def get_representation_ids(
+    path: str,
+    info: Optional[dict] = None,
+    depth: int = 0,
+    visited: Optional[set] = None
+) -> List[str]:
+    """Return representation ids of containers in workfile and references.
+
+    Maya lists the containers of referenced files too, so referenced files
+    are inspected recursively.
+
+    Raises:
+        UndecidableError: When a referenced file can not be inspected.
+
+    """
+    if visited is None:
+        visited = set()
+    if info is None:
+        info = inspect_maya_ascii(path)
+    visited.add(os.path.normcase(os.path.abspath(path)))
+
+    representation_ids = {
+        container["representation"] for container in info["containers"]
+        if container["representation"]
+    }
+    for reference in info["references"]:
+        reference = os.path.expandvars(reference)
+        if "$" in reference:
+            raise UndecidableError(
+                f"Unresolved environment variable in reference: {reference}")
+        if not os.path.isabs(reference):
+            reference = os.path.join(os.path.dirname(path), reference)
+        if os.path.normcase(os.path.abspath(reference)) in visited:
+            continue
+        if depth >= MAX_REFERENCE_DEPTH:
+            raise UndecidableError(f"References nested too deep: {reference}")
+        if not is_maya_ascii(reference) or not os.path.isfile(reference):
+            raise UndecidableError(
+                f"Can not inspect referenced file: {reference}")
+        representation_ids.update(
+            get_representation_ids(reference, depth=depth + 1,
+                                   visited=visited)
+        )
+    return sorted(representation_ids)
+
+
+# Versions with the last version of their product
+OUTDATED_VERSIONS_QUERY = """
+query OutdatedVersions(
+    $projectName: String!, $versionIds: [String!], $first: Int
+) {
+    project(name: $projectName) {
+        versions(ids: $versionIds, first: $first) {
+            edges { node {
+                id
+                version
+                product { latestVersion { version } }
+            } }
+        }
+    }
+}
+"""
+# Representations with their version and the last version of its product
+OUTDATED_REPRESENTATIONS_QUERY = """
+query OutdatedRepresentations(
+    $projectName: String!, $representationIds: [String!], $first: Int
+) {
+    project(name: $projectName) {
+        representations(ids: $representationIds, first: $first) {
+            edges { node {
+                id
+                version {
+                    id
+                    version
+                    product { latestVersion { version } }
+                }
+            } }
+        }
+    }
+}
+"""
+# Versions published from a task with their product type and input links
+TASK_VERSIONS_QUERY = """
+query TaskVersions(
+    $projectName: String!, $taskIds: [String!], $first: Int
+) {
+    project(name: $projectName) {
+        versions(taskIds: $taskIds, first: $first) {
+            pageInfo { hasNextPage }
+            edges { node {
+                id
+                version
+                createdAt
+                attrib { source }
+                product { productType }
+                links(direction: "in", linkTypes: ["generative"]) {
+                    edges { entityId entityType }
+                }
+            } }
+        }
+    }
+}
+"""
+# Maximum amount of versions of a task to look up the last workfile in
+MAX_TASK_VERSIONS = 1000
+
+# Anatomy per project, to fill the roots of many workfiles
+_ANATOMIES = {}
+
+
+def _query_project(query: str, variables: dict) -> dict:
+    """Return project data of a GraphQL query.
+
+    Raises:
+        UndecidableError: When the query failed.
+
+    """
+    import ayon_api
+
+    response = ayon_api.query_graphql(query, variables)
+    if response.errors:
+        raise UndecidableError(
+            f"Query failed: {response.errors[0].get('message')}")
+    return response.data["data"]["project"] or {}
+
+
+def _iter_nodes(connection: Optional[dict]) -> Iterator[dict]:
+    for edge in (connection or {}).get("edges", []):
+        yield edge["node"]
+
+
+def _is_outdated(version: dict) -> bool:
+    """Return whether the product of a queried version has a newer version.
+
+    Like the host, hero versions are not considered outdated.
+    """
+    if version["version"] < 0:
+        return False
+    last_version = (version.get("product") or {}).get("latestVersion")
+    return bool(last_version) and last_version["version"] > version["version"]
+
+
+def _get_anatomy(project_name: str):
+    from ayon_core.pipeline import Anatomy
+
+    if project_name not in _ANATOMIES:
+        _ANATOMIES[project_name] = Anatomy(project_name)
+    return _ANATOMIES[project_name]
+
+
+def get_outdated_version_ids(
+    project_name: str,
+    version_ids: List[str]
+) -> List[str]:
+    """Return versions of which the product has a newer version.
+
+    Like the host, hero versions and versions that no longer exist are not
+    considered outdated. The versions and the last versions of their
+    products are queried at once.
+    """
+    version_ids = set(version_ids)
+    if not version_ids:
+        return []
+    project = _query_project(OUTDATED_VERSIONS_QUERY, {
+        "projectName": project_name,
+        "versionIds": list(version_ids),
+        "first": len(version_ids),
+    })
+    return sorted(
+        version["id"] for version in _iter_nodes(project.get("versions"))
+        if _is_outdated(version)
+    )
+
+
+def get_outdated_representation_ids(
+    project_name: str,
+    representation_ids: List[str]
+) -> List[str]:
+    """Return representations of which the product has a newer version.
+
+    The representations, their versions and the last versions of their
+    products are queried at once.
+    """
+    representation_ids = set(representation_ids)
+    if not representation_ids:
+        return []
+    project = _query_project(OUTDATED_REPRESENTATIONS_QUERY, {
+        "projectName": project_name,
+        "representationIds": list(representation_ids),
+        "first": len(representation_ids),
+    })
+    return sorted(
+        representation["id"]
+        for representation in _iter_nodes(project.get("representations"))
+        if representation.get("version")
+        and _is_outdated(representation["version"])
+    )
+
+
+def get_workfile_input_version_ids(
+    project_name: str,
+    folder_path: str,
+    task_name: str,
+    filepath: str
+) -> List[str]:
+    """Return input versions recorded on the last publish of the workfile.
+
+    The versions of the task are queried together with their product type
+    and input links, so only the task has to be looked up before.
+
+    Raises:
+        UndecidableError: When the last published workfile version of the
+            task was not published from this workfile, the workfile changed
+            since or no inputs were recorded for it.
+
+    """
+    import ayon_api
+
+    task_entity = ayon_api.get_task_by_folder_path(
+        project_name, folder_path, task_name, fields={"id"}
+    )
+    if not task_entity:
+        raise UndecidableError(
+            f"Task not found: {folder_path} > {task_name}")
+
+    project = _query_project(TASK_VERSIONS_QUERY, {
+        "projectName": project_name,
+        "taskIds": [task_entity["id"]],
+        "first": MAX_TASK_VERSIONS,
+    })
+    task_versions = project.get("versions") or {}
+    if task_versions.get("pageInfo", {}).get("hasNextPage"):
+        raise UndecidableError("Task has too many published versions")
+    versions = [
+        version for version in _iter_nodes(task_versions)
+        if version["version"] >= 0
+        and (version.get("product") or {}).get("productType") == "workfile"
+    ]
+    if not versions:
+        raise UndecidableError("Task has no published workfile")
+    # Versions of different workfile products are compared by creation
+    version = max(versions, key=lambda item: item["createdAt"])
+
+    source = (version.get("attrib") or {}).get("source") or ""
+    source = _get_anatomy(project_name).fill_root(source)
+    if (
+        os.path.normcase(os.path.normpath(source))
+        != os.path.normcase(os.path.normpath(filepath))
+    ):
+        raise UndecidableError(
+            f"Last published workfile was published from: {source}")
+
+    created = datetime.datetime.fromisoformat(
+        version["createdAt"].replace("Z", "+00:00")
+    )
+    if os.path.getmtime(filepath) > created.timestamp():
+        raise UndecidableError("Workfile changed since its last publish")
+
+    input_version_ids = [
+        link["entityId"]
+        for link in (version.get("links") or {}).get("edges", [])
+        if link["entityType"] == "version"
+    ]
+    if not input_version_ids:
+        # Can not tell apart no inputs from inputs not being recorded
+        raise UndecidableError("No inputs recorded on last published workfile")
+    return input_version_ids
+
+
+def check_no_outdated(entry: dict,
+                      get_info: Callable[[], dict]) -> Optional[str]:
+    """Offline `quit_on_no_outdated`"""
+    project_name = entry["project_name"]
+    filepath = entry["filepath"]
+    if is_maya_ascii(filepath):
+        representation_ids = get_representation_ids(filepath, get_info())
+        outdated = get_outdated_representation_ids(project_name,
+                                                   representation_ids)
+    else:
+        input_version_ids = get_workfile_input_version_ids(
+            project_name, entry["folder_path"], entry["task_name"], filepath
+        )
+        outdated = get_outdated_version_ids(project_name, input_version_ids)
+    if outdated:
+        return None
+    return (
+        "No outdated containers found in the scene, as such there is "
+        "nothing to update and nothing new to publish."
+    )
+
+
+def check_only_workfile_instance(
+    entry: dict,
+    get_info: Callable[[], dict]
+) -> Optional[str]:
+    """Offline `quit_on_only_workfile_instance`"""
+    if not is_maya_ascii(entry["filepath"]):
+        raise UndecidableError("Instances can only be read from Maya ASCII")
+    for instance in get_info()["instances"]:
+        if not instance["active"]:
+            continue
+        if instance["productType"] == "workfile":
+            continue
+        if "workfile" in instance["families"]:
+            continue
+        return None
+    return (
+        "No active instances found in the scene that is not a Workfile "
+        "instance."
+    )
+
+
+CHECKS: Dict[str, Callable[[dict, Callable], Optional[str]]] = {
+    "quit_on_no_outdated": check_no_outdated,
+    "quit_on_only_workfile_instance": check_only_workfile_instance,
+}
+
+
+def get_check(script_path: str) -> Optional[Callable]:
+    """Return the offline check for a pre-publish script, if any."""
+    directory, filename = os.path.split(os.path.abspath(script_path))
+    if os.path.normcase(directory) != os.path.normcase(PRE_POST_SCRIPTS_DIR):
+        return None
+    return CHECKS.get(os.path.splitext(filename)[0])
+
+
+def get_skip_message(
+    entry: dict,
+    pre_publish_scripts: List[str]
+) -> Optional[str]:
+    """Return why the host would quit before publishing, if known offline.
+
+    Args:
+        entry (dict): The `project_name`, `folder_path`, `task_name` and
+            `filepath` of the workfile to publish.
+        pre_publish_scripts (List[str]): The pre-publish script paths.
+
+    Returns:
+        Optional[str]: The message of the first check that would quit.
+
+    """
+    info = {}
+
+    def get_info():
+        # Only read the workfile once and only when a check needs it
+        if not info:
+            info.update(inspect_maya_ascii(entry["filepath"]))
+        return info
+
+    for script_path in pre_publish_scripts:
+        check = get_check(script_path)
+        if check is None:
+            # Any other script may change the scene for later checks
+            break
+        try:
+            message = check(entry, get_info)
+        except UndecidableError as exc:
+            # The host quits if any check does, so a later check may still
+            # decide to skip
+            print(f"Unable to check before launch: {exc}")
+            continue
+        if message:
+            return message
+    return None
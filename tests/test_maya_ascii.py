@@ -0,0 +1,193 @@
+"""Tests for inspecting Maya ASCII workfiles without Maya."""
+import importlib.util
+import os
+
+import pytest
+
+# Load the module by path, importing the `ayon_launch_scripts` package
+# requires `ayon_core` whereas this module only uses the standard library
+MODULE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "client",
+    "ayon_launch_scripts",
+    "maya_ascii.py"
+)
+_spec = importlib.util.spec_from_file_location("maya_ascii", MODULE_PATH)
+maya_ascii = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(maya_ascii)
+
+HEADER = "//Maya ASCII 2024 scene\n//Name: shot.ma\nrequires maya \"2024\";\n"
+
+CONTAINER = """createNode objectSet -n "char_hero_01_:modelMain_CON";
+\trename -uid "5F4C1A2B-4D3E-11EE-9C2A-0242AC120002";
+\taddAttr -ci true -sn "id" -ln "id" -dt "string";
+\taddAttr -ci true -sn "representation" -ln "representation" -dt "string";
+\taddAttr -ci true -sn "loader" -ln "loader" -dt "string";
+\tsetAttr ".id" -type "string" "ayon.container";
+\tsetAttr ".representation" -type "string" "0f1e2d3c4b5a69788796a5b4c3d2e1f0";
+\tsetAttr ".loader" -type "string" "ReferenceLoader";
+\tsetAttr ".namespace" -type "string" "char_hero_01_";
+"""
+
+INSTANCE = """createNode objectSet -n "modelMain";
+\taddAttr -ci true -sn "id" -ln "id" -dt "string";
+\taddAttr -ci true -sn "active" -ln "active" -dv 1 -at "bool";
+\tsetAttr ".id" -type "string" "ayon.create.instance";
+\tsetAttr ".productType" -type "string" "model";
+\tsetAttr ".productName" -type "string" "modelMain";
+\tsetAttr ".creator_identifier" -type "string" "io.ayon.creators.maya.model";
+"""
+
+
+def write_scene(tmp_path, body, name="shot.ma"):
+    path = tmp_path / name
+    path.write_text(HEADER + body + "// End of shot.ma\n")
+    return str(path)
+
+
+def test_containers(tmp_path):
+    path = write_scene(tmp_path, CONTAINER)
+
+    info = maya_ascii.inspect_maya_ascii(path)
+
+    assert info["containers"] == [{
+        "name": "char_hero_01_:modelMain_CON",
+        "representation": "0f1e2d3c4b5a69788796a5b4c3d2e1f0",
+        "loader": "ReferenceLoader",
+        "namespace": "char_hero_01_",
+    }]
+    assert info["instances"] == []
+
+
+def test_instances(tmp_path):
+    legacy = """createNode objectSet -n "pointcacheMain";
+\tsetAttr ".id" -type "string" "pyblish.avalon.instance";
+\tsetAttr ".family" -type "string" "pointcache";
+\tsetAttr ".subset" -type "string" "pointcacheMain";
+\tsetAttr ".active" no;
+"""
+    path = write_scene(tmp_path, INSTANCE + legacy)
+
+    instances = maya_ascii.inspect_maya_ascii(path)["instances"]
+
+    assert [
+        (instance["name"], instance["productType"], instance["active"])
+        for instance in instances
+    ] == [
+        ("modelMain", "model", True),
+        ("pointcacheMain", "pointcache", False),
+    ]
+    assert instances[1]["productName"] == "pointcacheMain"
+
+
+def test_instance_families(tmp_path):
+    body = """createNode objectSet -n "lookMain";
+\tsetAttr ".id" -type "string" "ayon.create.instance";
+\tsetAttr ".productType" -type "string" "look";
+\tsetAttr ".families" -type "string" "JSON::[\\"workfile\\", \\"review\\"]";
+createNode objectSet -n "rigMain";
+\tsetAttr ".id" -type "string" "pyblish.avalon.instance";
+\tsetAttr ".family" -type "string" "rig";
+\tsetAttr ".families" -type "string" "rig";
+"""
+    path = write_scene(tmp_path, INSTANCE + body)
+
+    instances = maya_ascii.inspect_maya_ascii(path)["instances"]
+
+    assert [instance["families"] for instance in instances] == [
+        [],
+        ["workfile", "review"],
+        ["rig"],
+    ]
+
+
+def test_ignores_other_object_sets(tmp_path):
+    body = """createNode objectSet -n "render_SET";
+\tsetAttr ".ihi" 0;
+createNode transform -n "fake_CON";
+\tsetAttr ".id" -type "string" "ayon.container";
+"""
+    path = write_scene(tmp_path, body)
+
+    info = maya_ascii.inspect_maya_ascii(path)
+
+    assert info["containers"] == []
+    assert info["instances"] == []
+
+
+def test_concatenated_string_value(tmp_path):
+    body = """createNode objectSet -n "modelMain_CON";
+\tsetAttr ".id" -type "string" "ayon.container";
+\tsetAttr ".representation" -type "string" "0f1e2d3c4b5a6978"
+\t\t+ "8796a5b4c3d2e1f0";
+"""
+    path = write_scene(tmp_path, body)
+
+    container = maya_ascii.inspect_maya_ascii(path)["containers"][0]
+
+    assert container["representation"] == "0f1e2d3c4b5a69788796a5b4c3d2e1f0"
+
+
+def test_wrapped_reference_statements(tmp_path):
+    body = """file -rdi 1 -ns "char_hero_01_" -rfn "char_hero_01_RN"
+\t\t -op "VERS|2024|UVER|undef|MADE|undef|CHNG|Mon, Jan 01, 2024|ICON|undef|"
+\t\t -typ "mayaAscii" "/projects/show/char_hero_model_v003.ma";
+file -rdi 1 -ns "char_hero_02_" -rfn "char_hero_02_RN" -op "VERS|2024|UVER|undef|"
+\t\t -typ "mayaAscii" "/projects/show/char_hero_model_v003.ma{1}";
+file -r -ns "char_hero_01_" -dr 1 -rfn "char_hero_01_RN" -op "v=0;"
+\t\t -typ "mayaAscii" "/projects/show/char_hero_model_v003.ma";
+file -r -ns "prop" -dr 1 -rfn "propRN" -typ "mayaAscii" "prop.ma";
+"""
+    path = write_scene(tmp_path, body + CONTAINER)
+
+    info = maya_ascii.inspect_maya_ascii(path)
+
+    assert info["references"] == [
+        "/projects/show/char_hero_model_v003.ma",
+        "prop.ma",
+    ]
+    assert len(info["containers"]) == 1
+
+
+def test_statement_without_semicolon_does_not_swallow_next(tmp_path):
+    body = 'file -r -ns "broken" -rfn "brokenRN" "broken.ma"\n' + CONTAINER
+    path = write_scene(tmp_path, body)
+
+    info = maya_ascii.inspect_maya_ascii(path)
+
+    assert info["references"] == ["broken.ma"]
+    assert len(info["containers"]) == 1
+
+
+def test_long_lines_are_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(maya_ascii, "MAX_LINE_LENGTH", 256)
+    body = (
+        'createNode mesh -n "bodyShape";\n'
+        '\tsetAttr ".vt[0:999]" ' + "0 1 2 " * 100 + ";\n"
+        + CONTAINER
+    )
+    path = write_scene(tmp_path, body)
+
+    containers = maya_ascii.inspect_maya_ascii(path)["containers"]
+
+    assert [container["representation"] for container in containers] == [
+        "0f1e2d3c4b5a69788796a5b4c3d2e1f0"
+    ]
+
+
+def test_not_maya_ascii(tmp_path):
+    path = tmp_path / "shot.ma"
+    path.write_bytes(b"FOR4\x00\x00\x00\x00Maya binary")
+
+    with pytest.raises(ValueError):
+        maya_ascii.inspect_maya_ascii(str(path))
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/projects/shot.ma", True),
+    ("C:/projects/SHOT.MA", True),
+    ("/projects/shot.mb", False),
+    ("/projects/shot.ma.bak", False),
+])
+def test_is_maya_ascii(path, expected):
+    assert maya_ascii.is_maya_ascii(path) is expected